@@ -0,0 +1,189 @@
+# Antenna Pattern Library Script for VEDA
+# This script loads measured antenna patterns (gain vs azimuth/elevation) once, stores them as compact float32
+# grids and interpolates gain for arrays of angles with vectorized bilinear lookups.
+# The calculators accept AntennaPattern objects wherever a scalar tx_gain / rx_gain was used.
+
+# ## Import necessary libraries
+import os
+import logging
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# ## Define the AntennaPattern class
+class AntennaPattern:
+    _library = {}  # (resolved path, mtime) -> loaded pattern
+
+    def __init__(self, gain_dbi, azimuths, elevations, name=None):
+        """Initialize the AntennaPattern class
+
+        Parameters:
+        gain_dbi (array): Gain table, shape (len(azimuths), len(elevations)), in dBi
+        azimuths, elevations (array): Uniformly spaced grid angles in degrees
+        name (str): Pattern name
+        """
+        self.gain_dbi = np.ascontiguousarray(gain_dbi, dtype=np.float32)
+        self.azimuths = np.asarray(azimuths, dtype=float)
+        self.elevations = np.asarray(elevations, dtype=float)
+        self.name = name
+        if self.gain_dbi.shape != (self.azimuths.size, self.elevations.size):
+            raise ValueError(f"Gain table {self.gain_dbi.shape} does not match "
+                             f"{self.azimuths.size} azimuths x {self.elevations.size} elevations")
+        for label, axis in (('azimuth', self.azimuths), ('elevation', self.elevations)):
+            if axis.size < 2 or not np.allclose(np.diff(axis), axis[1] - axis[0]):
+                raise ValueError(f"The {label} grid must be uniform with at least two points")
+
+        self.az0, self.az_step = self.azimuths[0], self.azimuths[1] - self.azimuths[0]
+        self.el0, self.el_step = self.elevations[0], self.elevations[1] - self.elevations[0]
+        # Full circle without (n) or with (n - 1) a duplicated closing column wraps; anything else is clamped
+        if np.isclose(self.azimuths.size * self.az_step, 360):
+            self.az_period = self.azimuths.size
+        elif np.isclose((self.azimuths.size - 1) * self.az_step, 360):
+            self.az_period = self.azimuths.size - 1
+        else:
+            self.az_period = None
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'antenna_pattern.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def bilinear(table, az0, az_step, az_period, el0, el_step, az_deg, el_deg):
+        """Bilinear interpolation on a uniform (az, el) grid, wrapping azimuth when az_period is set"""
+        n_az, n_el = table.shape
+        az = (np.asarray(az_deg, dtype=float) - az0) / az_step
+        if az_period is not None:
+            az %= az_period
+        else:
+            az = np.clip(az, 0, n_az - 1)
+        el = np.clip((np.asarray(el_deg, dtype=float) - el0) / el_step, 0, n_el - 1)
+        j0 = np.minimum(np.floor(el).astype(np.intp), n_el - 2)
+        fe = el - j0
+        if az_period is not None:
+            i0 = np.floor(az).astype(np.intp)
+            fa = az - i0
+            i0 %= az_period
+            i1 = (i0 + 1) % az_period
+        else:
+            i0 = np.minimum(np.floor(az).astype(np.intp), n_az - 2)
+            fa = az - i0
+            i1 = i0 + 1
+        return ((1 - fa) * (1 - fe) * table[i0, j0] + fa * (1 - fe) * table[i1, j0]
+                + (1 - fa) * fe * table[i0, j0 + 1] + fa * fe * table[i1, j0 + 1])
+
+    def gain(self, az_deg, el_deg=0.0):
+        """Gain (dBi) for arrays of azimuth / elevation angles in degrees"""
+        return self.bilinear(self.gain_dbi, self.az0, self.az_step, self.az_period,
+                             self.el0, self.el_step, az_deg, el_deg)
+
+    @property
+    def peak_gain(self):
+        """Maximum gain of the pattern in dBi"""
+        return float(self.gain_dbi.max())
+
+    @staticmethod
+    def resolve_gain(gain, angles=None):
+        """Scalar or array gains pass through; patterns are evaluated at angles = (az_deg, el_deg)"""
+        if not isinstance(gain, AntennaPattern):
+            return gain
+        if angles is None:
+            raise ValueError(f"Pattern '{gain.name}' needs link angles (az_deg, el_deg)")
+        return gain.gain(*angles)
+
+    @classmethod
+    def isotropic(cls, gain_dbi=0.0):
+        """Constant-gain pattern"""
+        return cls(np.full((2, 2), gain_dbi), [0, 180], [-90, 90], name=f"isotropic_{gain_dbi}dBi")
+
+    @classmethod
+    def from_csv(cls, path):
+        """Load a long-format CSV with azimuth, elevation and gain columns (in that order)"""
+        df = pd.read_csv(path)
+        az_col, el_col, gain_col = df.columns[:3]
+        grid = df.pivot_table(index=az_col, columns=el_col, values=gain_col)
+        if grid.isna().any().any():
+            raise ValueError(f"{path} does not cover a complete azimuth x elevation grid")
+        return cls(grid.to_numpy(), grid.index.to_numpy(), grid.columns.to_numpy(), name=Path(path).stem)
+
+    @classmethod
+    def from_npz(cls, path):
+        """Load a pattern saved with save_npz"""
+        with np.load(path) as data:
+            return cls(data['gain_dbi'], data['azimuths'], data['elevations'], name=Path(path).stem)
+
+    @classmethod
+    def from_msi(cls, path, el_step_deg=1.0):
+        """Load an MSI/Planet file, combining the horizontal and vertical cuts into a 2D grid
+
+        The cuts hold attenuation below peak gain at 1 degree steps; the vertical cut runs from the horizon
+        downward (0..359 with 270 pointing up). The 2D gain is peak - (A_h(az) + A_v(el)).
+        """
+        peak_gain, horizontal, vertical, section = 0.0, [], [], None
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                key = parts[0].upper()
+                if key == 'GAIN':
+                    peak_gain = float(parts[1]) + (2.15 if len(parts) > 2 and parts[2].upper() == 'DBD' else 0.0)
+                elif key in ('HORIZONTAL', 'VERTICAL'):
+                    section = horizontal if key == 'HORIZONTAL' else vertical
+                elif section is not None and len(parts) >= 2:
+                    section.append((float(parts[0]), float(parts[1])))
+        horizontal = np.array(sorted(horizontal))
+        vertical = np.array(sorted(vertical))
+        azimuths = np.arange(0, 360, 1.0)
+        elevations = np.arange(-90, 90 + el_step_deg / 2, el_step_deg)
+        att_h = np.interp(azimuths, horizontal[:, 0], horizontal[:, 1], period=360)
+        # Vertical angle 0 is the horizon, positive angles point below it
+        att_v = np.interp((-elevations) % 360, vertical[:, 0], vertical[:, 1], period=360)
+        return cls(peak_gain - (att_h[:, None] + att_v[None, :]), azimuths, elevations, name=Path(path).stem)
+
+    @classmethod
+    def load(cls, path):
+        """Load a pattern file once (.csv, .npz or .msi/.pln/.ant); later calls return the cached grid"""
+        path = Path(path).resolve()
+        key = (str(path), path.stat().st_mtime)
+        if key not in cls._library:
+            suffix = path.suffix.lower()
+            if suffix == '.csv':
+                pattern = cls.from_csv(path)
+            elif suffix == '.npz':
+                pattern = cls.from_npz(path)
+            elif suffix in ('.msi', '.pln', '.ant'):
+                pattern = cls.from_msi(path)
+            else:
+                raise ValueError(f"Unsupported pattern file type '{suffix}'")
+            cls._library[key] = pattern
+            logging.debug(f"Loaded pattern {pattern.name} {pattern.gain_dbi.shape} from {path}")
+        return cls._library[key]
+
+    def save_npz(self, path):
+        """Save the pattern grid in the compact .npz format"""
+        np.savez_compressed(path, gain_dbi=self.gain_dbi, azimuths=self.azimuths, elevations=self.elevations)
+
+# ## Run the Antenna Pattern Lookup
+if __name__ == "__main__":
+    AntennaPattern.init_logger()
+    # A synthetic sector pattern: 65 degree horizontal, 7 degree vertical beamwidth, 17 dBi peak
+    azimuths = np.arange(0, 360, 1.0)
+    elevations = np.arange(-90, 91, 1.0)
+    wrapped_az = (azimuths + 180) % 360 - 180
+    att_h = np.minimum(12 * (wrapped_az / 65) ** 2, 25)
+    att_v = np.minimum(12 * (elevations / 7) ** 2, 20)
+    sector = AntennaPattern(17 - np.minimum(att_h[:, None] + att_v[None, :], 30), azimuths, elevations, 'sector')
+
+    rng = np.random.default_rng(0)
+    az = rng.uniform(-180, 180, 1000000)
+    el = rng.uniform(-10, 10, 1000000)
+    gains = sector.gain(az, el)
+    print(f"Interpolated {gains.size} gains, mean {gains.mean():.2f} dBi, peak {sector.peak_gain:.1f} dBi")
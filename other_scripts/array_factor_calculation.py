@@ -0,0 +1,146 @@
+# Phased Array Factor Script for VEDA
+# This script computes the gain of a phased array over (azimuth, elevation) grids for arbitrary element layouts
+# and steering weights in one broadcasting pass. Pattern tables are cached per steering state and gain toward
+# arbitrary link angles is interpolated from them, so directional gain can replace scalar tx_gain / rx_gain.
+
+# ## Import necessary libraries
+import os
+import logging
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+
+from antenna_pattern import AntennaPattern
+
+# ## Define the PhasedArray class
+class PhasedArray:
+    def __init__(self, element_positions_m, frequency, element_gain_dbi=0.0, taper=None,
+                 az_step_deg=1.0, el_step_deg=1.0, cache_size=32, chunk_size=16384):
+        """Initialize the PhasedArray class
+
+        Parameters:
+        element_positions_m (array): Element positions, shape (M, 3) or (M, 2) in meters
+        frequency (float): Carrier frequency in MHz
+        element_gain_dbi (float): Gain of a single element in dBi
+        taper (array): Optional amplitude taper per element
+        az_step_deg, el_step_deg (float): Resolution of the cached pattern tables
+        """
+        positions = np.asarray(element_positions_m, dtype=float)
+        if positions.shape[1] == 2:
+            positions = np.column_stack((positions, np.zeros(len(positions))))
+        self.element_positions_m = positions
+        self.frequency = frequency  # in MHz
+        self.wavenumber = 2 * np.pi * frequency * 1e6 / 3e8  # rad/m
+        self.element_gain_dbi = element_gain_dbi
+        self.taper = np.ones(len(positions)) if taper is None else np.asarray(taper, dtype=float)
+        self.azimuths = np.arange(-180, 180 + az_step_deg / 2, az_step_deg)
+        self.elevations = np.arange(-90, 90 + el_step_deg / 2, el_step_deg)
+        self.cache_size = cache_size
+        self.chunk_size = chunk_size  # Directions evaluated per broadcasting block
+        self.pattern_cache = OrderedDict()  # Steering state -> gain table (dBi)
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'array_factor.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def direction_vectors(az_deg, el_deg):
+        """Unit direction vectors for broadcastable azimuth / elevation arrays (degrees)"""
+        az = np.radians(az_deg)
+        el = np.radians(el_deg)
+        az, el = np.broadcast_arrays(az, el)
+        return np.stack((np.cos(el) * np.cos(az), np.cos(el) * np.sin(az), np.sin(el)), axis=-1)
+
+    @staticmethod
+    def link_angles(tx_xyz, rx_xyz):
+        """Azimuth and elevation (degrees) from tx positions toward rx positions"""
+        delta = np.asarray(rx_xyz, dtype=float) - np.asarray(tx_xyz, dtype=float)
+        az = np.degrees(np.arctan2(delta[..., 1], delta[..., 0]))
+        el = np.degrees(np.arctan2(delta[..., 2], np.hypot(delta[..., 0], delta[..., 1])))
+        return az, el
+
+    def steering_weights(self, steer_az_deg=0.0, steer_el_deg=0.0):
+        """Complex element weights that point the main beam at (steer_az, steer_el)"""
+        u0 = self.direction_vectors(steer_az_deg, steer_el_deg)
+        return self.taper * np.exp(-1j * self.wavenumber * (self.element_positions_m @ u0))
+
+    def calculate_array_factor(self, az_deg, el_deg, weights):
+        """Complex array factor for broadcastable azimuth / elevation arrays"""
+        u = self.direction_vectors(az_deg, el_deg)
+        shape = u.shape[:-1]
+        u = u.reshape(-1, 3)
+        af = np.empty(len(u), dtype=complex)
+        for start in range(0, len(u), self.chunk_size):
+            phase = self.wavenumber * (u[start:start + self.chunk_size] @ self.element_positions_m.T)
+            af[start:start + self.chunk_size] = np.exp(1j * phase) @ weights
+        return af.reshape(shape)
+
+    def calculate_pattern(self, weights):
+        """Gain table (dBi) over the azimuth x elevation grid, normalized to directivity"""
+        af = self.calculate_array_factor(self.azimuths[:, None], self.elevations[None, :], weights)
+        power = np.abs(af) ** 2
+        # Average over the sphere, weighting each elevation row by its solid angle
+        solid_angle = np.cos(np.radians(self.elevations))[None, :]
+        mean_power = np.sum(power[:-1] * solid_angle) / np.sum(np.broadcast_to(solid_angle, power[:-1].shape))
+        with np.errstate(divide='ignore'):
+            return (10 * np.log10(power / mean_power) + self.element_gain_dbi).astype(np.float32)
+
+    def pattern(self, steer_az_deg=0.0, steer_el_deg=0.0, weights=None):
+        """Cached gain table for a steering direction, or for explicit weights"""
+        if weights is not None:
+            weights = np.asarray(weights, dtype=complex)
+            key = ('weights', weights.tobytes())
+        else:
+            key = ('steer', float(steer_az_deg), float(steer_el_deg))
+        if key in self.pattern_cache:
+            self.pattern_cache.move_to_end(key)
+            return self.pattern_cache[key]
+        if weights is None:
+            weights = self.steering_weights(steer_az_deg, steer_el_deg)
+        table = self.calculate_pattern(weights)
+        self.pattern_cache[key] = table
+        if len(self.pattern_cache) > self.cache_size:
+            self.pattern_cache.popitem(last=False)
+        logging.debug(f"Computed pattern table {table.shape} ({len(self.pattern_cache)} cached)")
+        return table
+
+    def pattern_object(self, steer_az_deg=0.0, steer_el_deg=0.0, weights=None):
+        """Cached gain table wrapped as an AntennaPattern, usable wherever a scalar gain is accepted"""
+        return AntennaPattern(self.pattern(steer_az_deg, steer_el_deg, weights), self.azimuths, self.elevations,
+                              name=f"array_{len(self.element_positions_m)}el")
+
+    def calculate_gain(self, az_deg, el_deg, steer_az_deg=0.0, steer_el_deg=0.0, weights=None):
+        """Gain (dBi) toward arbitrary link angles for one steering state"""
+        return self.pattern_object(steer_az_deg, steer_el_deg, weights).gain(az_deg, el_deg)
+
+    @classmethod
+    def uniform_planar(cls, rows, cols, frequency, spacing_wavelengths=0.5, **kwargs):
+        """Rectangular array in the y-z plane, broadside along +x"""
+        spacing_m = spacing_wavelengths * 3e8 / (frequency * 1e6)
+        y, z = np.meshgrid((np.arange(cols) - (cols - 1) / 2) * spacing_m,
+                           (np.arange(rows) - (rows - 1) / 2) * spacing_m)
+        positions = np.column_stack((np.zeros(y.size), y.ravel(), z.ravel()))
+        return cls(positions, frequency, **kwargs)
+
+# ## Run the Array Factor Calculation
+if __name__ == "__main__":
+    PhasedArray.init_logger()
+    array = PhasedArray.uniform_planar(8, 8, frequency=28000, element_gain_dbi=5)
+    table = array.pattern(steer_az_deg=30, steer_el_deg=10)
+    peak = np.unravel_index(np.argmax(table), table.shape)
+    print(f"Peak gain {table[peak]:.2f} dBi at az {array.azimuths[peak[0]]:.0f}, el {array.elevations[peak[1]]:.0f}")
+
+    # Gain toward 100k receivers from a tower at the origin, for the same cached steering state
+    rng = np.random.default_rng(0)
+    rx_xyz = np.column_stack((rng.uniform(10, 500, 100000), rng.uniform(-300, 300, 100000), rng.uniform(-20, 20, 100000)))
+    az, el = PhasedArray.link_angles(np.zeros(3), rx_xyz)
+    tx_gain = array.calculate_gain(az, el, steer_az_deg=30, steer_el_deg=10)
+    print(f"Mean directional tx_gain over 100000 links: {tx_gain.mean():.2f} dBi")
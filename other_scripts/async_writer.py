@@ -0,0 +1,158 @@
+# Asynchronous Dataset Writer Script for VEDA
+# This script moves dataset serialization and compression off the compute path. Calculators submit each
+# finished chunk to a bounded queue and go on computing the next one while a background thread writes the
+# previous one (double buffering with max_pending=1). When the disk falls behind, submit() blocks until a slot
+# frees up, so memory stays bounded. The writer reports how long was spent computing, writing and stalled.
+# When the producer raises inside a with block, queued chunks are dropped and its own exception propagates.
+
+# ## Import necessary libraries
+import os
+import time
+import queue
+import itertools
+import logging
+import threading
+from pathlib import Path
+import pandas as pd
+
+# ## Define the AsyncDatasetWriter class
+class AsyncDatasetWriter:
+    def __init__(self, sink, max_pending=1):
+        """Initialize the AsyncDatasetWriter class
+
+        Parameters:
+        sink (callable): Called as sink(chunk) on the background thread to serialize one chunk
+        max_pending (int): Chunks queued behind the one being written before submit() blocks
+        """
+        self.sink = sink
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.cancelled = False  # Set when the producer fails; queued chunks are then dropped, not written
+        self.chunks = 0
+        self.rows = 0
+        self.write_seconds = 0.0  # Background thread busy in the sink
+        self.stall_seconds = 0.0  # Producer blocked in submit() waiting for a free slot
+        self.started = time.perf_counter()
+        self.finished = None  # Set by close() so the metrics stop at the last write
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'async_writer.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.cancel()  # Let the producer's exception propagate instead of a write error
+
+    def _run(self):
+        """Write queued chunks until the end-of-stream marker arrives"""
+        written = 0  # Owned by this thread; self.chunks is advanced by the producer
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                return
+            if self.error is not None or self.cancelled:
+                continue  # Drain without writing so the producer is not left blocked
+            start = time.perf_counter()
+            try:
+                self.sink(chunk)
+            except Exception as e:
+                logging.error(f"Error writing chunk {written}: {e}")
+                self.error = e
+            self.write_seconds += time.perf_counter() - start
+            written += 1
+
+    def submit(self, chunk, rows=None):
+        """Queue a chunk for writing, blocking while max_pending chunks are already waiting
+
+        rows defaults to len(chunk) and only feeds the metrics.
+        """
+        if self.error is not None:
+            raise self.error
+        start = time.perf_counter()
+        self.queue.put(chunk)
+        self.stall_seconds += time.perf_counter() - start
+        self.chunks += 1
+        self.rows += len(chunk) if rows is None else rows
+
+    def close(self):
+        """Wait for every queued chunk to be written, re-raising the first write error"""
+        if self.thread.is_alive():
+            start = time.perf_counter()
+            self.queue.put(None)
+            self.thread.join()
+            self.stall_seconds += time.perf_counter() - start
+            self.finished = time.perf_counter()
+        logging.info(f"Async writer metrics: {self.metrics()}")
+        if self.error is not None:
+            raise self.error
+
+    def cancel(self):
+        """Stop after the chunk being written, dropping queued chunks and not raising write errors"""
+        self.cancelled = True
+        if self.thread.is_alive():
+            # The thread drains without writing, so joining waits at most for the chunk being written; a daemon
+            # thread left running would be killed mid-write when the producer's exception ends the script
+            self.queue.put(None)
+            self.thread.join()
+            self.finished = time.perf_counter()
+        if self.error is not None:
+            logging.error(f"Write error after the producer failed: {self.error}")
+
+    def metrics(self):
+        """Wall time split into compute and stall time on the producer side, plus background write time"""
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return {"chunks": self.chunks, "rows": self.rows, "elapsed_seconds": elapsed,
+                "compute_seconds": elapsed - self.stall_seconds, "stall_seconds": self.stall_seconds,
+                "write_seconds": self.write_seconds}
+
+
+def csv_sink(folder, prefix, compression='gzip'):
+    """Sink writing each DataFrame chunk to <folder>/<prefix>_<n>.csv[.gz|.zip]"""
+    Path(folder).mkdir(parents=True, exist_ok=True)
+    suffix = {'gzip': '.csv.gz', 'zip': '.csv.zip', None: '.csv'}[compression]
+    counter = itertools.count()
+
+    def write(chunk):
+        chunk.to_csv(Path(folder) / f"{prefix}_{next(counter)}{suffix}", index=False, compression=compression)
+    return write
+
+# ## Run the Asynchronous Dataset Writer
+if __name__ == "__main__":
+    import shutil
+    import numpy as np
+    from generate_link_budget_data import calculate_path_loss
+
+    AsyncDatasetWriter.init_logger()
+    distances = np.arange(5, 1505, 5)
+    tx_gains = np.arange(0, 16)
+    rx_gains = np.arange(0, 16)
+
+    def fspl_chunk(frequency):
+        d, g_t, g_r = (a.ravel() for a in np.meshgrid(distances, tx_gains, rx_gains, indexing='ij'))
+        return pd.DataFrame({'frequency (Hz)': frequency * 1e6, 'distance (ft)': d, 'tx_gain (dBi)': g_t,
+                             'rx_gain (dBi)': g_r, 'fspl (dB)': calculate_path_loss(frequency, d) - g_t - g_r})
+
+    frequencies = np.arange(700, 1700, 50)
+    with AsyncDatasetWriter(csv_sink('async_demo', 'fspl_batch')) as writer:
+        for frequency in frequencies:
+            writer.submit(fspl_chunk(frequency))
+    metrics = writer.metrics()
+    print(f"{metrics['rows']} rows in {metrics['chunks']} chunks: {metrics['elapsed_seconds']:.2f} s wall, "
+          f"{metrics['compute_seconds']:.2f} s compute, {metrics['write_seconds']:.2f} s writing in the background, "
+          f"{metrics['stall_seconds']:.2f} s stalled")
+    shutil.rmtree('async_demo')
@@ -0,0 +1,221 @@
+# Atmospheric and Rain Attenuation Script for VEDA
+# This script adds gaseous (oxygen + water vapour) and rain attenuation on top of free-space loss for links
+# above ~10 GHz, using the ITU-R P.838-3 rain coefficients and the ITU-R P.676 Annex 2 approximations
+# (1-350 GHz, including the 60 GHz oxygen complex).
+# The frequency-dependent specific attenuations are tabulated on first use and cached, so every later call
+# is an array interpolation and weather margin costs next to nothing per row.
+
+# ## Import necessary libraries
+import os
+import logging
+import warnings
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+
+# ITU-R P.838-3 regression coefficients: (a_j, b_j, c_j) per Gaussian term, then (m, c)
+RAIN_COEFFICIENTS = {
+    'k_h': ([-5.33980, -0.35351, -0.23789, -0.94158],
+            [-0.10008, 1.26970, 0.86036, 0.64552],
+            [1.13098, 0.45400, 0.15354, 0.16817],
+            -0.18961, 0.71147),
+    'k_v': ([-3.80595, -3.44965, -0.39902, 0.50167],
+            [0.56934, -0.22911, 0.73042, 1.07319],
+            [0.81061, 0.51059, 0.11899, 0.27195],
+            -0.16398, 0.63297),
+    'alpha_h': ([-0.14318, 0.29591, 0.32177, -5.37610, 16.1721],
+                [1.82442, 0.77564, 0.63773, -0.96230, -3.29980],
+                [-0.55187, 0.19822, 0.13164, 1.47828, 3.43990],
+                0.67849, -1.95537),
+    'alpha_v': ([-0.07771, 0.56727, -0.20238, -48.2991, 48.5833],
+                [2.33840, 0.95545, 1.14520, 0.791669, 0.791459],
+                [-0.76284, 0.54039, 0.26809, 0.116226, 0.116479],
+                -0.053739, 0.83433),
+}
+
+RAIN_TABLE_GHZ = (1.0, 1000.0)  # P.838-3 validity range
+GAS_TABLE_GHZ = (1.0, 350.0)  # P.676 Annex 2 approximation range, including the 60 GHz oxygen complex
+TABLE_POINTS = 2048
+
+# ## Define the AtmosphericAttenuation class
+class AtmosphericAttenuation:
+    def __init__(self, rain_rate=0.0, pressure_hpa=1013.25, temperature_c=15.0, water_vapour_density=7.5,
+                 elevation_deg=0.0, tilt_deg=45.0, effective_rain_path=True):
+        """Initialize the AtmosphericAttenuation class"""
+        self.rain_rate = rain_rate  # Rain rate (mm/h)
+        self.pressure_hpa = pressure_hpa  # Dry air pressure (hPa)
+        self.temperature_c = temperature_c  # Temperature (C)
+        self.water_vapour_density = water_vapour_density  # Water vapour density (g/m^3)
+        self.elevation_deg = elevation_deg  # Path elevation angle (degrees)
+        self.tilt_deg = tilt_deg  # Polarization tilt angle (0 horizontal, 90 vertical, 45 circular)
+        self.effective_rain_path = effective_rain_path  # Shorten long paths for non-uniform rain cells
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'attenuation.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def _rain_regression(name, frequency_ghz):
+        """Evaluate one P.838-3 regression (log10 k or alpha) at frequencies in GHz"""
+        a, b, c, m, offset = (np.asarray(v) if isinstance(v, list) else v for v in RAIN_COEFFICIENTS[name])
+        log_f = np.log10(frequency_ghz)[..., None]
+        return np.sum(a * np.exp(-((log_f - b) / c) ** 2), axis=-1) + m * log_f[..., 0] + offset
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def rain_table(elevation_deg, tilt_deg):
+        """Cached (log10 f, k, alpha) table for one geometry and polarization"""
+        frequency_ghz = np.logspace(*np.log10(RAIN_TABLE_GHZ), TABLE_POINTS)
+        k_h = 10 ** AtmosphericAttenuation._rain_regression('k_h', frequency_ghz)
+        k_v = 10 ** AtmosphericAttenuation._rain_regression('k_v', frequency_ghz)
+        alpha_h = AtmosphericAttenuation._rain_regression('alpha_h', frequency_ghz)
+        alpha_v = AtmosphericAttenuation._rain_regression('alpha_v', frequency_ghz)
+        weight = np.cos(np.radians(elevation_deg)) ** 2 * np.cos(np.radians(2 * tilt_deg))
+        k = (k_h + k_v + (k_h - k_v) * weight) / 2
+        alpha = (k_h * alpha_h + k_v * alpha_v + (k_h * alpha_h - k_v * alpha_v) * weight) / (2 * k)
+        logging.debug(f"Built rain coefficient table for elevation {elevation_deg}, tilt {tilt_deg}")
+        return np.log10(frequency_ghz), k, alpha
+
+    @staticmethod
+    def calculate_gaseous_specific(frequency_ghz, pressure_hpa, temperature_c, water_vapour_density):
+        """Oxygen and water vapour specific attenuation (dB/km), P.676 Annex 2 approximation for 1-350 GHz
+
+        Frequencies above 350 GHz give NaN.
+        """
+        f = np.asarray(frequency_ghz, dtype=float)
+        rp = pressure_hpa / 1013.0
+        rt = 288.0 / (273.0 + temperature_c)
+        rho = water_vapour_density
+
+        def phi(a, b, c, d):
+            return rp ** a * rt ** b * np.exp(c * (1 - rp) + d * (1 - rt))
+
+        xi1 = phi(0.0717, -1.8132, 0.0156, -1.6515)
+        xi2 = phi(0.5146, -4.6368, -0.1921, -5.7416)
+        xi3 = phi(0.3414, -6.5851, 0.2130, -8.5854)
+        xi4 = phi(-0.0112, 0.0092, -0.1033, -0.0009)
+        xi5 = phi(0.2705, -2.7192, -0.3016, -4.1033)
+        xi6 = phi(0.2445, -5.9191, 0.0422, -8.0719)
+        xi7 = phi(-0.1833, 6.5589, -0.2402, 6.131)
+        # Oxygen attenuation at the edges of the 60 GHz complex, interpolated in log space between them
+        g54 = 2.192 * phi(1.8286, -1.9487, 0.4051, -2.8509)
+        g58 = 12.59 * phi(1.0045, 3.5610, 0.1588, 1.2834)
+        g60 = 15.0 * phi(0.9003, 4.1335, 0.0427, 1.6088)
+        g62 = 14.28 * phi(0.9886, 3.4176, 0.1827, 1.3429)
+        g64 = 6.819 * phi(1.4320, 0.6258, 0.3177, -0.5914)
+        g66 = 1.908 * phi(2.0717, -4.1404, 0.4910, -4.8718)
+
+        gamma_o = np.full(f.shape, np.nan)
+        band = f <= 54
+        fb = f[band]
+        gamma_o[band] = (7.2 * rt ** 2.8 / (fb ** 2 + 0.34 * rp ** 2 * rt ** 1.6)
+                         + 0.62 * xi3 / ((54 - fb) ** (1.16 * xi1) + 0.83 * xi2)) * fb ** 2 * rp ** 2 * 1e-3
+        band = (f > 54) & (f <= 60)
+        fb = f[band]
+        gamma_o[band] = np.exp(np.log(g54) / 24 * (fb - 58) * (fb - 60) - np.log(g58) / 8 * (fb - 54) * (fb - 60)
+                               + np.log(g60) / 12 * (fb - 54) * (fb - 58))
+        band = (f > 60) & (f <= 62)
+        gamma_o[band] = g60 + (g62 - g60) * (f[band] - 60) / 2
+        band = (f > 62) & (f <= 66)
+        fb = f[band]
+        gamma_o[band] = np.exp(np.log(g62) / 8 * (fb - 64) * (fb - 66) - np.log(g64) / 4 * (fb - 62) * (fb - 66)
+                               + np.log(g66) / 8 * (fb - 62) * (fb - 64))
+        band = (f > 66) & (f <= 120)
+        fb = f[band]
+        gamma_o[band] = (3.02e-4 * rt ** 3.5 + 0.283 * rt ** 3.8 / ((fb - 118.75) ** 2 + 2.91 * rp ** 2 * rt ** 1.6)
+                         + 0.502 * xi6 * (1 - 0.0163 * xi7 * (fb - 66))
+                         / ((fb - 66) ** (1.4346 * xi4) + 1.15 * xi5)) * fb ** 2 * rp ** 2 * 1e-3
+        band = (f > 120) & (f <= 350)
+        fb = f[band]
+        delta = -0.00306 * phi(3.211, -14.94, 1.583, -16.37)
+        gamma_o[band] = (3.02e-4 / (1 + 1.9e-5 * fb ** 1.5)
+                         + 0.283 * rt ** 0.3 / ((fb - 118.75) ** 2 + 2.91 * rp ** 2 * rt ** 1.6)
+                         ) * fb ** 2 * rp ** 2 * rt ** 3.5 * 1e-3 + delta
+
+        eta1 = 0.955 * rp * rt ** 0.68 + 0.006 * rho
+        eta2 = 0.735 * rp * rt ** 0.5 + 0.0353 * rt ** 4 * rho
+
+        def g(fi):
+            return 1 + ((f - fi) / (f + fi)) ** 2
+
+        gamma_w = (3.98 * eta1 * np.exp(2.23 * (1 - rt)) / ((f - 22.235) ** 2 + 9.42 * eta1 ** 2) * g(22.0)
+                   + 11.96 * eta1 * np.exp(0.7 * (1 - rt)) / ((f - 183.31) ** 2 + 11.14 * eta1 ** 2)
+                   + 0.081 * eta1 * np.exp(6.44 * (1 - rt)) / ((f - 321.226) ** 2 + 6.29 * eta1 ** 2)
+                   + 3.66 * eta1 * np.exp(1.6 * (1 - rt)) / ((f - 325.153) ** 2 + 9.22 * eta1 ** 2)
+                   + 25.37 * eta1 * np.exp(1.09 * (1 - rt)) / (f - 380) ** 2
+                   + 17.4 * eta1 * np.exp(1.46 * (1 - rt)) / (f - 448) ** 2
+                   + 844.6 * eta1 * np.exp(0.17 * (1 - rt)) / (f - 557) ** 2 * g(557.0)
+                   + 290 * eta1 * np.exp(0.41 * (1 - rt)) / (f - 752) ** 2 * g(752.0)
+                   + 8.3328e4 * eta2 * np.exp(0.99 * (1 - rt)) / (f - 1780) ** 2 * g(1780.0)
+                   ) * f ** 2 * rt ** 2.5 * rho * 1e-4
+        return gamma_o, gamma_w
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def gaseous_table(pressure_hpa, temperature_c, water_vapour_density):
+        """Cached (log10 f, gamma_o + gamma_w) table for one atmosphere"""
+        # Denser than the rain table so the 60 and 118.75 GHz oxygen lines are resolved
+        frequency_ghz = np.minimum(np.logspace(*np.log10(GAS_TABLE_GHZ), 4 * TABLE_POINTS), GAS_TABLE_GHZ[1])
+        gamma_o, gamma_w = AtmosphericAttenuation.calculate_gaseous_specific(
+            frequency_ghz, pressure_hpa, temperature_c, water_vapour_density)
+        logging.debug(f"Built gaseous attenuation table for {pressure_hpa} hPa, {temperature_c} C, "
+                      f"{water_vapour_density} g/m^3")
+        return np.log10(frequency_ghz), gamma_o + gamma_w
+
+    @staticmethod
+    def _lookup(table, frequency_ghz, valid_range):
+        """Interpolate a cached table at frequencies in GHz
+
+        Below the range the lowest entry is used (attenuation there is negligible); above it the models do not
+        apply, so those frequencies give NaN with a warning rather than a silently clamped value.
+        """
+        log_f, values = table[0], table[1:]
+        frequency_ghz = np.asarray(frequency_ghz, dtype=float)
+        above = frequency_ghz > valid_range[1]
+        if np.any(above):
+            warnings.warn(f"Frequencies above {valid_range[1]} GHz are outside the attenuation model; returning NaN")
+            logging.warning(f"{int(np.sum(above))} frequencies above {valid_range[1]} GHz returned as NaN")
+        query = np.log10(np.clip(frequency_ghz, *valid_range))
+        return [np.where(above, np.nan, np.interp(query, log_f, v)) for v in values]
+
+    def calculate_rain_specific(self, frequency_ghz, rain_rate=None):
+        """Rain specific attenuation gamma_R = k R^alpha (dB/km)"""
+        rain_rate = self.rain_rate if rain_rate is None else rain_rate
+        k, alpha = self._lookup(self.rain_table(self.elevation_deg, self.tilt_deg), frequency_ghz, RAIN_TABLE_GHZ)
+        return k * np.asarray(rain_rate, dtype=float) ** alpha
+
+    def calculate_attenuation(self, frequency, distance_ft, rain_rate=None):
+        """Total gaseous + rain attenuation (dB) for frequency in MHz and distance in feet"""
+        frequency_ghz = np.asarray(frequency, dtype=float) / 1000
+        distance_km = np.asarray(distance_ft, dtype=float) * 0.3048 / 1000
+        rain_rate = self.rain_rate if rain_rate is None else np.asarray(rain_rate, dtype=float)
+
+        (gamma_gas,) = self._lookup(
+            self.gaseous_table(self.pressure_hpa, self.temperature_c, self.water_vapour_density),
+            frequency_ghz, GAS_TABLE_GHZ)
+        attenuation = gamma_gas * distance_km
+
+        if np.any(rain_rate > 0):
+            rain_km = distance_km
+            if self.effective_rain_path:
+                # Distance reduction factor for non-uniform rain, r = 1 / (1 + d / d0)
+                d0 = 35 * np.exp(-0.015 * np.minimum(rain_rate, 100))
+                rain_km = distance_km / (1 + distance_km / d0)
+            attenuation = attenuation + self.calculate_rain_specific(frequency_ghz, rain_rate) * rain_km
+        return attenuation
+
+# ## Run the Attenuation Calculation
+if __name__ == "__main__":
+    AtmosphericAttenuation.init_logger()
+    weather = AtmosphericAttenuation(rain_rate=25)
+    frequencies = np.array([10000, 24000, 38000, 60000, 80000])  # MHz
+    for f, a in zip(frequencies, weather.calculate_attenuation(frequencies, 3280.84 * 5)):
+        print(f"{f / 1000:.0f} GHz over 5 km in 25 mm/h rain: {a:.2f} dB")
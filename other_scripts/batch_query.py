@@ -0,0 +1,281 @@
+# Batch Query Engine Script for VEDA
+# This script filters the generated batch folders (fspl_batches/*.csv.zip, db_rssi/*.csv, ...) without parsing
+# every file. An index keeps the row count and per-column min/max of each batch file, refreshed when a file
+# changes, so predicates skip batches that cannot match. Indexes live under batch_index/, keyed by the batch
+# folder's path, so the tracked data folders stay untouched. Surviving batches are read in chunks by a thread
+# pool and matching rows are streamed back as DataFrame chunks.
+
+# ## Import necessary libraries
+import os
+import json
+import hashlib
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+INDEX_FOLDER = 'batch_index'
+
+# ## Define the BatchQuery class
+class BatchQuery:
+    OPERATORS = ('==', '!=', '<', '<=', '>', '>=', 'between', 'in')
+
+    def __init__(self, folder, pattern='*.csv*', chunk_size=100000, num_workers=None, index_folder=INDEX_FOLDER):
+        """Initialize the BatchQuery class
+
+        Parameters:
+        folder (str): Batch folder, e.g. fspl_batches or db_rssi
+        pattern (str): Glob for the batch files (.csv or zipped .csv.zip)
+        chunk_size (int): Rows parsed per read
+        num_workers (int): Reader threads
+        index_folder (str): Where the per-folder index files are kept
+        """
+        self.folder = Path(folder)
+        self.pattern = pattern
+        self.chunk_size = chunk_size
+        self.num_workers = num_workers if num_workers is not None else min(os.cpu_count() or 1, 8)
+        folder_key = hashlib.blake2b(str(self.folder.resolve()).encode(), digest_size=8).hexdigest()
+        self.index_path = Path(index_folder) / f"{self.folder.name}-{folder_key}.json"
+        self.index = None
+        self.files = []  # Batch files seen by the last build_index()
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'batch_query.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    def batch_files(self):
+        """Batch files in the folder, sorted by name"""
+        return sorted(self.folder.glob(self.pattern))
+
+    def summarize_file(self, path):
+        """Row count and per-column min/max of one batch file"""
+        rows = 0
+        low, high = {}, {}
+        for chunk in pd.read_csv(path, chunksize=self.chunk_size):
+            rows += len(chunk)
+            numeric = chunk.select_dtypes(include='number')
+            for column, value in numeric.min().items():
+                low[column] = min(low.get(column, np.inf), float(value))
+            for column, value in numeric.max().items():
+                high[column] = max(high.get(column, -np.inf), float(value))
+        stat = path.stat()
+        return {"mtime": stat.st_mtime, "size": stat.st_size, "rows": rows,
+                "columns": {column: [low[column], high[column]] for column in low}}
+
+    def build_index(self):
+        """Bring the index up to date, summarizing only files that are new or changed since it was built
+
+        Called before every query, so batches written or rewritten after the first query are picked up.
+        """
+        if self.index is not None:
+            index = dict(self.index)
+        elif self.index_path.exists():
+            with open(self.index_path) as f:
+                index = json.load(f)
+        else:
+            index = {}
+        files = self.batch_files()
+        stale = [p for p in files if p.name not in index
+                 or index[p.name]["mtime"] != p.stat().st_mtime or index[p.name]["size"] != p.stat().st_size]
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+                for path, summary in zip(stale, pool.map(self.summarize_file, stale)):
+                    index[path.name] = summary
+        names = {p.name for p in files}
+        removed = [name for name in index if name not in names]
+        for name in removed:
+            del index[name]
+        if stale or removed:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.index_path, 'w') as f:
+                json.dump(index, f)
+            logging.debug(f"Indexed {len(stale)} changed batch files, dropped {len(removed)} in {self.folder}")
+        self.index = index
+        self.files = files
+        return index
+
+    @staticmethod
+    def may_match(column_range, op, value):
+        """Whether any value in [min, max] can satisfy the predicate"""
+        low, high = column_range
+        if op == '==':
+            return low <= value <= high
+        if op == '!=':
+            return not (low == high == value)
+        if op == '<':
+            return low < value
+        if op == '<=':
+            return low <= value
+        if op == '>':
+            return high > value
+        if op == '>=':
+            return high >= value
+        if op == 'between':
+            return low <= value[1] and high >= value[0]
+        return any(low <= v <= high for v in value)
+
+    @staticmethod
+    def covers(column_range, op, value):
+        """Whether every value in [min, max] satisfies the predicate"""
+        low, high = column_range
+        if op in ('<', '<=', '>', '>=', 'between'):
+            return bool(BatchQuery.row_mask(pd.DataFrame({'x': [low, high]}), [('x', op, value)]).all())
+        if op == '==':
+            return low == high == value
+        if op == '!=':
+            return not low <= value <= high
+        return low == high and low in value
+
+    @staticmethod
+    def row_mask(df, predicates):
+        """Boolean mask of the rows satisfying every predicate"""
+        mask = np.ones(len(df), dtype=bool)
+        for column, op, value in predicates:
+            values = df[column].to_numpy()
+            if op == '==':
+                mask &= values == value
+            elif op == '!=':
+                mask &= values != value
+            elif op == '<':
+                mask &= values < value
+            elif op == '<=':
+                mask &= values <= value
+            elif op == '>':
+                mask &= values > value
+            elif op == '>=':
+                mask &= values >= value
+            elif op == 'between':
+                mask &= (values >= value[0]) & (values <= value[1])
+            else:
+                mask &= np.isin(values, list(value))
+        return mask
+
+    def candidate_files(self, predicates):
+        """Batch files whose min/max ranges do not rule out the predicates"""
+        for _, op, _ in predicates:
+            if op not in self.OPERATORS:
+                raise ValueError(f"Unknown operator '{op}', expected one of {self.OPERATORS}")
+        index = self.build_index()
+        candidates = []
+        for path in self.files:
+            columns = index[path.name]["columns"]
+            # Columns missing from the index (non-numeric) cannot be used for skipping
+            if all(column not in columns or self.may_match(columns[column], op, value)
+                   for column, op, value in predicates):
+                candidates.append(path)
+        logging.debug(f"Predicates {predicates} keep {len(candidates)} of {len(index)} batch files")
+        return candidates
+
+    @staticmethod
+    def _put(results, item, stop):
+        """Put onto the bounded results queue, giving up once the consumer has stopped"""
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _scan_file(self, path, predicates, columns, results, stop):
+        """Read one batch file in chunks, pushing the matching rows onto the results queue"""
+        try:
+            for chunk in pd.read_csv(path, chunksize=self.chunk_size):
+                if stop.is_set():
+                    return
+                matched = chunk[self.row_mask(chunk, predicates)]
+                if len(matched) and not self._put(results, matched if columns is None else matched[columns], stop):
+                    return
+        except Exception as e:
+            logging.error(f"Error reading {path}: {e}")
+            self._put(results, e, stop)
+        finally:
+            self._put(results, None, stop)
+
+    def query(self, predicates, columns=None, max_pending=16):
+        """Stream DataFrame chunks of the rows matching every (column, op, value) predicate
+
+        Chunks arrive in completion order; at most max_pending chunks are buffered. Closing or abandoning the
+        generator stops the reader threads.
+        """
+        files = self.candidate_files(predicates)
+        if not files:
+            return
+        results = queue.Queue(maxsize=max_pending)
+        pending = queue.Queue()
+        for path in files:
+            pending.put(path)
+
+        stop = threading.Event()
+
+        def worker():
+            while not stop.is_set():
+                try:
+                    path = pending.get_nowait()
+                except queue.Empty:
+                    return
+                self._scan_file(path, predicates, columns, results, stop)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(self.num_workers, len(files)))]
+        for thread in threads:
+            thread.start()
+        try:
+            finished = 0
+            while finished < len(files):
+                item = results.get()
+                if item is None:
+                    finished += 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def to_frame(self, predicates, columns=None):
+        """All matching rows as one DataFrame"""
+        chunks = list(self.query(predicates, columns))
+        if not chunks:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(chunks, ignore_index=True)
+
+    def count(self, predicates):
+        """Number of matching rows; predicates covering whole batches are answered from the index alone"""
+        candidates = self.candidate_files(predicates)
+        index = self.index
+        total = 0
+        to_scan = []
+        for path in candidates:
+            columns = index[path.name]["columns"]
+            covered = all(column in columns and self.covers(columns[column], op, value)
+                          for column, op, value in predicates)
+            if covered:
+                total += index[path.name]["rows"]
+            else:
+                to_scan.append(path)
+        for path in to_scan:
+            for chunk in pd.read_csv(path, chunksize=self.chunk_size):
+                total += int(self.row_mask(chunk, predicates).sum())
+        return total
+
+# ## Run the Batch Query
+if __name__ == "__main__":
+    BatchQuery.init_logger()
+    fspl = BatchQuery(Path(__file__).resolve().parent.parent / 'fspl_batches')
+    predicates = [('frequency (Hz)', '==', 3.65e9), ('distance (ft)', '<', 2000)]
+    print(f"{len(fspl.candidate_files(predicates))} of {len(fspl.batch_files())} batch files can match")
+    rows = fspl.to_frame(predicates)
+    print(f"{len(rows)} rows at 3.65 GHz under 2000 ft")
@@ -0,0 +1,200 @@
+# Parallel Batch Reader Script for VEDA
+# This script reads a collection of CSV batches (fspl_batches/*.csv.zip, db_rssi/*.csv, gzip-compressed CSVs,
+# multi-member zip archives) as one dataset. Batches are decompressed and parsed with explicit dtypes in a
+# bounded thread or process pool and yielded as DataFrame or column-array chunks, in batch order or as soon as
+# they are ready. Workers hand over each chunk as it is parsed through a bounded queue, so a large batch never
+# sits in memory whole, and new batches are only started while the estimated in-flight bytes stay under a cap.
+
+# ## Import necessary libraries
+import os
+import gzip
+import queue
+import logging
+import zipfile
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from pathlib import Path
+import pandas as pd
+
+GZIP_EXPANSION_ESTIMATE = 4  # gzip does not record the uncompressed size reliably; CSVs compress about 4:1
+
+
+def _put(out, item, stop):
+    """Put into a bounded queue, giving up once the consumer has stopped"""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _read_part(file, member, read_kwargs, chunk_size, sequence, out, stop):
+    """Parse one CSV table (plain, gzip or zip member), putting (sequence, chunk) items on out as they are parsed
+
+    A (sequence, None) item always follows the last chunk, also when parsing fails, so the consumer never waits
+    on a batch that has ended; the error itself surfaces through the future.
+    """
+    try:
+        if member is not None:
+            with zipfile.ZipFile(file) as archive, archive.open(member) as handle:
+                _stream(pd.read_csv(handle, chunksize=chunk_size, **read_kwargs), sequence, out, stop)
+        elif str(file).endswith('.gz'):
+            with gzip.open(file, 'rb') as handle:
+                _stream(pd.read_csv(handle, chunksize=chunk_size, **read_kwargs), sequence, out, stop)
+        else:
+            with pd.read_csv(file, chunksize=chunk_size, **read_kwargs) as reader:
+                _stream(reader, sequence, out, stop)
+    finally:
+        _put(out, (sequence, None), stop)
+
+
+def _stream(reader, sequence, out, stop):
+    """Hand chunks over one at a time; the bounded queue stalls parsing until the consumer catches up"""
+    for chunk in reader:
+        if not _put(out, (sequence, chunk), stop):
+            return
+
+# ## Define the BatchReader class
+class BatchReader:
+    EXECUTORS = ('thread', 'process')
+    OUTPUTS = ('frame', 'arrays')
+
+    def __init__(self, source, pattern='*', dtype=None, columns=None, chunk_size=250000, executor='thread',
+                 num_workers=None, max_in_flight_bytes=256 * 1024**2):
+        """Initialize the BatchReader class
+
+        Parameters:
+        source (str or list): Batch folder, single batch file, or list of batch files
+        pattern (str): Glob for batch files when source is a folder
+        dtype (dict): Column name -> dtype, e.g. {'fspl (dB)': 'float32'}
+        columns (list): Columns to parse; others are skipped
+        chunk_size (int): Rows per yielded chunk
+        executor (str): 'thread' (parsing releases the GIL) or 'process'
+        num_workers (int): Pool size
+        max_in_flight_bytes (int): Cap on the uncompressed bytes of batches started but not yet consumed
+        """
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}', expected one of {self.EXECUTORS}")
+        self.source = source
+        self.pattern = pattern
+        self.read_kwargs = {"dtype": dtype, "usecols": columns}
+        self.chunk_size = chunk_size
+        self.executor = executor
+        self.num_workers = num_workers if num_workers is not None else min(os.cpu_count() or 1, 8)
+        self.max_in_flight_bytes = max_in_flight_bytes
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'batch_reader.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    def parts(self):
+        """(file, zip member or None, estimated uncompressed bytes) for every CSV table in the collection"""
+        if isinstance(self.source, (list, tuple)):
+            files = [Path(p) for p in self.source]
+        elif Path(self.source).is_dir():
+            files = sorted(p for p in Path(self.source).glob(self.pattern)
+                           if p.is_file() and p.name.endswith(('.csv', '.csv.gz', '.zip')))
+        else:
+            files = [Path(self.source)]
+        parts = []
+        for file in files:
+            if file.suffix == '.zip':
+                with zipfile.ZipFile(file) as archive:
+                    parts.extend((file, info.filename, info.file_size) for info in archive.infolist()
+                                 if info.filename.endswith('.csv'))
+            elif file.suffix == '.gz':
+                parts.append((file, None, file.stat().st_size * GZIP_EXPANSION_ESTIMATE))
+            else:
+                parts.append((file, None, file.stat().st_size))
+        return parts
+
+    def chunks(self, ordered=True, output='frame'):
+        """Yield parsed chunks of every batch
+
+        Parameters:
+        ordered (bool): Keep batch order; otherwise yield batches as they finish
+        output (str): 'frame' for DataFrames, 'arrays' for dicts of column name -> NumPy array
+        """
+        if output not in self.OUTPUTS:
+            raise ValueError(f"Unknown output '{output}', expected one of {self.OUTPUTS}")
+        pending = self.parts()
+        pending.reverse()
+        if self.executor == 'thread':
+            manager = None
+            pool_class, make_queue, stop = ThreadPoolExecutor, queue.Queue, threading.Event()
+        else:
+            manager = multiprocessing.Manager()  # Queue and event proxies can be passed to worker processes
+            pool_class, make_queue, stop = ProcessPoolExecutor, manager.Queue, manager.Event()
+        # Ordered reads give every batch its own one-chunk queue so a batch ahead of its turn stalls instead of
+        # buffering; unordered reads share one queue and take chunks from whichever batch is ready
+        shared = None if ordered else make_queue(maxsize=self.num_workers)
+        in_flight = {}  # sequence number -> (future, queue, estimated bytes); started and not yet fully yielded
+        in_flight_bytes = 0
+        sequence = 0
+        next_to_yield = 0
+
+        try:
+            with pool_class(max_workers=self.num_workers) as pool:
+                try:
+                    while pending or in_flight:
+                        # Start batches while under the byte cap; one batch always runs so oversized ones still load
+                        while pending and len(in_flight) < 2 * self.num_workers and \
+                                (not in_flight or in_flight_bytes + pending[-1][2] <= self.max_in_flight_bytes):
+                            file, member, size = pending.pop()
+                            out = shared if shared is not None else make_queue(maxsize=1)
+                            future = pool.submit(_read_part, file, member, self.read_kwargs, self.chunk_size,
+                                                 sequence, out, stop)
+                            in_flight[sequence] = (future, out, size)
+                            in_flight_bytes += size
+                            sequence += 1
+
+                        out = shared if shared is not None else in_flight[next_to_yield][1]
+                        number, chunk = out.get()
+                        if chunk is None:
+                            # Batches count against the cap until their last chunk has been consumed
+                            future, _, size = in_flight.pop(number)
+                            in_flight_bytes -= size
+                            future.result()  # Re-raise a parse error
+                            next_to_yield += 1
+                            continue
+                        yield chunk if output == 'frame' else \
+                            {name: chunk[name].to_numpy() for name in chunk.columns}
+                finally:
+                    # Unblock workers before the pool waits for them (consumer stopped early or a batch failed)
+                    stop.set()
+                    for future, _, _ in in_flight.values():
+                        future.cancel()
+        finally:
+            if manager is not None:
+                manager.shutdown()
+
+    def to_frame(self, ordered=True):
+        """The whole collection as one DataFrame"""
+        return pd.concat(self.chunks(ordered=ordered), ignore_index=True)
+
+# ## Run the Parallel Batch Reader
+if __name__ == "__main__":
+    import time
+
+    BatchReader.init_logger()
+    batch_folder = Path(__file__).resolve().parent.parent / 'fspl_batches'
+    reader = BatchReader(batch_folder, pattern='fspl_batch_*',
+                         dtype={'frequency (Hz)': 'float64', 'distance (ft)': 'int16', 'tx_gain (dBi)': 'int8',
+                                'rx_gain (dBi)': 'int8', 'fspl (dB)': 'float32'})
+    start = time.perf_counter()
+    rows = 0
+    for chunk in reader.chunks(ordered=False, output='arrays'):
+        rows += len(chunk['fspl (dB)'])
+    elapsed = time.perf_counter() - start
+    print(f"{rows} rows from {len(reader.parts())} batches in {elapsed:.2f} s ({rows / elapsed / 1e6:.1f} M rows/s)")
@@ -0,0 +1,244 @@
+# Block-Compressed Storage Script for VEDA
+# This script stores generated rows in fixed-size blocks that are compressed independently, instead of zip
+# archives of whole CSV files. Each block holds the typed column arrays of up to block_rows rows; a sidecar
+# index records every block's byte offset, row offset and per-column min/max. Reading a row range or a key
+# range (e.g. one frequency band) decompresses only the blocks it touches, in parallel, and generators can keep
+# appending rows to an existing store. With a CompactCodec, columns on a declared grid are stored as step counts,
+# the others as float32, and decoded on read.
+# String columns (e.g. environment names) are stored as int32 category codes with the category table in the index.
+
+# ## Import necessary libraries
+import os
+import json
+import zlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from compact_storage import CompactCodec
+
+# ## Define the BlockStore class
+class BlockStore:
+    def __init__(self, path, block_rows=65536, compression_level=6, num_workers=None, codec=None):
+        """Initialize the BlockStore class
+
+        Parameters:
+        path (str): Data file; the index is kept next to it as <path>.idx.json
+        block_rows (int): Rows per compressed block
+        compression_level (int): zlib level for new blocks
+        num_workers (int): Threads decompressing blocks (zlib releases the GIL)
+        codec (CompactCodec): Store columns in compact encodings (step counts for declared grids, else float32)
+        """
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + '.idx.json')
+        self.compression_level = compression_level
+        self.num_workers = num_workers if num_workers is not None else min(os.cpu_count() or 1, 8)
+        self.index = {"block_rows": block_rows, "columns": None, "encodings": None, "categories": {}, "blocks": []}
+        if self.index_path.exists():
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+            self.index.setdefault("categories", {})
+        self.block_rows = self.index["block_rows"]
+        self.known_categories = {name: set(values) for name, values in self.index["categories"].items()}
+        self.codec = codec or CompactCodec()  # Also encodes appends to a reopened compact store
+        self.compact = codec is not None
+        self.buffer = []  # Pending DataFrames not yet written as a full block
+        self.buffered_rows = 0
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'block_storage.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    def __len__(self):
+        """Rows written to blocks"""
+        blocks = self.index["blocks"]
+        return blocks[-1]["row_start"] + blocks[-1]["rows"] if blocks else 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    @staticmethod
+    def is_categorical(name, values):
+        """Whether a column is stored as category codes; raises for columns that can be stored neither way"""
+        if pd.api.types.is_bool_dtype(values.dtype) or pd.api.types.is_numeric_dtype(values.dtype):
+            return False
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.cat.categories.to_series()
+        if pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty'):
+            return True
+        raise ValueError(f"Column '{name}' has dtype {values.dtype}; "
+                         f"only numeric, bool and string columns can be stored")
+
+    def append(self, rows):
+        """Buffer rows (DataFrame or dict of arrays), writing every full block"""
+        df = pd.DataFrame(rows)
+        categories = self.index["categories"]
+        if self.index["columns"] is None:
+            for name in df.columns:
+                if self.is_categorical(name, df[name]):
+                    categories[name] = []
+                    self.known_categories[name] = set()
+            if self.compact:
+                self.index["encodings"] = self.codec.infer(df.drop(columns=list(categories)))
+            self.index["columns"] = [[name, self._storage_dtype(name, df[name])] for name in df.columns]
+        elif list(df.columns) != [name for name, _ in self.index["columns"]]:
+            raise ValueError(f"Columns {list(df.columns)} do not match the store schema {self.index['columns']}")
+        else:
+            for name in df.columns:
+                if self.is_categorical(name, df[name]) != (name in categories):
+                    raise ValueError(f"Column '{name}' has dtype {df[name].dtype}, "
+                                     f"which does not match the store schema")
+        # Categories only ever grow, so codes in blocks already written stay valid
+        for name, values in categories.items():
+            new = [value for value in pd.unique(df[name].dropna()) if value not in self.known_categories[name]]
+            values.extend(new)
+            self.known_categories[name].update(new)
+        self.buffer.append(df)
+        self.buffered_rows += len(df)
+        if self.buffered_rows >= self.block_rows:
+            pending = pd.concat(self.buffer, ignore_index=True)
+            full = len(pending) - len(pending) % self.block_rows
+            for start in range(0, full, self.block_rows):
+                self._write_block(pending.iloc[start:start + self.block_rows])
+            self.buffer = [pending.iloc[full:]] if full < len(pending) else []
+            self.buffered_rows = len(pending) - full
+            self._save_index()
+
+    def flush(self):
+        """Write the buffered rows as a final (possibly short) block"""
+        if self.buffered_rows:
+            self._write_block(pd.concat(self.buffer, ignore_index=True))
+            self.buffer = []
+            self.buffered_rows = 0
+        self._save_index()
+
+    def _storage_dtype(self, name, values):
+        """Dtype string a column is stored with in the blocks"""
+        if name in self.index["categories"]:
+            return np.dtype(np.int32).str
+        if self.index.get("encodings"):
+            return np.dtype(self.index["encodings"][name]["dtype"]).str
+        return values.to_numpy().dtype.str
+
+    def _write_block(self, df):
+        """Compress the column arrays of one block and append them to the data file"""
+        categories = self.index["categories"]
+        if self.index.get("encodings"):
+            arrays = self.codec.encode(df, self.index["encodings"])
+        else:
+            arrays = {name: df[name].to_numpy(dtype=np.dtype(dtype)) for name, dtype in self.index["columns"]
+                      if name not in categories}
+        for name, values in categories.items():
+            arrays[name] = pd.Categorical(df[name], categories=values).codes.astype(np.int32)  # Missing -> -1
+        payload = b''.join(np.ascontiguousarray(arrays[name]).tobytes() for name, _ in self.index["columns"])
+        compressed = zlib.compress(payload, self.compression_level)
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            f.write(compressed)
+        numeric = df.select_dtypes(include=['number', 'bool'])  # Bool ranges are [0, 1] subsets
+        self.index["blocks"].append({
+            "offset": offset, "length": len(compressed), "row_start": len(self), "rows": len(df),
+            "ranges": {name: [float(numeric[name].min()), float(numeric[name].max())] for name in numeric.columns}})
+
+    def _save_index(self):
+        """Write the index atomically after the blocks it describes"""
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def read_block(self, block_number):
+        """Decompress one block into a DataFrame"""
+        block = self.index["blocks"][block_number]
+        with open(self.path, 'rb') as f:
+            f.seek(block["offset"])
+            payload = zlib.decompress(f.read(block["length"]))
+        columns = {}
+        position = 0
+        for name, dtype in self.index["columns"]:
+            dtype = np.dtype(dtype)
+            size = block["rows"] * dtype.itemsize
+            columns[name] = np.frombuffer(payload, dtype=dtype, count=block["rows"], offset=position)
+            position += size
+        categories = self.index["categories"]
+        codes = {name: columns.pop(name) for name in categories}
+        if self.index.get("encodings"):
+            df = CompactCodec.decode(columns, self.index["encodings"])
+        else:
+            df = pd.DataFrame(columns)
+        if not categories:
+            return df
+        for name, values in categories.items():
+            df[name] = pd.Categorical.from_codes(codes[name], categories=values)
+        return df[[name for name, _ in self.index["columns"]]]
+
+    def read_blocks(self, block_numbers):
+        """Decompress several blocks in parallel and concatenate them in order"""
+        if not block_numbers:
+            decoded = bool(self.index.get("encodings"))
+            categories = self.index["categories"]
+            return pd.DataFrame({name: pd.Categorical([], categories=categories[name]) if name in categories
+                                 else np.empty(0, dtype=np.float64 if decoded else dtype)
+                                 for name, dtype in self.index["columns"] or []})
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            frames = list(pool.map(self.read_block, block_numbers))
+        return pd.concat(frames, ignore_index=True)
+
+    def read_rows(self, start, stop):
+        """Rows [start, stop), decompressing only the blocks that overlap them"""
+        stop = min(stop, len(self))
+        blocks = self.index["blocks"]
+        row_starts = [block["row_start"] for block in blocks]
+        first = max(int(np.searchsorted(row_starts, start, side='right')) - 1, 0)
+        last = int(np.searchsorted(row_starts, stop, side='left'))
+        selected = list(range(first, last))
+        df = self.read_blocks(selected)
+        offset = blocks[first]["row_start"] if selected else 0
+        return df.iloc[start - offset:stop - offset].reset_index(drop=True)
+
+    def read_range(self, column, low, high):
+        """Rows whose column lies in [low, high], decompressing only blocks whose key range overlaps"""
+        if column in self.index["categories"]:
+            raise ValueError(f"Column '{column}' holds strings; read_range needs a numeric or bool column")
+        names = [name for name, _ in self.index["columns"] or []]
+        if column not in names:
+            raise ValueError(f"Unknown column '{column}', expected one of {names}")
+        # Blocks without a range for the column (bool columns in stores written before they were recorded) are read
+        selected = [i for i, block in enumerate(self.index["blocks"]) if column not in block["ranges"]
+                    or (block["ranges"][column][0] <= high and block["ranges"][column][1] >= low)]
+        logging.debug(f"{column} in [{low}, {high}] reads {len(selected)} of {len(self.index['blocks'])} blocks")
+        df = self.read_blocks(selected)
+        return df[(df[column] >= low) & (df[column] <= high)].reset_index(drop=True)
+
+# ## Run the Block-Compressed Storage
+if __name__ == "__main__":
+    import time
+    from batch_reader import BatchReader
+
+    BlockStore.init_logger()
+    batch_folder = Path(__file__).resolve().parent.parent / 'fspl_batches'
+    reader = BatchReader(batch_folder, pattern='fspl_batch_*')
+    with BlockStore('fspl.blk') as store:
+        for chunk in reader.chunks():
+            store.append(chunk)
+    print(f"{len(store)} rows in {len(store.index['blocks'])} blocks, {store.path.stat().st_size / 1e6:.1f} MB")
+
+    start = time.perf_counter()
+    rows = store.read_rows(3000000, 3000010)
+    print(f"Rows 3000000-3000010 in {(time.perf_counter() - start) * 1e3:.1f} ms")
+    start = time.perf_counter()
+    band = store.read_range('frequency (Hz)', 2.4e9, 2.5e9)
+    print(f"{len(band)} rows in 2.4-2.5 GHz in {(time.perf_counter() - start) * 1e3:.1f} ms")
@@ -0,0 +1,181 @@
+# Compact Typed Storage Script for VEDA
+# This script encodes generated columns in the smallest exact typed form instead of CSV text. Columns on a step
+# grid (gains on 0.5 dB steps, integer distances, frequencies on a MHz raster, ...) are stored as 16- or 32-bit
+# step counts with their scale and offset kept as metadata; derived dB outputs are stored as float32. Decoding
+# restores float64 columns, so loaders see the same values as before. Only columns whose grid is declared (steps=,
+# encodings= or the generator's grid spec through CompactCodec.from_grid()) are quantized; every other column is
+# stored as float32, so a first chunk that happens to sit on a coarse grid cannot fix an encoding later chunks break.
+# BlockStore(codec=...) uses the same encodings per block; save_compact()/load_compact() do it for one .npz file.
+
+# ## Import necessary libraries
+import os
+import json
+import logging
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+STEP_CANDIDATES = (1e6, 1e3, 10.0, 1.0, 0.5, 0.25, 0.1)  # Tried coarsest first on a full grid axis
+QUANTIZED_LIMITS = {'uint16': (0, 65535), 'int16': (-32768, 32767),
+                    'uint32': (0, 4294967295), 'int32': (-2147483648, 2147483647)}
+QUANTIZED_DTYPES = (('uint16', 'int16'), ('uint32', 'int32'))  # (unsigned, signed), narrowest first
+HEADROOM = 4  # Encodings from steps= fit counts up to this multiple of the first chunk's largest magnitude
+
+# ## Define the CompactCodec class
+class CompactCodec:
+    def __init__(self, steps=None, encodings=None, float_dtype='float32', rtol=1e-9, headroom=HEADROOM):
+        """Initialize the CompactCodec class
+
+        Parameters:
+        steps (dict): Column name -> grid step; the integer type is sized from the first chunk with headroom
+        encodings (dict): Column name -> explicit encoding, used as given
+        float_dtype (str): Storage type of every column without a declared step or encoding
+        rtol (float): Relative tolerance for a value to count as on the grid
+        headroom (float): Integer types for steps= columns must fit this multiple of the largest count seen
+        """
+        self.steps = steps or {}
+        self.encodings = encodings or {}
+        self.float_dtype = float_dtype
+        self.rtol = rtol
+        self.headroom = headroom
+
+    @classmethod
+    def from_grid(cls, grid, **kwargs):
+        """Codec with explicit encodings for the axis columns of a generator's grid spec
+
+        The full range of every axis is known up front, so each axis gets its coarsest exact step and the
+        narrowest type holding the whole axis, without headroom. Columns outside the grid are stored as floats.
+
+        Parameters:
+        grid (dict): Axis column name -> all values of that axis
+        """
+        codec = cls(**kwargs)
+        for name, values in grid.items():
+            values = np.asarray(values, dtype=np.float64)
+            encoding = None
+            if np.all(np.isfinite(values)):
+                for step in STEP_CANDIDATES:
+                    encoding = codec.quantized_encoding(values, step)
+                    if encoding is not None:
+                        break
+            codec.encodings.setdefault(name, encoding or {"dtype": codec.float_dtype})
+        return codec
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'compact_storage.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    def on_grid(self, values, scale, offset=0.0):
+        """Whether every value is offset + k * scale for an integer k"""
+        counts = np.round((values - offset) / scale)
+        return bool(np.all(np.abs(counts * scale + offset - values) <= self.rtol * np.maximum(np.abs(values), 1.0)))
+
+    def quantized_encoding(self, values, scale, offset=0.0, headroom=1):
+        """Encoding of a column as the narrowest integer step counts holding headroom times the counts seen,
+        or None when the values are off the grid or even 32 bits are too narrow"""
+        if not self.on_grid(values, scale, offset):
+            return None
+        counts = np.round((values - offset) / scale)
+        signed = bool(counts.min() < 0)
+        for dtypes in QUANTIZED_DTYPES:
+            dtype = dtypes[signed]
+            low, high = QUANTIZED_LIMITS[dtype]
+            if counts.min() * headroom >= low and counts.max() * headroom <= high:
+                return {"dtype": dtype, "scale": float(scale), "offset": float(offset)}
+        return None
+
+    def infer_column(self, name, values, headroom):
+        """Encoding of one column: its explicit encoding, its declared step, or float_dtype"""
+        if name in self.encodings:
+            return self.encodings[name]
+        if name in self.steps:
+            encoding = self.quantized_encoding(values, self.steps[name], headroom=headroom)
+            if encoding is None:
+                raise ValueError(f"Column '{name}' is not on a {self.steps[name]} step grid within 32 bits")
+            return encoding
+        return {"dtype": self.float_dtype}
+
+    def infer(self, df):
+        """Column name -> encoding, from the first chunk of a dataset"""
+        encodings = {name: self.infer_column(name, df[name].to_numpy(dtype=np.float64), self.headroom)
+                     for name in df.columns}
+        logging.debug(f"Inferred encodings {encodings}")
+        return encodings
+
+    def encode(self, df, encodings):
+        """Column name -> typed array, checking that quantized values stay on their grid and in range"""
+        arrays = {}
+        for name, encoding in encodings.items():
+            values = df[name].to_numpy(dtype=np.float64)
+            if "scale" not in encoding:
+                arrays[name] = values.astype(encoding["dtype"])
+                continue
+            low, high = QUANTIZED_LIMITS[encoding["dtype"]]
+            counts = np.round((values - encoding["offset"]) / encoding["scale"])
+            if not self.on_grid(values, encoding["scale"], encoding["offset"]) \
+                    or counts.min() < low or counts.max() > high:
+                raise ValueError(f"Column '{name}' no longer fits its encoding {encoding}")
+            arrays[name] = counts.astype(encoding["dtype"])
+        return arrays
+
+    @staticmethod
+    def decode(arrays, encodings):
+        """DataFrame of float64 columns from encoded arrays"""
+        columns = {}
+        for name, encoding in encodings.items():
+            values = np.asarray(arrays[name])
+            if "scale" in encoding:
+                columns[name] = values * encoding["scale"] + encoding["offset"]
+            else:
+                columns[name] = values.astype(np.float64)
+        return pd.DataFrame(columns)
+
+
+def save_compact(df, path, codec=None):
+    """Write a DataFrame as a compressed .npz of encoded columns with the encodings alongside"""
+    codec = codec or CompactCodec()
+    encodings = codec.infer(df)
+    np.savez_compressed(path, __encodings__=np.array(json.dumps(encodings)), **codec.encode(df, encodings))
+
+
+def load_compact(path):
+    """Read a file written by save_compact back as float64 columns"""
+    with np.load(path) as data:
+        encodings = json.loads(str(data['__encodings__']))
+        return CompactCodec.decode({name: data[name] for name in encodings}, encodings)
+
+# ## Run the Compact Typed Storage
+if __name__ == "__main__":
+    from batch_reader import BatchReader
+    from block_storage import BlockStore
+
+    CompactCodec.init_logger()
+    batch_folder = Path(__file__).resolve().parent.parent / 'fspl_batches'
+    reader = BatchReader(batch_folder, pattern='fspl_batch_*')
+    rows = reader.to_frame()
+    csv_bytes = rows.to_csv(index=False).encode()
+
+    codec = CompactCodec(steps={'frequency (Hz)': 1e6, 'distance (ft)': 1.0, 'tx_gain (dBi)': 1.0,
+                                'rx_gain (dBi)': 1.0})
+    encodings = codec.infer(rows)
+    encoded = codec.encode(rows, encodings)
+    decoded = CompactCodec.decode(encoded, encodings)
+    error = (decoded['fspl (dB)'] - rows['fspl (dB)']).abs().max()
+    raw_bytes = sum(array.nbytes for array in encoded.values())
+    print(f"{len(rows)} rows: CSV text {len(csv_bytes) / 1e6:.1f} MB, float64 {rows.memory_usage(index=False).sum() / 1e6:.1f} MB, "
+          f"compact {raw_bytes / 1e6:.1f} MB (max fspl error {error:.1e} dB)")
+    for name, encoding in encodings.items():
+        print(f"  {name}: {encoding}")
+
+    with BlockStore('fspl_compact.blk', codec=codec) as store:
+        for chunk in reader.chunks():
+            store.append(chunk)
+    print(f"Block store with compact encodings: {store.path.stat().st_size / 1e6:.1f} MB")
@@ -6,6 +6,9 @@ from pathlib import Path
 from zipfile import ZipFile, ZIP_DEFLATED
 from tqdm import tqdm
 
+from sample_design import SampleDesign
+from async_writer import AsyncDatasetWriter
+
 class FSPL:
     def __init__(self, frequency, distance_ft, tx_gain, rx_gain):
         """Initialize the FSPL class with imperial units"""
@@ -33,6 +36,27 @@ class FSPL:
             for r in results:
                 f.write(f"{r}\n")
 
+    @staticmethod
+    def write_batch(batch):
+        """Write one (batch_num, results) batch to its results file, CSV file and zip archive"""
+        batch_num, results = batch
+        FSPL.log_results(results, batch_num)
+
+        db_folder = f"db_fspld_batch_{batch_num}"
+        Path(db_folder).mkdir(parents=True, exist_ok=True)
+        db_filename = f"{db_folder}/fspld.csv"
+
+        with open(db_filename, 'w') as csvfile:
+            header = "lambda,FSPL_ft\n"
+            csvfile.write(header)
+
+            for r in results:
+                if r is not None:
+                    line = f"{r['lambda']},{r['FSPL_ft']}\n"
+                    csvfile.write(line)
+
+        FSPL.compress_database(db_folder)
+
     @staticmethod
     def calculate_in_parallel(params):
         """Calculate FSPL in parallel"""
@@ -43,56 +67,57 @@ class FSPL:
             return None
 
     @staticmethod
-    def calculate_fspld(frequency, distance_ft, tx_gain, rx_gain):
-        """Calculate FSPL"""
+    def calculate_fspld(frequency, distance_ft, tx_gain, rx_gain, weather=None):
+        """Calculate FSPL, plus gaseous and rain attenuation when weather (AtmosphericAttenuation) is given"""
         # Convert input distances to meters
         distance = distance_ft * 0.3048  # in meters
 
         fspld = 20 * math.log10(distance) + 20 * math.log10(frequency) + 20 * math.log10(4 * math.pi / 0.3048) - 147.55 + tx_gain + rx_gain
+        if weather is not None:
+            fspld += float(weather.calculate_attenuation(frequency, distance_ft))
 
         return {"lambda": distance / frequency, "FSPL_ft": fspld}
 
-    def calculate(self, batch_size=1000):
-        """Calculate FSPL for a range of parameters"""
+    def calculate(self, batch_size=1000, sampling=None, num_rows=None, seed=None, weather=None):
+        """Calculate FSPL for a range of parameters
+
+        With sampling set to 'lhs', 'sobol' or 'stratified', num_rows space-filling samples
+        are drawn over the same ranges instead of the full Cartesian product.
+        weather (AtmosphericAttenuation) adds gaseous and rain attenuation to every row.
+        """
         # Define ranges for frequency, distance, tx_gain, and rx_gain
         frequency_range = range(700, 3001, 50)  # 700 MHz to 3000 MHz in steps of 50 MHz
         distance_range = range(5, 751, 5)  # 5 ft to 750 ft in steps of 5 ft
         tx_gain_range = range(0, 16, 1)  # 0 dBi to 15 dBi in steps of 1 dBi
         rx_gain_range = range(0, 16, 1)  # 0 dBi to 15 dBi in steps of 1 dBi
 
-        params = [(freq, dist, tx_gain, rx_gain) for freq in frequency_range for dist in distance_range for tx_gain in tx_gain_range for rx_gain in rx_gain_range]
+        if sampling is not None:
+            design = SampleDesign({'frequency': frequency_range, 'distance_ft': distance_range,
+                                   'tx_gain': tx_gain_range, 'rx_gain': rx_gain_range}, method=sampling, seed=seed)
+            params = design.sample_tuples(num_rows)
+        else:
+            params = [(freq, dist, tx_gain, rx_gain) for freq in frequency_range for dist in distance_range for tx_gain in tx_gain_range for rx_gain in rx_gain_range]
+        if weather is not None:
+            params = [p + (weather,) for p in params]
 
         num_cpus = min(cpu_count(), 16)  # Limit to 16 cores
         logging.debug(f"Using {num_cpus} CPU cores for parallel processing")
 
         total_batches = len(params) // batch_size + (1 if len(params) % batch_size != 0 else 0)
-        for batch_num in range(total_batches):
-            start_index = batch_num * batch_size
-            end_index = min((batch_num + 1) * batch_size, len(params))
-            batch_params = params[start_index:end_index]
-
-            results = []
-            with Pool(processes=num_cpus) as pool:
-                for result in tqdm(pool.imap_unordered(FSPL.calculate_in_parallel, batch_params), total=len(batch_params)):
-                    if result is not None:
-                        results.append(result)
-
-            self.log_results(results, batch_num)
-
-            db_folder = f"db_fspld_batch_{batch_num}"
-            Path(db_folder).mkdir(parents=True, exist_ok=True)
-            db_filename = f"{db_folder}/fspld.csv"
-
-            with open(db_filename, 'w') as csvfile:
-                header = "lambda,FSPL_ft\n"
-                csvfile.write(header)
-
-                for r in results:
-                    if r is not None:
-                        line = f"{r['lambda']},{r['FSPL_ft']}\n"
-                        csvfile.write(line)
-
-            self.compress_database(db_folder)
+        # Batch N is written and compressed in the background while batch N+1 is computed
+        with AsyncDatasetWriter(FSPL.write_batch) as writer:
+            for batch_num in range(total_batches):
+                start_index = batch_num * batch_size
+                end_index = min((batch_num + 1) * batch_size, len(params))
+                batch_params = params[start_index:end_index]
+
+                results = []
+                with Pool(processes=num_cpus) as pool:
+                    for result in tqdm(pool.imap_unordered(FSPL.calculate_in_parallel, batch_params), total=len(batch_params)):
+                        if result is not None:
+                            results.append(result)
+
+                writer.submit((batch_num, results), rows=len(results))
 
     @staticmethod
     def compress_database(db_folder):
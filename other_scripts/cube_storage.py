@@ -0,0 +1,174 @@
+# Grid Cube Storage Script for VEDA
+# This script stores dense parameter sweeps (frequency x distance x tx_gain x rx_gain, ...) as N-dimensional
+# HDF5 datasets instead of long-format CSV rows that repeat every coordinate. Each output quantity is one
+# chunked, shuffled and compressed dataset; axis coordinates are 1-D datasets under /axes attached as HDF5
+# dimension scales, so axes of any length fit. Chunks span a single index of the slicing axis (frequency by
+# default), so reading one frequency is a direct chunk read.
+
+# ## Import necessary libraries
+import os
+import logging
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import h5py
+
+TARGET_CHUNK_BYTES = 1024**2  # Upper bound for one chunk before compression
+
+# ## Define the GridCube class
+class GridCube:
+    def __init__(self, path):
+        """Initialize the GridCube class"""
+        self.path = Path(path)  # HDF5 file holding the cube
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'cube_storage.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def chunk_shape(shape, itemsize, slice_axis=0, target_bytes=TARGET_CHUNK_BYTES):
+        """Chunk of extent 1 along the slicing axis and as much of the other axes as fits the target size"""
+        chunk = list(shape)
+        if slice_axis is not None:
+            chunk[slice_axis] = 1
+        # Halve the largest other axis until the chunk fits
+        while np.prod(chunk) * itemsize > target_bytes:
+            axis = int(np.argmax([c if i != slice_axis else 0 for i, c in enumerate(chunk)]))
+            if chunk[axis] == 1:
+                break
+            chunk[axis] = (chunk[axis] + 1) // 2
+        return tuple(max(1, int(c)) for c in chunk)
+
+    def write(self, axes, quantities, slice_axis=None, dtype=np.float32, compression='gzip', compression_opts=4):
+        """Write each quantity as a chunked, compressed dataset over the named axes
+
+        Parameters:
+        axes (dict): Axis name -> coordinate array, in the quantities' dimension order
+        quantities (dict): Quantity name -> array of shape (len(axis) for axis in axes)
+        slice_axis (str): Axis most often fixed when reading (chunks span one index of it); defaults to the first
+        """
+        names = list(axes)
+        slice_index = names.index(slice_axis) if slice_axis is not None else 0
+        shape = tuple(len(axes[name]) for name in names)
+        # Write next to the target and swap it in, so a failed write never leaves a truncated cube behind
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        try:
+            with h5py.File(tmp_path, 'w') as f:
+                f.attrs['axes'] = names
+                scales = f.create_group('axes')
+                for name in names:
+                    scales.create_dataset(name, data=np.asarray(axes[name])).make_scale(name)
+                for quantity, values in quantities.items():
+                    values = np.asarray(values, dtype=dtype)
+                    if values.shape != shape:
+                        raise ValueError(f"Quantity '{quantity}' has shape {values.shape}, expected {shape}")
+                    chunks = self.chunk_shape(shape, values.itemsize, slice_index)
+                    dataset = f.create_dataset(quantity, data=values, chunks=chunks, shuffle=True,
+                                               compression=compression, compression_opts=compression_opts)
+                    for i, name in enumerate(names):
+                        dataset.dims[i].attach_scale(scales[name])
+                        dataset.dims[i].label = name
+                    logging.debug(f"Wrote {quantity} {shape} in {chunks} chunks to {self.path}")
+            os.replace(tmp_path, self.path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return self
+
+    @staticmethod
+    def from_long_frame(df, axis_columns, value_columns):
+        """Pivot long-format rows into dense cubes; grid points without a row are NaN"""
+        axes = {column: np.unique(df[column].to_numpy()) for column in axis_columns}
+        index = tuple(np.searchsorted(axes[column], df[column].to_numpy()) for column in axis_columns)
+        shape = tuple(len(values) for values in axes.values())
+        quantities = {}
+        for column in value_columns:
+            cube = np.full(shape, np.nan)
+            cube[index] = df[column].to_numpy()
+            quantities[column] = cube
+        return axes, quantities
+
+    @staticmethod
+    def coordinates(f):
+        """Axis name -> coordinate array of an open cube file (attributes in cubes written before /axes)"""
+        if 'axes' in f:
+            return {name: f['axes'][name][()] for name in f.attrs['axes']}
+        return {name: f.attrs[f'axis:{name}'] for name in f.attrs['axes']}
+
+    def axes(self):
+        """Axis name -> coordinate array"""
+        with h5py.File(self.path, 'r') as f:
+            return self.coordinates(f)
+
+    def quantities(self):
+        """Names of the stored quantities"""
+        with h5py.File(self.path, 'r') as f:
+            return [name for name in f.keys() if name != 'axes']
+
+    @staticmethod
+    def axis_selection(coordinates, selection):
+        """Index (or slice) into an axis for a coordinate value, a (low, high) range or None for everything"""
+        if selection is None:
+            return slice(None)
+        if isinstance(selection, tuple):
+            low, high = selection
+            return slice(int(np.searchsorted(coordinates, low, side='left')),
+                         int(np.searchsorted(coordinates, high, side='right')))
+        # The nearest grid point lies on either side of the insertion point
+        position = int(np.searchsorted(coordinates, selection))
+        neighbours = [i for i in (position - 1, position) if 0 <= i < len(coordinates)]
+        nearest = min(neighbours, key=lambda i: abs(coordinates[i] - selection), default=None)
+        if nearest is None or not np.isclose(coordinates[nearest], selection):
+            raise KeyError(f"{selection} is not on the axis grid")
+        return nearest
+
+    def read(self, quantity, **selection):
+        """Read a quantity, selecting axes by coordinate value or (low, high) range
+
+        Returns the array and the coordinates of the axes that remain.
+        """
+        with h5py.File(self.path, 'r') as f:
+            names = list(f.attrs['axes'])
+            unknown = set(selection) - set(names)
+            if unknown:
+                raise KeyError(f"Unknown axes {sorted(unknown)}, expected some of {names}")
+            coordinates = self.coordinates(f)
+            index = tuple(self.axis_selection(coordinates[name], selection.get(name)) for name in names)
+            values = f[quantity][index]
+        remaining = {name: coordinates[name][i] for name, i in zip(names, index) if isinstance(i, slice)}
+        return values, remaining
+
+    def to_long_frame(self, quantity_names=None, **selection):
+        """Read back long-format rows, one column per axis and quantity"""
+        quantity_names = quantity_names or self.quantities()
+        columns = {}
+        for quantity in quantity_names:
+            values, remaining = self.read(quantity, **selection)
+            columns[quantity] = values.ravel()
+        grids = np.meshgrid(*remaining.values(), indexing='ij')
+        frame = pd.DataFrame({name: grid.ravel() for name, grid in zip(remaining, grids)})
+        for quantity, values in columns.items():
+            frame[quantity] = values
+        return frame
+
+# ## Run the Grid Cube Conversion
+if __name__ == "__main__":
+    GridCube.init_logger()
+    batch_folder = Path(__file__).resolve().parent.parent / 'fspl_batches'
+    batch_files = sorted(batch_folder.glob('fspl_batch_*.csv*'))  # Plain and zipped batches
+    rows = pd.concat((pd.read_csv(path) for path in batch_files), ignore_index=True)
+    axes, quantities = GridCube.from_long_frame(
+        rows, ['frequency (Hz)', 'distance (ft)', 'tx_gain (dBi)', 'rx_gain (dBi)'], ['fspl (dB)'])
+    cube = GridCube('fspl_cube.h5').write(axes, quantities, slice_axis='frequency (Hz)')
+
+    csv_bytes = sum(path.stat().st_size for path in batch_files)
+    print(f"{len(rows)} rows: zipped CSV {csv_bytes / 1e6:.1f} MB, HDF5 cube {cube.path.stat().st_size / 1e6:.1f} MB")
+    fspl, remaining = cube.read('fspl (dB)', **{'frequency (Hz)': axes['frequency (Hz)'][10]})
+    print(f"One frequency slice: {fspl.shape} over {list(remaining)}")
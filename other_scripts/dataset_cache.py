@@ -0,0 +1,147 @@
+# Content-Addressed Dataset Cache Script for VEDA
+# This script caches generated datasets under keys that hash the kernel source (or an explicit version), the
+# grid specification and the output format, so re-running a generator with the same ranges returns the existing
+# artifacts instead of recomputing them. Grids are split into partitions along one axis (frequency by default);
+# each partition has its own key, so an extended range reuses cached partitions and computes only the new ones.
+# generate_link_budget_data.py and rssi_calculation.py go through the cache when their scripts are run.
+
+# ## Import necessary libraries
+import os
+import json
+import hashlib
+import inspect
+import logging
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# ## Define the DatasetCache class
+class DatasetCache:
+    FORMATS = ('csv', 'csv.zip')
+
+    def __init__(self, cache_dir='dataset_cache'):
+        """Initialize the DatasetCache class"""
+        self.cache_dir = Path(cache_dir)  # Root folder of the artifacts and manifests
+        self.hits = 0  # Partitions served from the cache
+        self.misses = 0  # Partitions computed
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'dataset_cache.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def kernel_fingerprint(kernel, version=None, dependencies=()):
+        """Hash of the kernel's source and its dependencies' sources, or of an explicit version string"""
+        if version is not None:
+            return f"{kernel.__module__}.{kernel.__qualname__}@{version}"
+        digest = hashlib.blake2b(digest_size=16)
+        for func in (kernel, *dependencies):
+            digest.update(inspect.getsource(func).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def grid_spec(grid):
+        """Canonical, hashable description of a grid: axis name -> list of values"""
+        return {name: np.asarray(values).tolist() for name, values in grid.items()}
+
+    @staticmethod
+    def make_key(*parts):
+        """Content key over JSON-serializable parts; objects such as AtmosphericAttenuation hash by their attributes"""
+        payload = json.dumps(parts, sort_keys=True, separators=(',', ':'),
+                             default=lambda o: {type(o).__name__: vars(o)}).encode()
+        return hashlib.blake2b(payload, digest_size=20).hexdigest()
+
+    def artifact_path(self, key, fmt):
+        """Location of an artifact, fanned out by the first two key characters"""
+        return self.cache_dir / key[:2] / f"{key}.{fmt}"
+
+    @staticmethod
+    def write_frame(df, path, fmt):
+        """Write atomically, so a crash never leaves a partial artifact under a valid key"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        if fmt == 'csv.zip':
+            df.to_csv(tmp_path, index=False, compression={'method': 'zip', 'archive_name': path.stem})
+        else:
+            df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def get_or_compute(self, kernel, grid, fmt='csv.zip', partition_axis=None, version=None, dependencies=(),
+                       kernel_kwargs=None):
+        """Artifact paths (one per partition) for kernel(**grid), computing only what the cache lacks
+
+        Parameters:
+        kernel (callable): Takes one keyword array per grid axis and returns a DataFrame for that sub-grid
+        grid (dict): Axis name -> values
+        fmt (str): 'csv' or 'csv.zip'
+        partition_axis (str): Axis split into one partition per value; defaults to the first axis
+        version (str): Explicit kernel version; when omitted the kernel source is hashed
+        dependencies (tuple): Further functions whose source is part of the kernel fingerprint
+        kernel_kwargs (dict): Extra keyword arguments passed to the kernel and made part of every key
+        """
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}', expected one of {self.FORMATS}")
+        kernel_kwargs = kernel_kwargs or {}
+        fingerprint = [self.kernel_fingerprint(kernel, version, dependencies), kernel_kwargs]
+        spec = self.grid_spec(grid)
+        partition_axis = partition_axis or next(iter(spec))
+
+        # Whole-request manifest: an exact repeat is a single file read
+        manifest_path = self.artifact_path(self.make_key(fingerprint, fmt, partition_axis, spec), 'json')
+        if manifest_path.exists():
+            with open(manifest_path) as f:
+                paths = [Path(p) for p in json.load(f)]
+            if all(p.exists() for p in paths):
+                self.hits += len(paths)
+                logging.debug(f"Manifest hit {manifest_path.name} ({len(paths)} partitions)")
+                return paths
+
+        others = {name: values for name, values in spec.items() if name != partition_axis}
+        paths = []
+        for value in spec[partition_axis]:
+            key = self.make_key(fingerprint, fmt, others, partition_axis, value)
+            path = self.artifact_path(key, fmt)
+            if path.exists():
+                self.hits += 1
+            else:
+                self.misses += 1
+                df = kernel(**{partition_axis: np.array([value])}, **{k: np.asarray(v) for k, v in others.items()},
+                            **kernel_kwargs)
+                self.write_frame(df, path, fmt)
+            paths.append(path)
+
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(manifest_path, 'w') as f:
+            json.dump([str(p) for p in paths], f)
+        logging.debug(f"{self.hits} partitions reused, {self.misses} computed so far")
+        return paths
+
+    @staticmethod
+    def load(paths):
+        """Concatenate cached partitions into one DataFrame"""
+        return pd.concat((pd.read_csv(p) for p in paths), ignore_index=True)
+
+# ## Run the Dataset Cache
+if __name__ == "__main__":
+    import time
+    from rssi_calculation import RSSI
+
+    DatasetCache.init_logger()
+    cache = DatasetCache()
+    grid = {'pr': np.arange(-100, 0, 1), 'path_loss': np.arange(0, 150, 1), 'nf': np.arange(0, 10, 0.5)}
+    for label, pr_values in (('first run', np.arange(-100, 0, 1)), ('repeat', np.arange(-100, 0, 1)),
+                             ('extended range', np.arange(-110, 0, 1))):
+        grid['pr'] = pr_values
+        start = time.perf_counter()
+        paths = cache.get_or_compute(RSSI.calculate_rssi_grid, grid, partition_axis='pr',
+                                     dependencies=(RSSI.calculate_rssi,))
+        print(f"{label}: {len(paths)} partitions in {time.perf_counter() - start:.2f} s "
+              f"({cache.hits} hits, {cache.misses} misses so far)")
@@ -0,0 +1,238 @@
+# Dataset Catalog Script for VEDA
+# This script keeps one JSON catalog of the generated dataset artifacts (db_rssi/, db_rssi.zip, fspl_batches/,
+# link_budget_data.zip, ...). Each dataset is registered with a canonical schema (column names and units shared
+# across generators), its row count, per-column min/max in canonical units and per-file checksums, so planners
+# and loaders can answer metadata questions and pick the files to read without decompressing anything.
+
+# ## Import necessary libraries
+import os
+import re
+import json
+import hashlib
+import logging
+import zipfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+CATALOG_FILENAME = 'dataset_catalog.json'
+FEET_PER_METER = 1 / 0.3048
+
+# Source column name -> (canonical name, canonical unit, factor from the source unit to the canonical unit)
+CANONICAL_COLUMNS = {
+    'Frequency_MHz': ('frequency', 'MHz', 1.0),
+    'Frequency (MHz)': ('frequency', 'MHz', 1.0),
+    'frequency (Hz)': ('frequency', 'MHz', 1e-6),
+    'Distance_ft': ('distance', 'ft', 1.0),
+    'distance (ft)': ('distance', 'ft', 1.0),
+    'Distance (m)': ('distance', 'ft', FEET_PER_METER),
+    'Tx_Power_dBm': ('tx_power', 'dBm', 1.0),
+    'Tx_Gain_dBi': ('tx_gain', 'dBi', 1.0),
+    'Tx Gain (dBi)': ('tx_gain', 'dBi', 1.0),
+    'tx_gain (dBi)': ('tx_gain', 'dBi', 1.0),
+    'Rx_Gain_dBi': ('rx_gain', 'dBi', 1.0),
+    'Rx Gain (dBi)': ('rx_gain', 'dBi', 1.0),
+    'rx_gain (dBi)': ('rx_gain', 'dBi', 1.0),
+    'Losses_Tx_dB': ('tx_losses', 'dB', 1.0),
+    'Losses_Rx_dB': ('rx_losses', 'dB', 1.0),
+    'Path_Loss_dB': ('path_loss', 'dB', 1.0),
+    'path_loss': ('path_loss', 'dB', 1.0),
+    'FSPL (dB)': ('fspl', 'dB', 1.0),
+    'fspl (dB)': ('fspl', 'dB', 1.0),
+    'Received_Power_dBm': ('rx_power', 'dBm', 1.0),
+    'pr': ('rx_power', 'dBm', 1.0),
+    'RSSI': ('rssi', 'dBm', 1.0),
+    'nf': ('noise_figure', 'dB', 1.0),
+}
+
+# ## Define the DatasetCatalog class
+class DatasetCatalog:
+    def __init__(self, catalog_path=CATALOG_FILENAME, chunk_size=500000):
+        """Initialize the DatasetCatalog class
+
+        Parameters:
+        catalog_path (str): JSON file holding the catalog
+        chunk_size (int): Rows parsed per read while collecting statistics
+        """
+        self.catalog_path = Path(catalog_path)
+        self.chunk_size = chunk_size
+        self.datasets = {}
+        if self.catalog_path.exists():
+            with open(self.catalog_path) as f:
+                self.datasets = json.load(f)
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'dataset_catalog.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def canonical_column(name):
+        """(canonical name, unit, scale) for a source column; unknown columns keep a normalized name and no unit"""
+        if name in CANONICAL_COLUMNS:
+            return CANONICAL_COLUMNS[name]
+        return re.sub(r'[^0-9a-z]+', '_', name.lower()).strip('_'), None, 1.0
+
+    @classmethod
+    def canonicalize(cls, df):
+        """Rename and rescale a frame's columns to the canonical schema"""
+        columns = {}
+        for name in df.columns:
+            canonical, _, scale = cls.canonical_column(name)
+            columns[canonical] = df[name] * scale if scale != 1.0 else df[name]
+        return pd.DataFrame(columns)
+
+    @staticmethod
+    def checksum(path, block_size=1 << 20):
+        """SHA-256 of a file, read in blocks"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def table_parts(path):
+        """(file, zip member or None) for every CSV table under a file or folder"""
+        path = Path(path)
+        files = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+        parts = []
+        for file in files:
+            if file.name.endswith('.csv'):
+                parts.append((file, None))
+            elif file.suffix == '.zip':
+                with zipfile.ZipFile(file) as archive:
+                    parts.extend((file, info.filename) for info in archive.infolist()
+                                 if info.filename.endswith('.csv') and not info.is_dir())
+        return parts
+
+    @staticmethod
+    def merge_dtype(recorded, dtype):
+        """Dtype name covering a column seen as recorded so far and as dtype in the next chunk
+
+        A column that is integer in one chunk and fractional in a later one is recorded as float.
+        """
+        if recorded is None or recorded == str(dtype):
+            return str(dtype)
+        if pd.api.types.is_numeric_dtype(recorded) and pd.api.types.is_numeric_dtype(dtype):
+            return str(np.promote_types(np.dtype(recorded), dtype))
+        return 'object'
+
+    def summarize_part(self, file, member):
+        """Row count, source columns and canonical min/max of one CSV table"""
+        if member is None:
+            handle = open(file, 'rb')
+        else:
+            archive = zipfile.ZipFile(file)
+            handle = archive.open(member)
+        rows = 0
+        low, high, dtypes = {}, {}, {}
+        try:
+            for chunk in pd.read_csv(handle, chunksize=self.chunk_size):
+                rows += len(chunk)
+                for name in chunk.columns:
+                    dtypes[name] = self.merge_dtype(dtypes.get(name), chunk[name].dtype)
+                numeric = chunk.select_dtypes(include='number')
+                for name, value in numeric.min().items():
+                    low[name] = min(low.get(name, np.inf), float(value))
+                for name, value in numeric.max().items():
+                    high[name] = max(high.get(name, -np.inf), float(value))
+        finally:
+            handle.close()
+            if member is not None:
+                archive.close()
+        ranges = {}
+        for name in low:
+            canonical, _, scale = self.canonical_column(name)
+            ranges[canonical] = sorted([low[name] * scale, high[name] * scale])
+        return {"rows": rows, "dtypes": dtypes, "columns": ranges}
+
+    def register(self, path, name=None):
+        """Catalog a dataset file or folder, rescanning only files that changed since the last registration"""
+        path = Path(path)
+        name = name or path.name.split('.')[0]
+        previous = {(part["path"], part["member"]): part for part in self.datasets.get(name, {}).get("parts", [])}
+        parts, schema, checksums = [], {}, {}
+        for file, member in self.table_parts(path):
+            stat = file.stat()
+            key = (str(file), member)
+            part = previous.get(key)
+            if part is None or part["mtime"] != stat.st_mtime or part["size"] != stat.st_size:
+                if str(file) not in checksums:
+                    checksums[str(file)] = self.checksum(file)
+                part = {"path": str(file), "member": member, "mtime": stat.st_mtime, "size": stat.st_size,
+                        "sha256": checksums[str(file)], **self.summarize_part(file, member)}
+                logging.debug(f"Scanned {file}{'::' + member if member else ''}: {part['rows']} rows")
+            parts.append(part)
+            for source, dtype in part["dtypes"].items():
+                canonical, unit, _ = self.canonical_column(source)
+                schema.setdefault(canonical, {"source": source, "unit": unit, "dtype": dtype})
+        if not parts:
+            raise ValueError(f"No CSV tables found under {path}")
+
+        columns = {}
+        for part in parts:
+            for column, (low, high) in part["columns"].items():
+                current = columns.get(column, [np.inf, -np.inf])
+                columns[column] = [min(current[0], low), max(current[1], high)]
+        self.datasets[name] = {"root": str(path), "rows": sum(part["rows"] for part in parts),
+                               "schema": schema, "columns": columns, "parts": parts}
+        return self.datasets[name]
+
+    def save(self):
+        """Write the catalog atomically"""
+        tmp_path = self.catalog_path.with_name(self.catalog_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.datasets, f, indent=1)
+        os.replace(tmp_path, self.catalog_path)
+
+    def describe(self, name):
+        """Canonical schema of a dataset with its row count and column ranges, as a DataFrame"""
+        entry = self.datasets[name]
+        return pd.DataFrame([{"column": column, "source": info["source"], "unit": info["unit"], "dtype": info["dtype"],
+                              "min": entry["columns"].get(column, [None, None])[0],
+                              "max": entry["columns"].get(column, [None, None])[1]}
+                             for column, info in entry["schema"].items()])
+
+    def find(self, *columns):
+        """Names of the datasets that provide every canonical column"""
+        return [name for name, entry in self.datasets.items() if all(c in entry["schema"] for c in columns)]
+
+    def plan(self, name, **ranges):
+        """Parts of a dataset whose canonical ranges overlap every (low, high) constraint, e.g. frequency=(2400, 2500)"""
+        selected = []
+        for part in self.datasets[name]["parts"]:
+            if all(column not in part["columns"]
+                   or (part["columns"][column][0] <= high and part["columns"][column][1] >= low)
+                   for column, (low, high) in ranges.items()):
+                selected.append(part)
+        return selected
+
+    def verify(self, name):
+        """Files of a dataset whose checksum no longer matches the catalog"""
+        mismatched = []
+        for file, expected in {part["path"]: part["sha256"] for part in self.datasets[name]["parts"]}.items():
+            if not Path(file).exists() or self.checksum(file) != expected:
+                mismatched.append(file)
+        return mismatched
+
+# ## Run the Dataset Catalog
+if __name__ == "__main__":
+    DatasetCatalog.init_logger()
+    root = Path(__file__).resolve().parent.parent
+    catalog = DatasetCatalog()
+    for artifact in ('db_rssi', 'db_rssi.zip', 'fspl_batches', 'link_budget_data.zip'):
+        if (root / artifact).exists():
+            entry = catalog.register(root / artifact, name=artifact.replace('.', '_'))
+            print(f"{artifact}: {entry['rows']} rows in {len(entry['parts'])} parts")
+    catalog.save()
+    print(catalog.describe('fspl_batches'))
+    print(f"Datasets with rx_power: {catalog.find('rx_power')}")
+    print(f"fspl_batches parts to read for 2.4-2.5 GHz: {len(catalog.plan('fspl_batches', frequency=(2400, 2500)))}")
@@ -0,0 +1,201 @@
+# Bulk Dataset Loader Script for VEDA
+# This script streams generated batch files (fspl_batches/*.csv.zip, db_rssi/*.csv, ...) into the application
+# database as partitioned tables, one partition per batch file. PostgreSQL partitions are loaded with COPY;
+# SQLite, which has no declarative partitioning, gets one table per batch behind a UNION ALL view and is loaded
+# with executemany inside large transactions. Indexes are built after the data is in, and throughput is reported.
+
+# ## Import necessary libraries
+import io
+import os
+import time
+import sqlite3
+import logging
+import zipfile
+from pathlib import Path
+from urllib.parse import urlparse, unquote
+import pandas as pd
+
+from dataset_catalog import DatasetCatalog
+
+DEFAULT_DATABASE_URL = 'sqlite:///veda.db'  # Same fallback as config.Config
+
+# ## Define the BulkLoader class
+class BulkLoader:
+    def __init__(self, database_url=None, chunk_size=200000, transaction_rows=1000000):
+        """Initialize the BulkLoader class
+
+        Parameters:
+        database_url (str): SQLAlchemy-style URL (postgresql[+psycopg2]://... or sqlite:///...);
+            defaults to DATABASE_URL from the environment
+        chunk_size (int): Rows parsed and sent per batch
+        transaction_rows (int): Rows per SQLite transaction
+        """
+        self.database_url = database_url or os.environ.get('DATABASE_URL') or DEFAULT_DATABASE_URL
+        self.chunk_size = chunk_size
+        self.transaction_rows = transaction_rows
+        url = urlparse(self.database_url)
+        self.dialect = url.scheme.split('+')[0]
+        if self.dialect == 'sqlite':
+            self.connection = sqlite3.connect(unquote(url.path[1:]) or ':memory:')
+            self.connection.execute("PRAGMA journal_mode=MEMORY")
+            self.connection.execute("PRAGMA synchronous=OFF")
+        elif self.dialect in ('postgresql', 'postgres'):
+            import psycopg2
+            self.dialect = 'postgresql'
+            self.connection = psycopg2.connect(dbname=url.path[1:], user=unquote(url.username or ''),
+                                               password=unquote(url.password or ''), host=url.hostname,
+                                               port=url.port or 5432)
+        else:
+            raise ValueError(f"Unsupported database '{url.scheme}', expected postgresql or sqlite")
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'dataset_loader.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def sql_type(dtype, integer=False):
+        """Column type for a pandas dtype; numbers are BIGINT only when known to be integer in every part"""
+        if pd.api.types.is_numeric_dtype(dtype):
+            return 'BIGINT' if integer else 'DOUBLE PRECISION'
+        return 'TEXT'
+
+    @staticmethod
+    def integer_columns(entry):
+        """Canonical columns that are integer in every part of a catalog entry and are not rescaled"""
+        integer = {}
+        for part in entry["parts"]:
+            for source, dtype in part["dtypes"].items():
+                canonical, _, scale = DatasetCatalog.canonical_column(source)
+                integer[canonical] = integer.get(canonical, True) and scale == 1.0 \
+                    and pd.api.types.is_integer_dtype(dtype)
+        return {column for column, is_integer in integer.items() if is_integer}
+
+    @staticmethod
+    def read_chunks(file, member, chunk_size):
+        """Canonicalized DataFrame chunks of one CSV table (plain file or zip member)"""
+        if member is not None:
+            with zipfile.ZipFile(file) as archive, archive.open(member) as handle:
+                for chunk in pd.read_csv(handle, chunksize=chunk_size):
+                    yield DatasetCatalog.canonicalize(chunk)
+        else:
+            with open(file, 'rb') as handle:
+                for chunk in pd.read_csv(handle, chunksize=chunk_size):
+                    yield DatasetCatalog.canonicalize(chunk)
+
+    def create_tables(self, table, columns, num_partitions):
+        """Partitioned table (PostgreSQL) or per-partition tables behind a view (SQLite)"""
+        definition = ', '.join(f'"{name}" {sql_type}' for name, sql_type in columns.items())
+        cursor = self.connection.cursor()
+        if self.dialect == 'postgresql':
+            cursor.execute(f'DROP TABLE IF EXISTS "{table}" CASCADE')
+            cursor.execute(f'CREATE TABLE "{table}" (batch INTEGER NOT NULL, {definition}) PARTITION BY LIST (batch)')
+            for i in range(num_partitions):
+                cursor.execute(f'CREATE TABLE "{table}_p{i}" PARTITION OF "{table}" FOR VALUES IN ({i})')
+        else:
+            cursor.execute(f'DROP VIEW IF EXISTS "{table}"')
+            for i in range(num_partitions):
+                cursor.execute(f'DROP TABLE IF EXISTS "{table}_p{i}"')
+                cursor.execute(f'CREATE TABLE "{table}_p{i}" (batch INTEGER NOT NULL, {definition})')
+            union = ' UNION ALL '.join(f'SELECT * FROM "{table}_p{i}"' for i in range(num_partitions))
+            cursor.execute(f'CREATE VIEW "{table}" AS {union}')
+        self.connection.commit()
+
+    def copy_chunk(self, cursor, partition, chunk):
+        """Send one chunk with COPY ... FROM STDIN (PostgreSQL)"""
+        buffer = io.StringIO()
+        chunk.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        names = ', '.join(f'"{name}"' for name in chunk.columns)
+        cursor.copy_expert(f'COPY "{partition}" ({names}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+    def insert_chunk(self, cursor, partition, chunk):
+        """Send one chunk with executemany (SQLite)"""
+        names = ', '.join(f'"{name}"' for name in chunk.columns)
+        placeholders = ', '.join('?' * len(chunk.columns))
+        cursor.executemany(f'INSERT INTO "{partition}" ({names}) VALUES ({placeholders})',
+                           chunk.itertuples(index=False, name=None))
+
+    def create_indexes(self, table, index_columns, num_partitions):
+        """Build indexes once the data is loaded"""
+        cursor = self.connection.cursor()
+        for column in index_columns:
+            if self.dialect == 'postgresql':
+                # Created on the parent, PostgreSQL builds the index on every partition
+                cursor.execute(f'CREATE INDEX "{table}_{column}_idx" ON "{table}" ("{column}")')
+            else:
+                for i in range(num_partitions):
+                    cursor.execute(f'CREATE INDEX "{table}_p{i}_{column}_idx" ON "{table}_p{i}" ("{column}")')
+        self.connection.commit()
+
+    def load(self, source, table, index_columns=(), catalog=None):
+        """Load every CSV table under a file or folder into a partitioned table, one partition per table
+
+        Parameters:
+        source (str): Batch file or folder
+        table (str): Target table
+        index_columns (list): Columns indexed after the load
+        catalog (DatasetCatalog): When given, source is registered in it and columns that are integer in every
+            part become BIGINT; otherwise every numeric column is DOUBLE PRECISION, since a column that is
+            integer in the first rows may turn fractional later
+
+        Returns a report with the row count, elapsed seconds and rows per second.
+        """
+        parts = DatasetCatalog.table_parts(source)
+        if not parts:
+            raise ValueError(f"No CSV tables found under {source}")
+        integer = self.integer_columns(catalog.register(source)) if catalog is not None else set()
+        sample = self.read_chunks(*parts[0], 10000)
+        first = next(sample)  # Column names and the non-numeric columns
+        sample.close()  # Closes the file or archive now rather than when the generator is collected
+        columns = {name: self.sql_type(dtype, name in integer) for name, dtype in first.dtypes.items()}
+        self.create_tables(table, columns, len(parts))
+
+        start = time.perf_counter()
+        rows = 0
+        pending = 0
+        cursor = self.connection.cursor()
+        for batch, (file, member) in enumerate(parts):
+            partition = f"{table}_p{batch}"
+            for chunk in self.read_chunks(file, member, self.chunk_size):
+                chunk.insert(0, 'batch', batch)
+                if self.dialect == 'postgresql':
+                    self.copy_chunk(cursor, partition, chunk)
+                else:
+                    self.insert_chunk(cursor, partition, chunk)
+                rows += len(chunk)
+                pending += len(chunk)
+                if pending >= self.transaction_rows:
+                    self.connection.commit()
+                    pending = 0
+            logging.debug(f"Loaded {file}{'::' + member if member else ''} into {partition}")
+        self.connection.commit()
+        load_seconds = time.perf_counter() - start
+
+        self.create_indexes(table, index_columns, len(parts))
+        elapsed = time.perf_counter() - start
+        report = {"table": table, "partitions": len(parts), "rows": rows, "load_seconds": load_seconds,
+                  "index_seconds": elapsed - load_seconds, "rows_per_second": rows / elapsed if elapsed else 0.0}
+        logging.info(f"Bulk load report: {report}")
+        return report
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+# ## Run the Bulk Dataset Loader
+if __name__ == "__main__":
+    BulkLoader.init_logger()
+    root = Path(__file__).resolve().parent.parent
+    loader = BulkLoader()
+    report = loader.load(root / 'db_rssi', 'rssi', index_columns=['rssi'])
+    print(f"{report['rows']} rows into {report['partitions']} partitions of '{report['table']}' "
+          f"at {report['rows_per_second'] * 60 / 1e6:.1f} million rows per minute")
+    loader.close()
@@ -0,0 +1,205 @@
+# Frequency Assignment Solver Script for VEDA
+# This script assigns channels to a set of sites so the worst-case carrier-to-interference ratio (C/I) is maximized.
+# The site-to-site interference matrix is built blockwise from the existing path-loss models, a greedy pass
+# assigns the most constrained sites first, and a local search then moves single sites between channels.
+# Per-site interference is kept for every channel, so each move is scored and applied with O(N) updates.
+
+# ## Import necessary libraries
+import os
+import logging
+from pathlib import Path
+import numpy as np
+
+from inverse_link_calculation import InverseLinkBudget
+from inr_calculation import INR
+
+TINY_MW = 1e-30  # Floor for linear powers before converting to dB
+
+# ## Define the FrequencyAssignment class
+class FrequencyAssignment:
+    def __init__(self, sites_xy_ft, frequency, num_channels, tx_power=30.0, tx_gain=0.0, rx_gain=0.0,
+                 service_radius_ft=500.0, channel_rejection_db=(0.0, 30.0), noise_dbm=-100.0,
+                 model='fspl', path_loss_exponent=2, environment='urban', memory_cap_mb=256):
+        """Initialize the FrequencyAssignment class
+
+        Parameters:
+        sites_xy_ft (array): Site positions, shape (N, 2), in feet
+        frequency (float): Band center frequency in MHz
+        num_channels (int): Number of channels available
+        tx_power, tx_gain, rx_gain (float or array): Per-site transmit power (dBm) and antenna gains (dBi)
+        service_radius_ft (float or array): Cell edge used for each site's carrier power
+        channel_rejection_db (tuple): Interference rejection by channel separation: co-channel,
+            adjacent, ...; separations beyond the tuple do not interfere
+        noise_dbm (float): Receiver noise power used for the reported INR
+        model (str): Path loss model of InverseLinkBudget ('fspl', 'log_distance' or 'friis')
+        """
+        self.sites_xy_ft = np.asarray(sites_xy_ft, dtype=float)
+        self.frequency = frequency  # in MHz
+        self.num_channels = num_channels
+        n = len(self.sites_xy_ft)
+        self.tx_power = np.broadcast_to(np.asarray(tx_power, dtype=float), n)
+        self.tx_gain = np.broadcast_to(np.asarray(tx_gain, dtype=float), n)
+        self.rx_gain = np.broadcast_to(np.asarray(rx_gain, dtype=float), n)
+        self.noise_dbm = noise_dbm
+        self.memory_cap_mb = memory_cap_mb
+        self.path_loss_model = InverseLinkBudget(model=model, path_loss_exponent=path_loss_exponent,
+                                                 environment=environment)
+
+        # Channel coupling weights W[a, b] between sites on channels a and b
+        rejection = np.asarray(channel_rejection_db, dtype=float)
+        separation = np.abs(np.subtract.outer(np.arange(num_channels), np.arange(num_channels)))
+        self.channel_weights = np.where(separation < rejection.size,
+                                        10 ** (-rejection[np.minimum(separation, rejection.size - 1)] / 10), 0.0)
+
+        self.carrier_dbm = (self.tx_power + self.tx_gain + self.rx_gain
+                            - self.calculate_path_loss(np.broadcast_to(service_radius_ft, n)))
+        self.interference_mw = None  # (N, N) linear power received at site i from site j, built on demand
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'frequency_assignment.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    def calculate_path_loss(self, distance_ft):
+        """Path loss (dB) of the configured model for distances in feet"""
+        distance_ft = np.maximum(distance_ft, self.path_loss_model.ref_distance_ft)
+        if self.path_loss_model.model == 'friis':
+            return self.path_loss_model.calculate_path_loss(self.frequency, distance_ft * 0.3048)
+        return self.path_loss_model.calculate_path_loss(self.frequency, distance_ft)
+
+    def row_bounds(self):
+        """Row ranges whose float64 distance and loss blocks fit under the memory cap"""
+        n = len(self.sites_xy_ft)
+        rows = max(1, min(n, int(self.memory_cap_mb * 1024**2 // (n * 8 * 4))))
+        return [(start, min(start + rows, n)) for start in range(0, n, rows)]
+
+    def build_interference_matrix(self):
+        """Interference power (mW) received at every site from every other site, in row blocks"""
+        n = len(self.sites_xy_ft)
+        interference = np.empty((n, n), dtype=np.float32)
+        for start, stop in self.row_bounds():
+            delta = self.sites_xy_ft[start:stop, None, :] - self.sites_xy_ft[None, :, :]
+            path_loss = self.calculate_path_loss(np.hypot(delta[..., 0], delta[..., 1]))
+            received_dbm = (self.tx_power[None, :] + self.tx_gain[None, :] + self.rx_gain[start:stop, None]
+                            - path_loss)
+            interference[start:stop] = 10 ** (received_dbm / 10)
+        np.fill_diagonal(interference, 0.0)
+        logging.debug(f"Built {n} x {n} interference matrix in {len(self.row_bounds())} blocks")
+        self.interference_mw = interference
+        return interference
+
+    def channel_interference(self, channels):
+        """Interference (mW) each site would see on every channel, shape (N, num_channels)"""
+        if self.interference_mw is None:
+            self.build_interference_matrix()
+        # Sum the coupling of the sites on each channel, then spread it over neighbouring channels
+        per_channel = np.zeros((len(channels), self.num_channels))
+        for c in range(self.num_channels):
+            on_channel = channels == c
+            if on_channel.any():
+                per_channel[:, c] = self.interference_mw[:, on_channel].sum(axis=1, dtype=np.float64)
+        return per_channel @ self.channel_weights
+
+    def calculate_ci(self, interference_mw):
+        """C/I (dB) per site from its interference power in mW"""
+        return self.carrier_dbm - 10 * np.log10(interference_mw + TINY_MW)
+
+    def evaluate(self, channels):
+        """Score an assignment: C/I and INR per site, and the worst-case C/I"""
+        channels = np.asarray(channels, dtype=np.intp)
+        interference = self.channel_interference(channels)[np.arange(len(channels)), channels]
+        ci = self.calculate_ci(interference)
+        inr = INR.calculate_inr(10 * np.log10(interference + TINY_MW), self.noise_dbm)["inr"]
+        return {"channels": channels, "ci_dB": ci, "inr_dB": inr, "worst_ci_dB": float(ci.min())}
+
+    def greedy(self):
+        """Assign the most strongly coupled sites first, each to the channel with the best resulting worst C/I"""
+        if self.interference_mw is None:
+            self.build_interference_matrix()
+        n = len(self.sites_xy_ft)
+        coupling = self.interference_mw
+        order = np.argsort(-(coupling.sum(axis=0, dtype=np.float64) + coupling.sum(axis=1, dtype=np.float64)))
+        channels = np.full(n, -1, dtype=np.intp)
+        load = np.zeros((n, self.num_channels))  # Interference per site and channel from assigned sites
+        assigned = np.zeros(n, dtype=bool)
+
+        for site in order:
+            own_ci = self.carrier_dbm[site] - 10 * np.log10(load[site] + TINY_MW)
+            if assigned.any():
+                others = np.flatnonzero(assigned)
+                current = load[others, channels[others]]
+                added = coupling[others, site, None] * self.channel_weights[channels[others]]
+                others_ci = self.carrier_dbm[others, None] - 10 * np.log10(current[:, None] + added + TINY_MW)
+                own_ci = np.minimum(own_ci, others_ci.min(axis=0))
+            channel = int(np.argmax(own_ci))
+            channels[site] = channel
+            assigned[site] = True
+            load += coupling[:, site, None] * self.channel_weights[channel]
+        return channels
+
+    def score_moves(self, site, channels, load):
+        """Worst and mean C/I for moving one site to every channel, shape (num_channels,) each"""
+        n = len(channels)
+        own = load[np.arange(n), channels]
+        weights = self.channel_weights[:, channels].T  # weights[i, b] = W[b, channel of i]
+        delta = self.interference_mw[:, site, None] * (weights - weights[:, [channels[site]]])
+        interference = own[:, None] + delta
+        interference[site] = load[site]
+        ci = self.carrier_dbm[:, None] - 10 * np.log10(np.maximum(interference, 0) + TINY_MW)
+        return ci.min(axis=0), ci.mean(axis=0)
+
+    def solve(self, max_iterations=1000, num_candidates=8, channels=None):
+        """Greedy start (or a given plan) improved by single-site moves until no move helps"""
+        channels = self.greedy() if channels is None else np.asarray(channels, dtype=np.intp).copy()
+        load = self.channel_interference(channels)
+        ci = self.calculate_ci(load[np.arange(len(channels)), channels])
+        worst, mean = ci.min(), ci.mean()
+        logging.debug(f"Initial worst C/I {worst:.2f} dB")
+
+        iterations = 0
+        for iterations in range(1, max_iterations + 1):
+            # Candidates: the worst site and the sites interfering with it most
+            worst_site = int(np.argmin(ci))
+            coupling = self.interference_mw[worst_site] * self.channel_weights[channels[worst_site], channels]
+            candidates = np.concatenate(([worst_site], np.argsort(-coupling)[:num_candidates]))
+            best = None
+            for site in candidates:
+                move_worst, move_mean = self.score_moves(site, channels, load)
+                move_worst[channels[site]] = -np.inf  # Staying put is not a move
+                b = int(np.lexsort((move_mean, move_worst))[-1])
+                gain = (move_worst[b] - worst, move_mean[b] - mean)
+                if gain[0] > 1e-9 or (gain[0] > -1e-9 and gain[1] > 1e-9):
+                    if best is None or gain > best[0]:
+                        best = (gain, site, b)
+            if best is None:
+                break
+            _, site, b = best
+            # Incremental update: only the coupling column of the moved site changes the per-channel load
+            load += self.interference_mw[:, site, None] * (self.channel_weights[b] - self.channel_weights[channels[site]])
+            channels[site] = b
+            ci = self.calculate_ci(load[np.arange(len(channels)), channels])
+            worst, mean = ci.min(), ci.mean()
+
+        logging.debug(f"Local search stopped after {iterations} iterations, worst C/I {worst:.2f} dB")
+        result = self.evaluate(channels)
+        result["iterations"] = iterations
+        return result
+
+# ## Run the Frequency Assignment
+if __name__ == "__main__":
+    FrequencyAssignment.init_logger()
+    rng = np.random.default_rng(0)
+    sites = rng.uniform(0, 50000, (2000, 2))  # 2000 sites over a 50,000 ft square
+    solver = FrequencyAssignment(sites, frequency=5800, num_channels=12, tx_power=23, tx_gain=10, rx_gain=10,
+                                 service_radius_ft=800, model='log_distance', path_loss_exponent=3.5)
+    random_plan = solver.evaluate(rng.integers(0, 12, len(sites)))
+    result = solver.solve()
+    print(f"Worst-case C/I: random plan {random_plan['worst_ci_dB']:.2f} dB, "
+          f"solver {result['worst_ci_dB']:.2f} dB after {result['iterations']} moves")
@@ -10,8 +10,13 @@ from zipfile import ZipFile, ZIP_DEFLATED
 from tqdm import tqdm
 import numpy as np
 
+from sample_design import SampleDesign
+from antenna_pattern import AntennaPattern
+
 # ## Define the Friis class
 class Friis:
+    PATH_LOSS_EXPONENTS = {'urban': 2.7, 'suburban': 2.2, 'rural': 1.8}  # Environment factor
+
     def __init__(self, p_tx, g_tx, g_rx, l_tx, distance, frequency, environment):
         """Initialize the Friis class"""
         self.p_tx = p_tx  # Transmitted power (dBm)
@@ -42,27 +47,36 @@ class Friis:
                 f.write(f"{r}\n")
 
     @staticmethod
-    def calculate_friis(p_tx, g_tx, g_rx, l_tx, distance, frequency, environment):
-        """Calculate Friis Transmission Equation"""
+    def calculate_friis(p_tx, g_tx, g_rx, l_tx, distance, frequency, environment, tx_angles=None, rx_angles=None,
+                        weather=None):
+        """Calculate Friis Transmission Equation
+
+        g_tx / g_rx may be AntennaPattern objects, evaluated at tx_angles / rx_angles = (az_deg, el_deg).
+        weather (AtmosphericAttenuation) adds gaseous and rain attenuation to the path loss.
+        """
+        g_tx = AntennaPattern.resolve_gain(g_tx, tx_angles)
+        g_rx = AntennaPattern.resolve_gain(g_rx, rx_angles)
         c = 3 * 10**8  # Speed of light in m/s
         lambda_ = c / (frequency * 10**6)  # Wavelength in meters
 
-        # Environment factor
-        if environment == 'urban':
-            path_loss_exponent = 2.7
-        elif environment == 'suburban':
-            path_loss_exponent = 2.2
-        else:  # rural
-            path_loss_exponent = 1.8
+        # Environment factor, anything unknown is treated as rural
+        path_loss_exponent = Friis.PATH_LOSS_EXPONENTS.get(environment, Friis.PATH_LOSS_EXPONENTS['rural'])
 
         # Friis transmission equation with environment factor
         l_p = 20 * np.log10(distance / lambda_) + 10 * path_loss_exponent * np.log10(distance)
+        if weather is not None:
+            l_p = l_p + weather.calculate_attenuation(frequency, np.asarray(distance) / 0.3048)
         p_r = p_tx + g_tx + g_rx - l_tx - l_p
 
         return {"p_r": p_r, "p_tx": p_tx, "g_tx": g_tx, "g_rx": g_rx, "l_tx": l_tx, "distance": distance, "frequency": frequency, "environment": environment}
 
-    def calculate(self):
-        """Calculate Friis Transmission Equation for a range of parameters"""
+    def calculate(self, sampling=None, num_rows=None, seed=None, weather=None):
+        """Calculate Friis Transmission Equation for a range of parameters
+
+        With sampling set to 'lhs', 'sobol' or 'stratified', num_rows space-filling samples
+        are drawn over the same ranges instead of the full Cartesian product.
+        weather (AtmosphericAttenuation) adds gaseous and rain attenuation to every row.
+        """
         # Define the range of variables
         p_tx_values = np.arange(0, 50, 1)  # Transmitted power from 0 dBm to 49 dBm
         g_tx_values = np.arange(0, 15, 1)  # Transmitting antenna gain from 0 dBi to 14 dBi
@@ -72,13 +86,19 @@ class Friis:
         frequency_values = np.arange(700, 3001, 50)  # Frequency from 700 MHz to 3000 MHz
         environment_values = ['urban', 'suburban', 'rural']  # Environment types
 
-        parameters = [(p, g_t, g_r, l_t, d, f, e) for p in p_tx_values for g_t in g_tx_values for g_r in g_rx_values for l_t in l_tx_values for d in distance_values for f in frequency_values for e in environment_values]
+        if sampling is not None:
+            design = SampleDesign({'p_tx': p_tx_values, 'g_tx': g_tx_values, 'g_rx': g_rx_values, 'l_tx': l_tx_values,
+                                   'distance': distance_values, 'frequency': frequency_values,
+                                   'environment': environment_values}, method=sampling, seed=seed)
+            parameters = design.sample_tuples(num_rows)
+        else:
+            parameters = [(p, g_t, g_r, l_t, d, f, e) for p in p_tx_values for g_t in g_tx_values for g_r in g_rx_values for l_t in l_tx_values for d in distance_values for f in frequency_values for e in environment_values]
         num_cpus = min(cpu_count(), 16)  # Limit to 16 cores
         logging.debug(f"Using {num_cpus} CPU cores for parallel processing")
 
         results = []
         with Pool(processes=num_cpus) as pool:
-            for result in tqdm(pool.imap_unordered(lambda p: Friis.calculate_friis(*p), parameters), total=len(parameters)):
+            for result in tqdm(pool.imap_unordered(lambda p: Friis.calculate_friis(*p, weather=weather), parameters), total=len(parameters)):
                 if result is not None:
                     results.append(result)
 
@@ -7,6 +7,10 @@ from tqdm import tqdm
 from pathlib import Path
 from zipfile import ZipFile, ZIP_DEFLATED
 
+from sample_design import SampleDesign
+from dataset_cache import DatasetCache
+from compact_storage import CompactCodec, save_compact
+
 def init_logger():
     log_folder = "logs"
     Path(log_folder).mkdir(parents=True, exist_ok=True)
@@ -40,31 +44,110 @@ def calculate_path_loss(frequency, distance_ft):
     path_loss = 20 * np.log10(distance_m) + 20 * np.log10(frequency) - 27.55
     return path_loss
 
-def generate_link_budget_data():
-    frequencies = np.arange(700, 3001, 50)  # Frequency range from 700 MHz to 3000 MHz
-    distances = np.arange(5, 501, 5)  # Distance range from 5 ft to 500 ft
-    tx_powers = np.arange(20, 44, 1)  # Transmitter power range from 20 dBm to 43 dBm
-    tx_gains = np.arange(0, 16, 1)  # Tx gain from 0 dBi to 15 dBi
-    rx_gains = np.arange(0, 16, 1)  # Rx gain from 0 dBi to 15 dBi
-    losses_tx = 2.0  # Example transmitter losses in dB
-    losses_rx = 2.0  # Example receiver losses in dB
+# Design space shared by the generator and the link budget optimizer
+FREQUENCIES = np.arange(700, 3001, 50)  # Frequency range from 700 MHz to 3000 MHz
+DISTANCES = np.arange(5, 501, 5)  # Distance range from 5 ft to 500 ft
+TX_POWERS = np.arange(20, 44, 1)  # Transmitter power range from 20 dBm to 43 dBm
+TX_GAINS = np.arange(0, 16, 1)  # Tx gain from 0 dBi to 15 dBi
+RX_GAINS = np.arange(0, 16, 1)  # Rx gain from 0 dBi to 15 dBi
+LOSSES_TX = 2.0  # Example transmitter losses in dB
+LOSSES_RX = 2.0  # Example receiver losses in dB
+DESIGN_SPACE = {'Frequency_MHz': FREQUENCIES, 'Distance_ft': DISTANCES, 'Tx_Power_dBm': TX_POWERS,
+                'Tx_Gain_dBi': TX_GAINS, 'Rx_Gain_dBi': RX_GAINS}
+
+def add_link_budget_columns(df, weather=None):
+    """
+    Add the loss, path loss and received power columns to rows holding the five design axes.
+
+    Parameters:
+    df (DataFrame): Frequency_MHz, Distance_ft, Tx_Power_dBm, Tx_Gain_dBi and Rx_Gain_dBi columns
+    weather (AtmosphericAttenuation): Optional gaseous and rain attenuation added to the path loss
+
+    Returns:
+    DataFrame: The same rows in the generator's column order
+    """
+    L_p = calculate_path_loss(df['Frequency_MHz'], df['Distance_ft'])
+    if weather is not None:
+        L_p = L_p + weather.calculate_attenuation(df['Frequency_MHz'], df['Distance_ft'])
+    df.insert(4, 'Losses_Tx_dB', LOSSES_TX)
+    df.insert(5, 'Path_Loss_dB', L_p)
+    df.insert(7, 'Losses_Rx_dB', LOSSES_RX)
+    df['Received_Power_dBm'] = calculate_received_power(df['Tx_Power_dBm'], df['Tx_Gain_dBi'], LOSSES_TX,
+                                                        L_p, df['Rx_Gain_dBi'], LOSSES_RX)
+    return df
+
+def link_budget_kernel(Frequency_MHz, Distance_ft, Tx_Power_dBm, Tx_Gain_dBi, Rx_Gain_dBi, weather=None):
+    """
+    Link budget rows for the Cartesian grid of the given axis values, in the same order as the nested loops.
+    """
+    axes = np.meshgrid(Frequency_MHz, Distance_ft, Tx_Power_dBm, Tx_Gain_dBi, Rx_Gain_dBi, indexing='ij')
+    df = pd.DataFrame(dict(zip(['Frequency_MHz', 'Distance_ft', 'Tx_Power_dBm', 'Tx_Gain_dBi', 'Rx_Gain_dBi'],
+                               (axis.ravel() for axis in axes))))
+    return add_link_budget_columns(df, weather)
+
+def cached_link_budget_data(cache, weather=None, fmt='csv.zip'):
+    """
+    Artifact paths of the full link budget grid, one per frequency, computing only what the cache lacks.
+
+    Parameters:
+    cache (DatasetCache): Cache the partitions are read from and written to
+    weather (AtmosphericAttenuation): Optional weather; its settings are part of the cache key
+    fmt (str): 'csv' or 'csv.zip'
+    """
+    dependencies = (add_link_budget_columns, calculate_path_loss, calculate_received_power)
+    if weather is not None:
+        dependencies += (type(weather),)
+    return cache.get_or_compute(link_budget_kernel, DESIGN_SPACE, fmt=fmt, partition_axis='Frequency_MHz',
+                                dependencies=dependencies, kernel_kwargs={'weather': weather})
+
+def generate_link_budget_data(sampling=None, num_rows=None, seed=None, weather=None, cache=None):
+    """
+    Generate the link budget dataset.
+
+    Parameters:
+    sampling (str): None for the full Cartesian grid, or 'lhs', 'sobol' or 'stratified'
+        to draw num_rows space-filling samples over the same axes
+    num_rows (int): Target row count when sampling
+    seed (int): Seed for the sample design
+    weather (AtmosphericAttenuation): Optional gaseous and rain attenuation added to the path loss
+    cache (DatasetCache): Serve the full grid from this cache, computing only missing partitions
+
+    Returns:
+    DataFrame: Link budget rows
+    """
+    if sampling is not None:
+        design = SampleDesign(DESIGN_SPACE, method=sampling, seed=seed)
+        return add_link_budget_columns(pd.DataFrame(design.sample(num_rows)), weather)
+
+    if cache is not None:
+        return DatasetCache.load(cached_link_budget_data(cache, weather))
 
     data = []
 
-    for freq in frequencies:
-        for dist in tqdm(distances, desc="Distances"):
-            for P_t in tx_powers:
-                for G_t in tx_gains:
-                    for G_r in rx_gains:
-                        L_p = calculate_path_loss(freq, dist)  # Calculate path loss
-                        P_r = calculate_received_power(P_t, G_t, losses_tx, L_p, G_r, losses_rx)
-                        data.append([freq, dist, P_t, G_t, losses_tx, L_p, G_r, losses_rx, P_r])
+    for freq in FREQUENCIES:
+        for dist in tqdm(DISTANCES, desc="Distances"):
+            L_p = calculate_path_loss(freq, dist)  # Calculate path loss
+            if weather is not None:
+                L_p += weather.calculate_attenuation(freq, dist)
+            for P_t in TX_POWERS:
+                for G_t in TX_GAINS:
+                    for G_r in RX_GAINS:
+                        P_r = calculate_received_power(P_t, G_t, LOSSES_TX, L_p, G_r, LOSSES_RX)
+                        data.append([freq, dist, P_t, G_t, LOSSES_TX, L_p, G_r, LOSSES_RX, P_r])
 
     df = pd.DataFrame(data, columns=['Frequency_MHz', 'Distance_ft', 'Tx_Power_dBm', 'Tx_Gain_dBi',
                                       'Losses_Tx_dB', 'Path_Loss_dB', 'Rx_Gain_dBi', 'Losses_Rx_dB', 'Received_Power_dBm'])
     return df
 
-def save_and_compress_data(df):
+def save_and_compress_data(df, compact=False):
+    """
+    Save the dataset as link_budget_data.zip, or with compact=True as link_budget_data.npz holding the design
+    axes as integer step counts (encodings taken from DESIGN_SPACE) and the derived dB columns as float32.
+    """
+    if compact:
+        save_compact(df, 'link_budget_data.npz', CompactCodec.from_grid(DESIGN_SPACE))
+        logging.info("Data saved in compact form to link_budget_data.npz")
+        return
     file_path = 'link_budget_data.csv'
     df.to_csv(file_path, index=False)
     # Compressing the file
@@ -77,9 +160,12 @@ if __name__ == "__main__":
     init_logger()
     logging.info("Starting link budget calculations")
 
-    # Generate data
-    link_budget_data = generate_link_budget_data()
+    # Generate data through the cache; a repeat run with the same ranges computes nothing
+    cache = DatasetCache()
+    paths = cached_link_budget_data(cache)
+    logging.info(f"{cache.hits} partitions reused, {cache.misses} computed")
 
-    # Save and compress data
-    save_and_compress_data(link_budget_data)
+    # Save and compress data, unless it is already there and nothing changed
+    if cache.misses or not os.path.exists('link_budget_data.zip'):
+        save_and_compress_data(DatasetCache.load(paths))
     logging.info("Link budget calculations completed and data compressed")
@@ -0,0 +1,145 @@
+# Regular-Grid Interpolation Script for VEDA
+# This script answers values between the grid points of a generated sweep (FSPL, link budget, RSSI, ...) without
+# regenerating it. The cell of every query point is located directly from the uniform axis spacing, and the
+# 2^d cell corners are gathered from the flattened table and blended with vectorized multilinear weights.
+
+# ## Import necessary libraries
+import os
+import logging
+from pathlib import Path
+import numpy as np
+
+from cube_storage import GridCube
+
+# ## Define the GridInterpolator class
+class GridInterpolator:
+    def __init__(self, axes, values, bounds='clip', chunk_size=1048576):
+        """Initialize the GridInterpolator class
+
+        Parameters:
+        axes (dict): Axis name -> increasing coordinate array, in the dimension order of values
+        values (array): Table of shape (len(axis) for axis in axes)
+        bounds (str): 'clip' to hold edge values outside the grid, 'nan' to return NaN there
+        chunk_size (int): Query points interpolated per vectorized block
+        """
+        if bounds not in ('clip', 'nan'):
+            raise ValueError(f"Unknown bounds mode '{bounds}', expected 'clip' or 'nan'")
+        self.names = list(axes)
+        self.axes = [np.asarray(axes[name], dtype=float) for name in self.names]
+        self.values = np.ascontiguousarray(values, dtype=float)
+        shape = tuple(len(axis) for axis in self.axes)
+        if self.values.shape != shape:
+            raise ValueError(f"Table shape {self.values.shape} does not match axes {shape}")
+        self.bounds = bounds
+        self.chunk_size = chunk_size
+        self.flat = self.values.ravel()
+        self.strides = np.array([int(np.prod(shape[i + 1:])) for i in range(len(shape))], dtype=np.intp)
+
+        # Uniform axes are located in O(1) from origin and spacing; others fall back to a binary search
+        self.origin = np.array([axis[0] for axis in self.axes])
+        self.spacing = np.array([axis[1] - axis[0] if len(axis) > 1 else 1.0 for axis in self.axes])
+        self.uniform = np.array([len(axis) < 3 or np.allclose(np.diff(axis), axis[1] - axis[0]) for axis in self.axes])
+        if not self.uniform.all():
+            logging.debug(f"Non-uniform axes {[n for n, u in zip(self.names, self.uniform) if not u]} use searchsorted")
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'grid_interpolator.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @classmethod
+    def from_cube(cls, path, quantity, **kwargs):
+        """Interpolator over one quantity of a GridCube file"""
+        cube = GridCube(path)
+        values, axes = cube.read(quantity)
+        return cls(axes, values, **kwargs)
+
+    @classmethod
+    def from_frame(cls, df, axis_columns, value_column, **kwargs):
+        """Interpolator over long-format rows, e.g. a fspl_batches or db_rssi table"""
+        axes, quantities = GridCube.from_long_frame(df, axis_columns, [value_column])
+        return cls(axes, quantities[value_column], **kwargs)
+
+    def locate(self, dim, x):
+        """Lower cell index and fractional position along one axis"""
+        axis = self.axes[dim]
+        n = len(axis)
+        if n == 1:
+            return np.zeros(x.shape, dtype=np.intp), np.zeros(x.shape)
+        if self.uniform[dim]:
+            position = (x - self.origin[dim]) / self.spacing[dim]
+            index = np.clip(np.floor(position), 0, n - 2).astype(np.intp)
+            return index, np.clip(position - index, 0.0, 1.0)
+        index = np.clip(np.searchsorted(axis, x, side='right') - 1, 0, n - 2)
+        fraction = (x - axis[index]) / (axis[index + 1] - axis[index])
+        return index, np.clip(fraction, 0.0, 1.0)
+
+    def _interpolate_block(self, points):
+        """Multilinear interpolation for one block of (M, d) points"""
+        base = np.zeros(len(points), dtype=np.intp)
+        fractions = []
+        for dim in range(len(self.axes)):
+            index, fraction = self.locate(dim, points[:, dim])
+            base += index * self.strides[dim]
+            fractions.append(fraction)
+
+        # Only axes with two or more points have an upper corner
+        active = [dim for dim in range(len(self.axes)) if len(self.axes[dim]) > 1]
+        result = np.zeros(len(points))
+        for corner in range(1 << len(active)):
+            offset = 0
+            weight = np.ones(len(points))
+            for bit, dim in enumerate(active):
+                if corner >> bit & 1:
+                    offset += self.strides[dim]
+                    weight *= fractions[dim]
+                else:
+                    weight *= 1.0 - fractions[dim]
+            result += weight * self.flat[base + offset]
+
+        if self.bounds == 'nan':
+            low = np.array([axis[0] for axis in self.axes])
+            high = np.array([axis[-1] for axis in self.axes])
+            outside = np.any((points < low) | (points > high), axis=1)
+            result[outside] = np.nan
+        return result
+
+    def __call__(self, *coordinates, **named):
+        """Interpolate at broadcastable coordinate arrays, given positionally or by axis name"""
+        if named:
+            coordinates = [named[name] for name in self.names]
+        if len(coordinates) != len(self.axes):
+            raise ValueError(f"Expected {len(self.axes)} coordinates for axes {self.names}")
+        arrays = np.broadcast_arrays(*[np.asarray(c, dtype=float) for c in coordinates])
+        shape = arrays[0].shape
+        points = np.stack([a.ravel() for a in arrays], axis=1)
+        result = np.empty(len(points))
+        for start in range(0, len(points), self.chunk_size):
+            result[start:start + self.chunk_size] = self._interpolate_block(points[start:start + self.chunk_size])
+        return result.reshape(shape)
+
+# ## Run the Grid Interpolation
+if __name__ == "__main__":
+    import time
+    from generate_link_budget_data import FREQUENCIES, DISTANCES, calculate_path_loss
+
+    GridInterpolator.init_logger()
+    # FSPL table on the 50 MHz x 5 ft link budget grid
+    table = calculate_path_loss(FREQUENCIES[:, None].astype(float), DISTANCES[None, :].astype(float))
+    fspl = GridInterpolator({'Frequency_MHz': FREQUENCIES, 'Distance_ft': DISTANCES}, table)
+    print(f"FSPL at 2437 MHz, 123 ft: {fspl(2437, 123):.3f} dB (exact {calculate_path_loss(2437, 123):.3f} dB)")
+
+    rng = np.random.default_rng(0)
+    frequency = rng.uniform(700, 3000, 2000000)
+    distance = rng.uniform(5, 500, 2000000)
+    start = time.perf_counter()
+    fspl(frequency, distance)
+    elapsed = time.perf_counter() - start
+    print(f"{frequency.size / elapsed / 1e6:.1f} million queries per second")
@@ -0,0 +1,111 @@
+# Inverse Link Budget Script for VEDA
+# This script solves the FSPL, log-distance and Friis formulas in closed form for the maximum distance,
+# the required transmit power or the required antenna gain that meets a received power (RSSI) target.
+# Every solver is vectorized, so whole arrays of constraints are answered without scanning the fspl_batches tables.
+
+# ## Import necessary libraries
+import os
+import logging
+from pathlib import Path
+import numpy as np
+
+from generate_link_budget_data import calculate_path_loss
+from friis_calculation import Friis
+
+# ## Define the InverseLinkBudget class
+class InverseLinkBudget:
+    MODELS = ('fspl', 'log_distance', 'friis')
+
+    def __init__(self, model='fspl', path_loss_exponent=2, ref_distance_ft=3.28084, environment='urban'):
+        """Initialize the InverseLinkBudget class"""
+        if model not in self.MODELS:
+            raise ValueError(f"Unknown path loss model '{model}', expected one of {self.MODELS}")
+        self.model = model  # Path loss model: 'fspl', 'log_distance' or 'friis'
+        self.path_loss_exponent = path_loss_exponent  # Log-distance path loss exponent
+        self.ref_distance_ft = ref_distance_ft  # Log-distance reference distance in feet
+        self.environment = environment  # Friis environment type
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'inverse_link.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def calculate_allowed_path_loss(tx_power, tx_gain, rx_gain, rssi_target, losses_tx=0.0, losses_rx=0.0):
+        """Largest path loss (dB) that still meets the RSSI target"""
+        return np.asarray(tx_power, dtype=float) + tx_gain + rx_gain - losses_tx - losses_rx - rssi_target
+
+    @staticmethod
+    def max_distance_fspl(frequency, path_loss):
+        """Invert FSPL for distance in feet (frequency in MHz)"""
+        distance_m = 10 ** ((np.asarray(path_loss, dtype=float) - 20 * np.log10(frequency) + 27.55) / 20)
+        return distance_m / 0.3048
+
+    @staticmethod
+    def max_distance_log_distance(frequency, path_loss, path_loss_exponent, ref_distance_ft=3.28084):
+        """Invert the log-distance model for distance in feet (frequency in MHz)"""
+        d0_m = ref_distance_ft * 0.3048
+        lp_d0 = 20 * np.log10(d0_m) + 20 * np.log10(frequency) - 27.55  # path loss at reference distance in dB
+        distance_m = d0_m * 10 ** ((np.asarray(path_loss, dtype=float) - lp_d0) / (10 * np.asarray(path_loss_exponent)))
+        return distance_m / 0.3048
+
+    @staticmethod
+    def max_distance_friis(frequency, path_loss, environment='urban'):
+        """Invert the environment-adjusted Friis loss for distance in meters (frequency in MHz)"""
+        n = Friis.PATH_LOSS_EXPONENTS.get(environment, Friis.PATH_LOSS_EXPONENTS['rural'])
+        lambda_ = 3 * 10**8 / (np.asarray(frequency, dtype=float) * 10**6)
+        # l_p = 20 log10(d / lambda) + 10 n log10(d) = (20 + 10 n) log10(d) - 20 log10(lambda)
+        return 10 ** ((np.asarray(path_loss, dtype=float) + 20 * np.log10(lambda_)) / (20 + 10 * n))
+
+    def calculate_path_loss(self, frequency, distance):
+        """Forward path loss (dB) of the configured model, distance in feet (meters for Friis)"""
+        frequency = np.asarray(frequency, dtype=float)
+        distance = np.asarray(distance, dtype=float)
+        if self.model == 'fspl':
+            return calculate_path_loss(frequency, distance)
+        if self.model == 'log_distance':
+            d0_m = self.ref_distance_ft * 0.3048
+            lp_d0 = 20 * np.log10(d0_m) + 20 * np.log10(frequency) - 27.55
+            return lp_d0 + 10 * self.path_loss_exponent * np.log10(distance * 0.3048 / d0_m)
+        # Friis with zero power and gains returns -l_p
+        return -Friis.calculate_friis(0, 0, 0, 0, distance, frequency, self.environment)["p_r"]
+
+    def max_distance(self, frequency, tx_power, tx_gain, rx_gain, rssi_target, losses_tx=0.0, losses_rx=0.0):
+        """Maximum distance that meets the RSSI target, in feet (meters for Friis)"""
+        path_loss = self.calculate_allowed_path_loss(tx_power, tx_gain, rx_gain, rssi_target, losses_tx, losses_rx)
+        if self.model == 'fspl':
+            return self.max_distance_fspl(frequency, path_loss)
+        if self.model == 'log_distance':
+            return self.max_distance_log_distance(frequency, path_loss, self.path_loss_exponent, self.ref_distance_ft)
+        return self.max_distance_friis(frequency, path_loss, self.environment)
+
+    def required_tx_power(self, frequency, distance, tx_gain, rx_gain, rssi_target, losses_tx=0.0, losses_rx=0.0):
+        """Transmit power (dBm) needed to meet the RSSI target at the given distance"""
+        path_loss = self.calculate_path_loss(frequency, distance)
+        return np.asarray(rssi_target, dtype=float) + path_loss - tx_gain - rx_gain + losses_tx + losses_rx
+
+    def required_gain(self, frequency, distance, tx_power, rssi_target, other_gain=0.0, losses_tx=0.0, losses_rx=0.0):
+        """Antenna gain (dBi) needed on one end, given the gain on the other end"""
+        path_loss = self.calculate_path_loss(frequency, distance)
+        return np.asarray(rssi_target, dtype=float) + path_loss - tx_power - other_gain + losses_tx + losses_rx
+
+# ## Run the Inverse Link Budget Calculation
+if __name__ == "__main__":
+    InverseLinkBudget.init_logger()
+    solver = InverseLinkBudget(model='fspl')
+    max_ft = solver.max_distance(frequency=900, tx_power=30, tx_gain=6, rx_gain=6, rssi_target=-90)
+    print(f"FSPL range at 900 MHz, 30 dBm, 6/6 dBi for -90 dBm: {max_ft:.0f} ft")
+
+    # Vectorized over constraints: range for every frequency and RSSI target at once
+    frequencies = np.arange(700, 3001, 50)[:, None]
+    rssi_targets = np.arange(-100, -59, 10)[None, :]
+    ranges_ft = solver.max_distance(frequencies, 30, 6, 6, rssi_targets)
+    logging.info(f"Solved {ranges_ft.size} range constraints")
+    print(f"Required power for 500 ft at 900 MHz: {solver.required_tx_power(900, 500, 6, 6, -90):.2f} dBm")
@@ -0,0 +1,159 @@
+# Link Budget Design Optimizer Script for VEDA
+# This script picks transmit power, antenna gains and cable losses that meet an RSSI or SNR target
+# over a set of receiver locations, and returns the Pareto front of cost vs margin.
+# The received power is monotonic in every design axis, so infeasible and dominated branches are pruned
+# with upper bounds before evaluation, and the surviving candidates are evaluated in vectorized blocks.
+
+# ## Import necessary libraries
+import os
+import logging
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from generate_link_budget_data import (
+    calculate_path_loss, calculate_received_power,
+    TX_POWERS, TX_GAINS, RX_GAINS, LOSSES_TX, LOSSES_RX
+)
+
+# ## Define the LinkBudgetOptimizer class
+class LinkBudgetOptimizer:
+    def __init__(self, tx_powers=TX_POWERS, tx_gains=TX_GAINS, rx_gains=RX_GAINS, cable_losses=None, costs=None):
+        """Initialize the LinkBudgetOptimizer class
+
+        Parameters:
+        tx_powers, tx_gains, rx_gains (array): Discrete design options in dBm / dBi
+        cable_losses (array): Total Tx + Rx cable loss options in dB
+        costs (dict): Optional per-option cost arrays keyed by 'tx_power', 'tx_gain', 'rx_gain', 'cable_loss'.
+            Defaults to the option value itself for power and gains, and zero for cable losses.
+        """
+        if cable_losses is None:
+            cable_losses = [LOSSES_TX + LOSSES_RX]
+        costs = costs or {}
+        self.axes = {}
+        for name, values, default_cost in (
+            ('tx_power', tx_powers, tx_powers),
+            ('tx_gain', tx_gains, tx_gains),
+            ('rx_gain', rx_gains, rx_gains),
+            ('cable_loss', cable_losses, np.zeros(len(cable_losses))),
+        ):
+            values = np.asarray(values, dtype=float)
+            cost = np.asarray(costs.get(name, default_cost), dtype=float)
+            if cost.shape != values.shape:
+                raise ValueError(f"Cost array for '{name}' must match its {values.size} design options")
+            self.axes[name] = (values, cost)
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'link_budget_optimizer.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def pareto_front(cost, margin):
+        """Indices of the points not dominated in (lower cost, higher margin)"""
+        order = np.lexsort((-margin, cost))
+        sorted_margin = margin[order]
+        best_before = np.maximum.accumulate(np.concatenate(([-np.inf], sorted_margin[:-1])))
+        return order[sorted_margin > best_before]
+
+    @staticmethod
+    def required_level(frequencies, distances_ft, rssi_target=None, snr_target=None, noise_floor_dbm=None):
+        """Worst-case level P_t + G_t + G_r - L the design must reach over every receiver"""
+        path_loss = calculate_path_loss(np.asarray(frequencies, dtype=float), np.asarray(distances_ft, dtype=float))
+        if rssi_target is not None:
+            target = np.asarray(rssi_target, dtype=float)
+        elif snr_target is not None and noise_floor_dbm is not None:
+            target = np.asarray(noise_floor_dbm, dtype=float) + snr_target
+        else:
+            raise ValueError("Provide rssi_target, or snr_target together with noise_floor_dbm")
+        return float(np.max(path_loss + target))
+
+    def optimize(self, frequencies, distances_ft, rssi_target=None, snr_target=None, noise_floor_dbm=None):
+        """Return the Pareto front of cost vs worst-case margin as a DataFrame"""
+        required = self.required_level(frequencies, distances_ft, rssi_target, snr_target, noise_floor_dbm)
+
+        powers, power_cost = self.axes['tx_power']
+        tx_gains, tx_gain_cost = self.axes['tx_gain']
+        rx_gains, rx_gain_cost = self.axes['rx_gain']
+        cable_losses, cable_cost = self.axes['cable_loss']
+
+        # Flatten the two innermost axes into one block evaluated per (tx_power, tx_gain) branch
+        inner_gain = (rx_gains[:, None] - cable_losses[None, :]).ravel()
+        inner_cost = (rx_gain_cost[:, None] + cable_cost[None, :]).ravel()
+        inner_rx, inner_loss = (idx.ravel() for idx in np.meshgrid(
+            np.arange(rx_gains.size), np.arange(cable_losses.size), indexing='ij'))
+        max_inner_gain = inner_gain.max()
+        min_inner_cost = inner_cost.min()
+        max_tx_gain = tx_gains.max()
+        min_tx_gain_cost = tx_gain_cost.min()
+
+        front_cost = np.empty(0)
+        front_margin = np.empty(0)
+        front_index = np.empty((0, 4), dtype=int)
+        evaluated = pruned = 0
+
+        for p in range(powers.size):
+            # Upper bound on margin and lower bound on cost for the whole tx_power branch
+            if powers[p] + max_tx_gain + max_inner_gain - required < 0:
+                pruned += tx_gains.size * inner_gain.size
+                continue
+            branch_margin_ub = powers[p] + tx_gains + max_inner_gain - required
+            branch_cost_lb = power_cost[p] + tx_gain_cost + min_inner_cost
+            keep = branch_margin_ub >= 0
+            if front_cost.size:
+                # A branch is dominated when a known design is no costlier and has at least its best margin
+                dominated = (front_cost[None, :] <= branch_cost_lb[:, None]) & \
+                            (front_margin[None, :] >= branch_margin_ub[:, None])
+                keep &= ~dominated.any(axis=1)
+            pruned += int((~keep).sum()) * inner_gain.size
+            rows = np.flatnonzero(keep)
+            if rows.size == 0:
+                continue
+
+            margin = calculate_received_power(powers[p], tx_gains[rows, None], 0, required,
+                                              inner_gain[None, :], 0)
+            cost = power_cost[p] + tx_gain_cost[rows, None] + inner_cost[None, :]
+            evaluated += margin.size
+            feasible = margin >= 0
+            if not feasible.any():
+                continue
+            row_idx, col_idx = np.nonzero(feasible)
+            index = np.column_stack((
+                np.full(row_idx.size, p), rows[row_idx], inner_rx[col_idx], inner_loss[col_idx]
+            ))
+            front_cost = np.concatenate((front_cost, cost[feasible]))
+            front_margin = np.concatenate((front_margin, margin[feasible]))
+            front_index = np.concatenate((front_index, index))
+            on_front = self.pareto_front(front_cost, front_margin)
+            front_cost, front_margin, front_index = front_cost[on_front], front_margin[on_front], front_index[on_front]
+
+        logging.debug(f"Evaluated {evaluated} designs, pruned {pruned} of "
+                      f"{powers.size * tx_gains.size * inner_gain.size}")
+        order = np.argsort(front_cost)
+        front_index = front_index[order]
+        return pd.DataFrame({
+            'Tx_Power_dBm': powers[front_index[:, 0]],
+            'Tx_Gain_dBi': tx_gains[front_index[:, 1]],
+            'Rx_Gain_dBi': rx_gains[front_index[:, 2]],
+            'Cable_Losses_dB': cable_losses[front_index[:, 3]],
+            'Cost': front_cost[order],
+            'Margin_dB': front_margin[order],
+        })
+
+# ## Run the Link Budget Optimization
+if __name__ == "__main__":
+    LinkBudgetOptimizer.init_logger()
+    optimizer = LinkBudgetOptimizer(
+        cable_losses=[1.0, 2.0, 4.0],
+        costs={'cable_loss': [6.0, 3.0, 0.0]},  # Low-loss cable costs more
+    )
+    receivers_ft = np.array([120, 250, 480])  # Receiver locations
+    front = optimizer.optimize(frequencies=2400, distances_ft=receivers_ft, rssi_target=-60)
+    print(front.to_string(index=False))
@@ -0,0 +1,158 @@
+# Link State Simulator Script for VEDA
+# This script steps link budgets through time as nodes move or change transmit power.
+# Per-link state (distance, path loss, EIRP, received power, RSSI, SNR) lives in compact float32 arrays.
+# Every update marks the touched nodes dirty, and each step recomputes only the links incident to them,
+# so the per-step cost follows the amount of change rather than the size of the network.
+
+# ## Import necessary libraries
+import os
+import logging
+from pathlib import Path
+import numpy as np
+
+from generate_link_budget_data import calculate_path_loss, calculate_received_power
+from eirp_calculation import EIRP
+from rssi_calculation import RSSI
+from snr_calculation import SNR
+
+# ## Define the LinkStateSimulator class
+class LinkStateSimulator:
+    STATE_FIELDS = ('distance_ft', 'path_loss', 'eirp', 'rx_power', 'rssi', 'snr')
+
+    def __init__(self, positions_ft, src, dst, frequency, tx_power, tx_gain, rx_gain,
+                 losses_tx=2.0, losses_rx=2.0, nf=5.0, bandwidth_hz=20e6):
+        """Initialize the LinkStateSimulator class
+
+        Parameters:
+        positions_ft (array): Node positions, shape (N, 2), in feet
+        src, dst (array): Transmitting and receiving node of each link
+        frequency (float or array): Link frequency in MHz, per link or shared
+        tx_power, tx_gain, rx_gain (float or array): Per-node transmit power (dBm) and antenna gains (dBi)
+        losses_tx, losses_rx (float): Transmitter and receiver losses in dB
+        nf (float or array): Per-node receiver noise figure in dB
+        bandwidth_hz (float): Receiver bandwidth in Hz
+        """
+        self.positions_ft = np.array(positions_ft, dtype=np.float32)
+        num_nodes = self.positions_ft.shape[0]
+        self.src = np.asarray(src, dtype=np.int32)
+        self.dst = np.asarray(dst, dtype=np.int32)
+        num_links = self.src.size
+        self.frequency = np.broadcast_to(np.asarray(frequency, dtype=np.float32), (num_links,)).copy()
+        self.tx_power = np.broadcast_to(np.asarray(tx_power, dtype=np.float32), (num_nodes,)).copy()
+        self.tx_gain = np.broadcast_to(np.asarray(tx_gain, dtype=np.float32), (num_nodes,)).copy()
+        self.rx_gain = np.broadcast_to(np.asarray(rx_gain, dtype=np.float32), (num_nodes,)).copy()
+        self.nf = np.broadcast_to(np.asarray(nf, dtype=np.float32), (num_nodes,)).copy()
+        self.losses_tx = losses_tx
+        self.losses_rx = losses_rx
+        self.bandwidth_hz = bandwidth_hz
+        self.time_step = 0
+
+        self.state = {field: np.zeros(num_links, dtype=np.float32) for field in self.STATE_FIELDS}
+
+        # Node -> incident link lookup in CSR form, so dirty nodes map to links without scanning every link
+        endpoints = np.concatenate((self.src, self.dst))
+        link_ids = np.concatenate((np.arange(num_links), np.arange(num_links))).astype(np.int32)
+        order = np.argsort(endpoints, kind='stable')
+        self.incident_links = link_ids[order]
+        self.incident_ptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(endpoints, minlength=num_nodes), out=self.incident_ptr[1:])
+
+        # Geometry changes need path loss, power changes only the budget on top of it
+        self.geometry_dirty = np.ones(num_nodes, dtype=bool)
+        self.power_dirty = np.ones(num_nodes, dtype=bool)
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'link_state_simulator.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def calculate_noise_floor(nf, bandwidth_hz):
+        """Thermal noise floor in dBm for a noise figure and bandwidth"""
+        return -174 + 10 * np.log10(bandwidth_hz) + nf
+
+    def move_nodes(self, node_ids, positions_ft):
+        """Move nodes to new positions (feet)"""
+        node_ids = np.asarray(node_ids)
+        self.positions_ft[node_ids] = positions_ft
+        self.geometry_dirty[node_ids] = True
+
+    def set_tx_power(self, node_ids, tx_power):
+        """Change the transmit power (dBm) of nodes"""
+        node_ids = np.asarray(node_ids)
+        self.tx_power[node_ids] = tx_power
+        self.power_dirty[node_ids] = True
+
+    def _links_of(self, node_mask):
+        """Indices of links incident to the masked nodes"""
+        nodes = np.flatnonzero(node_mask)
+        if nodes.size == 0:
+            return np.empty(0, dtype=np.int32)
+        starts = self.incident_ptr[nodes]
+        counts = self.incident_ptr[nodes + 1] - starts
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+        return np.unique(self.incident_links[offsets + np.arange(counts.sum())])
+
+    def step(self):
+        """Advance one time step, recomputing only links whose inputs changed"""
+        geometry_links = self._links_of(self.geometry_dirty)
+        dirty_links = np.union1d(geometry_links, self._links_of(self.power_dirty))
+
+        if geometry_links.size:
+            delta = self.positions_ft[self.src[geometry_links]] - self.positions_ft[self.dst[geometry_links]]
+            distance_ft = np.hypot(delta[:, 0], delta[:, 1]).astype(np.float64)
+            self.state['distance_ft'][geometry_links] = distance_ft
+            self.state['path_loss'][geometry_links] = calculate_path_loss(
+                self.frequency[geometry_links].astype(np.float64), distance_ft)
+
+        if dirty_links.size:
+            tx = self.src[dirty_links]
+            rx = self.dst[dirty_links]
+            path_loss = self.state['path_loss'][dirty_links].astype(np.float64)
+            eirp = EIRP.calculate_eirp(self.tx_power[tx].astype(np.float64), self.tx_gain[tx], self.losses_tx)["EIRP (dBm)"]
+            rx_power = calculate_received_power(self.tx_power[tx].astype(np.float64), self.tx_gain[tx], self.losses_tx,
+                                                path_loss, self.rx_gain[rx], self.losses_rx)
+            # RSSI takes the power at the receive antenna port before path loss
+            rssi = RSSI.calculate_rssi(eirp + self.rx_gain[rx] - self.losses_rx, path_loss, self.nf[rx])["RSSI"]
+            snr = SNR.calculate_snr(rx_power, self.calculate_noise_floor(self.nf[rx], self.bandwidth_hz))["SNR"]
+            self.state['eirp'][dirty_links] = eirp
+            self.state['rx_power'][dirty_links] = rx_power
+            self.state['rssi'][dirty_links] = rssi
+            self.state['snr'][dirty_links] = snr
+
+        self.geometry_dirty[:] = False
+        self.power_dirty[:] = False
+        self.time_step += 1
+        logging.debug(f"Step {self.time_step}: recomputed {dirty_links.size} of {self.src.size} links "
+                      f"({geometry_links.size} with new geometry)")
+        return dirty_links.size
+
+    def snapshot(self):
+        """Copy of the current per-link state"""
+        return {field: values.copy() for field, values in self.state.items()}
+
+# ## Run the Link State Simulation
+if __name__ == "__main__":
+    LinkStateSimulator.init_logger()
+    rng = np.random.default_rng(0)
+    num_nodes, num_links = 10000, 100000
+    positions = rng.uniform(0, 5000, (num_nodes, 2))
+    src = rng.integers(0, num_nodes, num_links)
+    dst = (src + rng.integers(1, num_nodes, num_links)) % num_nodes
+    sim = LinkStateSimulator(positions, src, dst, frequency=2400, tx_power=30, tx_gain=6, rx_gain=6)
+    sim.step()  # Initial full evaluation
+
+    for t in range(10):
+        movers = rng.choice(num_nodes, 50, replace=False)  # 0.5% of nodes move each step
+        sim.move_nodes(movers, sim.positions_ft[movers] + rng.normal(0, 10, (movers.size, 2)))
+        if t % 5 == 0:
+            sim.set_tx_power(rng.choice(num_nodes, 10, replace=False), 27)
+        updated = sim.step()
+        print(f"Step {sim.time_step}: {updated} links updated, mean SNR {sim.state['snr'].mean():.2f} dB")
@@ -0,0 +1,225 @@
+# Mesh Route Budget Calculation Script for VEDA
+# This script extends single-link budgets to multi-hop mesh networks. Candidate links are found with a KD-tree
+# inside the free-space range at sensitivity, their path loss, received power, SNR and capacity are computed in
+# bulk, and links below sensitivity are pruned. The surviving graph is stored as compact CSR arrays and routed
+# from every source with heap-based shortest paths (airtime, path loss or hops) or widest paths (bottleneck
+# capacity or SNR), which follow the maximum spanning tree of the undirected link graph.
+
+# ## Import necessary libraries
+import os
+import logging
+from pathlib import Path
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra, minimum_spanning_tree, breadth_first_order
+from scipy.spatial import cKDTree
+
+from generate_link_budget_data import calculate_path_loss, calculate_received_power
+from inverse_link_calculation import InverseLinkBudget
+from link_state_simulator import LinkStateSimulator
+from rf_expression_graph import RFExpressionGraph
+from snr_calculation import SNR
+
+# ## Define the MeshRouteBudget class
+class MeshRouteBudget:
+    SHORTEST_METRICS = ('airtime', 'path_loss', 'hops')
+    WIDEST_METRICS = ('capacity', 'snr')
+
+    def __init__(self, nodes_xy_ft, frequency, tx_power=20.0, tx_gain=2.0, rx_gain=2.0, losses_tx=2.0,
+                 losses_rx=2.0, sensitivity_dbm=-85.0, nf=5.0, bandwidth_hz=20e6):
+        """Initialize the MeshRouteBudget class
+
+        Parameters:
+        nodes_xy_ft (array): Node positions, shape (N, 2), in feet
+        frequency (float): Carrier frequency in MHz
+        tx_power, tx_gain, rx_gain (float or array): Per-node transmit power (dBm) and antenna gains (dBi)
+        sensitivity_dbm (float): Minimum received power for a usable link
+        nf (float): Receiver noise figure in dB
+        bandwidth_hz (float): Channel bandwidth in Hz
+        """
+        self.nodes_xy_ft = np.asarray(nodes_xy_ft, dtype=float)
+        n = len(self.nodes_xy_ft)
+        self.frequency = frequency  # in MHz
+        self.tx_power = np.broadcast_to(np.asarray(tx_power, dtype=float), n)
+        self.tx_gain = np.broadcast_to(np.asarray(tx_gain, dtype=float), n)
+        self.rx_gain = np.broadcast_to(np.asarray(rx_gain, dtype=float), n)
+        self.losses_tx = losses_tx  # in dB
+        self.losses_rx = losses_rx  # in dB
+        self.sensitivity_dbm = sensitivity_dbm
+        self.bandwidth_hz = bandwidth_hz
+        self.noise_floor_dbm = LinkStateSimulator.calculate_noise_floor(nf, bandwidth_hz)
+        self.indptr = None  # CSR row pointers, built by build_graph
+        self.indices = None  # CSR neighbour indices
+        self.edges = {}  # Per-edge metric arrays aligned with indices
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'mesh_route.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    def candidate_range_ft(self):
+        """Longest free-space link that can reach sensitivity with the strongest node settings"""
+        allowed = InverseLinkBudget.calculate_allowed_path_loss(
+            self.tx_power.max(), self.tx_gain.max(), self.rx_gain.max(), self.sensitivity_dbm,
+            self.losses_tx, self.losses_rx)
+        return float(InverseLinkBudget.max_distance_fspl(self.frequency, allowed))
+
+    def link_budget(self, tx, rx, distance_ft):
+        """Received power, SNR and capacity for arrays of directed links"""
+        path_loss = calculate_path_loss(self.frequency, distance_ft)
+        rx_power = calculate_received_power(self.tx_power[tx], self.tx_gain[tx], self.losses_tx, path_loss,
+                                            self.rx_gain[rx], self.losses_rx)
+        snr = SNR.calculate_snr(rx_power, self.noise_floor_dbm)["SNR"]
+        capacity = RFExpressionGraph.calculate_channel_capacity(self.bandwidth_hz, snr)
+        return path_loss, rx_power, snr, capacity
+
+    def build_graph(self, max_range_ft=None):
+        """Find, evaluate and prune links, then store the undirected graph as CSR arrays
+
+        A link is kept only when both directions clear the sensitivity, and carries the weaker direction's metrics.
+        """
+        max_range_ft = self.candidate_range_ft() if max_range_ft is None else max_range_ft
+        pairs = cKDTree(self.nodes_xy_ft).query_pairs(max_range_ft, output_type='ndarray')
+        a, b = pairs[:, 0], pairs[:, 1]
+        distance_ft = np.maximum(np.hypot(*(self.nodes_xy_ft[a] - self.nodes_xy_ft[b]).T), 1.0)
+        forward = self.link_budget(a, b, distance_ft)
+        backward = self.link_budget(b, a, distance_ft)
+        path_loss = np.maximum(forward[0], backward[0])
+        rx_power, snr, capacity = (np.minimum(f, r) for f, r in zip(forward[1:], backward[1:]))
+        keep = rx_power >= self.sensitivity_dbm
+        logging.debug(f"Evaluated {len(pairs)} candidate links within {max_range_ft:.0f} ft, kept {keep.sum()}")
+
+        # Store both directions, sorted by source node
+        src = np.concatenate((a[keep], b[keep]))
+        dst = np.concatenate((b[keep], a[keep]))
+        order = np.argsort(src, kind='stable')
+        n = len(self.nodes_xy_ft)
+        self.indptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=n)))).astype(np.int64)
+        self.indices = dst[order].astype(np.int32)
+        self.edges = {
+            name: np.tile(values[keep], 2)[order].astype(np.float32)
+            for name, values in (('distance_ft', distance_ft), ('path_loss', path_loss), ('rx_power', rx_power),
+                                 ('snr', snr), ('capacity', capacity))
+        }
+        return self
+
+    def edge_matrix(self, weights):
+        """Sparse CSR matrix sharing the graph's index arrays"""
+        n = len(self.nodes_xy_ft)
+        return csr_matrix((weights, self.indices, self.indptr), shape=(n, n))
+
+    def edge_weights(self, metric):
+        """Additive edge weight for a shortest-path metric"""
+        if metric == 'airtime':
+            return 1.0 / self.edges['capacity'].astype(float)  # seconds per bit on each hop
+        if metric == 'path_loss':
+            return self.edges['path_loss'].astype(float)
+        return np.ones(len(self.indices))
+
+    def shortest_paths(self, sources, metric='airtime', min_only=False):
+        """Heap-based shortest paths from each source: cost (S, N) and predecessors (S, N)
+
+        Airtime costs are seconds per bit, so 1 / cost is the end-to-end throughput. With min_only, every node
+        is routed from its best source instead, returning cost (N,), predecessors (N,) and the source (N,).
+        """
+        if metric not in self.SHORTEST_METRICS:
+            raise ValueError(f"Unknown shortest-path metric '{metric}', expected one of {self.SHORTEST_METRICS}")
+        if self.indptr is None:
+            self.build_graph()
+        return dijkstra(self.edge_matrix(self.edge_weights(metric)), directed=True, indices=np.atleast_1d(sources),
+                        return_predecessors=True, min_only=min_only)
+
+    def widest_paths(self, sources, metric='capacity'):
+        """Bottleneck value (S, N) and predecessors (S, N) of the widest path from each source
+
+        Widest paths in an undirected graph run along its maximum spanning tree, so the tree is built once
+        and each source only needs one traversal of it.
+        """
+        if metric not in self.WIDEST_METRICS:
+            raise ValueError(f"Unknown widest-path metric '{metric}', expected one of {self.WIDEST_METRICS}")
+        if self.indptr is None:
+            self.build_graph()
+        values = self.edges[metric].astype(float)
+        # Any decreasing positive transform turns the maximum spanning tree into a minimum one
+        tree = minimum_spanning_tree(self.edge_matrix(values.max() - values + 1.0))
+        tree = tree + tree.T
+        tree.data = values.max() + 1.0 - tree.data
+
+        sources = np.atleast_1d(sources)
+        n = len(self.nodes_xy_ft)
+        bottleneck = np.full((len(sources), n), np.nan)
+        predecessors = np.full((len(sources), n), -9999, dtype=np.int32)
+        for row, source in enumerate(sources):
+            order, pred = breadth_first_order(tree, source, directed=False, return_predecessors=True)
+            width = np.full(n, np.nan)
+            width[source] = np.inf
+            hop_width = np.asarray(tree[pred[order[1:]], order[1:]]).ravel()
+            for node, parent, w in zip(order[1:].tolist(), pred[order[1:]].tolist(), hop_width.tolist()):
+                width[node] = min(width[parent], w)
+            bottleneck[row] = width
+            predecessors[row] = pred
+        return bottleneck, predecessors
+
+    @staticmethod
+    def path(predecessors, destination):
+        """Node sequence from the source to a destination, given one row of predecessors
+
+        Sources and unreachable nodes both return [destination]; check the route cost to tell them apart.
+        """
+        nodes = [destination]
+        while predecessors[nodes[-1]] >= 0:
+            nodes.append(int(predecessors[nodes[-1]]))
+        return nodes[::-1]
+
+    def route_budgets(self, gateways, metric='airtime'):
+        """Best gateway, route cost, hop count and bottleneck SNR for every node
+
+        Hop counts and bottleneck SNR follow the chosen routes, accumulated over the predecessor forest by
+        pointer jumping.
+        """
+        cost, predecessors, gateway = self.shortest_paths(gateways, metric, min_only=True)
+        nodes = np.arange(len(self.nodes_xy_ft))
+        has_parent = predecessors >= 0
+        hops = has_parent.astype(np.int64)
+        snr = np.full(len(nodes), np.inf)
+        snr[has_parent] = np.asarray(
+            self.edge_matrix(self.edges['snr'])[predecessors[has_parent], nodes[has_parent]]).ravel()
+        jump = np.where(has_parent, predecessors, -1)
+        while (jump >= 0).any():
+            up = jump >= 0
+            hops[up] += hops[jump[up]]
+            snr[up] = np.minimum(snr[up], snr[jump[up]])
+            jump[up] = jump[jump[up]]
+        reachable = np.isfinite(cost)
+        budgets = {
+            "gateway": np.where(reachable, gateway, -1),
+            "cost": cost,
+            "hops": np.where(reachable, hops, -1),
+            "bottleneck_snr_dB": np.where(reachable & has_parent, snr, np.nan),
+            "predecessors": predecessors,
+        }
+        if metric == 'airtime':
+            with np.errstate(divide='ignore'):
+                budgets["throughput_bps"] = 1.0 / cost
+        return budgets
+
+# ## Run the Mesh Route Budget Calculation
+if __name__ == "__main__":
+    MeshRouteBudget.init_logger()
+    rng = np.random.default_rng(0)
+    nodes = rng.uniform(0, 60000, (50000, 2))  # 50k mesh nodes over a 60,000 ft square
+    mesh = MeshRouteBudget(nodes, frequency=5800, tx_power=10, tx_gain=2, rx_gain=2, sensitivity_dbm=-80)
+    mesh.build_graph()
+    print(f"{len(mesh.indices) // 2} links kept, mean degree {len(mesh.indices) / len(nodes):.1f}")
+    gateways = rng.choice(len(nodes), 20, replace=False)
+    budgets = mesh.route_budgets(gateways)
+    served = budgets["gateway"] >= 0
+    print(f"{served.mean() * 100:.1f}% of nodes reach a gateway, median {np.median(budgets['hops'][served]):.0f} hops, "
+          f"median throughput {np.median(budgets['throughput_bps'][served]) / 1e6:.1f} Mbit/s")
@@ -0,0 +1,258 @@
+# Multipath Reflection Calculation Script for VEDA
+# This script estimates multipath in small indoor scenes with a 2D image-method ray engine over wall segments.
+# Transmitter images are enumerated up to a maximum reflection order, pruning walls that cannot be lit by the
+# previous reflection, and every image is validated against whole receiver blocks at once in NumPy.
+# Each valid path reports its received power and delay, and receivers get total power and RMS delay spread.
+
+# ## Import necessary libraries
+import os
+import logging
+from pathlib import Path
+import numpy as np
+
+from generate_link_budget_data import calculate_path_loss
+from indoor_path_loss_calculation import MultiWallPathLoss
+
+SPEED_OF_LIGHT_FTPS = 983571056.43  # Speed of light in feet per second
+EPSILON = 1e-9
+
+# ## Define the ImageMethodReflections class
+class ImageMethodReflections:
+    # Typical loss per reflection around 2.4 GHz, in dB
+    REFLECTION_LOSSES = {
+        'glass': 6.0,
+        'drywall': 10.0,
+        'wood': 9.0,
+        'brick': 7.0,
+        'concrete': 6.0,
+        'metal': 1.0,
+    }
+
+    def __init__(self, segments, frequency, max_order=2, reflection_losses=None, material_losses=None,
+                 max_path_ft=None, block_elements=4000000):
+        """Initialize the ImageMethodReflections class
+
+        Parameters:
+        segments (list): Wall segments as (x0, y0, x1, y1, material), in feet
+        frequency (float): Carrier frequency in MHz
+        max_order (int): Highest reflection order traced
+        reflection_losses (dict): Overrides for REFLECTION_LOSSES (dB per bounce)
+        material_losses (dict): Overrides for the wall penetration losses of MultiWallPathLoss (dB per wall)
+        max_path_ft (float): Drop images whose unfolded path to the scene is longer than this
+        block_elements (int): Image x receiver x wall elements evaluated per NumPy block
+        """
+        ends = np.array([s[:4] for s in segments], dtype=float).reshape(-1, 4)
+        self.wall_start = ends[:, :2]
+        self.wall_end = ends[:, 2:]
+        self.materials = [s[4] for s in segments]
+        reflection = dict(self.REFLECTION_LOSSES, **(reflection_losses or {}))
+        penetration = dict(MultiWallPathLoss.MATERIAL_LOSSES, **(material_losses or {}))
+        self.reflection_loss = np.array([reflection[m] for m in self.materials])
+        self.penetration_loss = np.array([penetration[m] for m in self.materials])
+        self.frequency = frequency  # in MHz
+        self.max_order = max_order
+        self.max_path_ft = max_path_ft
+        self.block_elements = block_elements
+        self.image_cache = {}  # tx position -> enumerated image tree
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'multipath_reflection.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def cross(a, b):
+        """z component of the 2D cross product of broadcastable (..., 2) arrays"""
+        return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+    @staticmethod
+    def reflect_points(points, wall_start, wall_end):
+        """Mirror points across the lines through the given walls"""
+        direction = wall_end - wall_start
+        direction = direction / np.linalg.norm(direction, axis=-1, keepdims=True)
+        offset = points - wall_start
+        along = np.sum(offset * direction, axis=-1, keepdims=True) * direction
+        return wall_start + 2 * along - offset
+
+    @staticmethod
+    def segment_intersection(a, b, wall_start, wall_end):
+        """Parameters (t along a->b, u along the wall) where segment a->b meets each wall line"""
+        d = b - a
+        e = wall_end - wall_start
+        offset = wall_start - a
+        with np.errstate(divide='ignore', invalid='ignore'):
+            denom = ImageMethodReflections.cross(d, e)
+            t = ImageMethodReflections.cross(offset, e) / denom
+            u = ImageMethodReflections.cross(offset, d) / denom
+        return t, u
+
+    def enumerate_images(self, tx_xy):
+        """Image tree for one transmitter: per order, image positions, parent image and reflecting wall
+
+        A wall can only follow the previous reflection if it differs from it, the parent image is not on
+        its line, and part of it lies in front of the previous wall, where the reflected rays travel.
+        """
+        key = tuple(np.asarray(tx_xy, dtype=float))
+        if key in self.image_cache:
+            return self.image_cache[key]
+        num_walls = len(self.materials)
+        scene_low = np.minimum(self.wall_start, self.wall_end).min(axis=0, initial=np.inf)
+        scene_high = np.maximum(self.wall_start, self.wall_end).max(axis=0, initial=-np.inf)
+
+        tree = []
+        images = np.array([key])
+        parent_wall = np.array([-1])
+        for order in range(1, self.max_order + 1):
+            parent, wall = np.divmod(np.arange(len(images) * num_walls), num_walls)
+            source = images[parent]
+            # Parent image must not lie on the new wall's line
+            side = self.cross(self.wall_end[wall] - self.wall_start[wall], source - self.wall_start[wall])
+            keep = (wall != parent_wall[parent]) & (np.abs(side) > EPSILON)
+            if order > 1:
+                # The new wall must reach the half-plane in front of the previous wall (away from the parent image)
+                p_start, p_end = self.wall_start[parent_wall[parent]], self.wall_end[parent_wall[parent]]
+                image_side = np.sign(self.cross(p_end - p_start, source - p_start))
+                front_a = np.sign(self.cross(p_end - p_start, self.wall_start[wall] - p_start)) == -image_side
+                front_b = np.sign(self.cross(p_end - p_start, self.wall_end[wall] - p_start)) == -image_side
+                keep &= front_a | front_b
+            parent, wall = parent[keep], wall[keep]
+            new_images = self.reflect_points(images[parent], self.wall_start[wall], self.wall_end[wall])
+            if self.max_path_ft is not None:
+                gap = np.maximum(np.maximum(scene_low - new_images, new_images - scene_high), 0)
+                reach = np.hypot(gap[:, 0], gap[:, 1]) <= self.max_path_ft
+                parent, wall, new_images = parent[reach], wall[reach], new_images[reach]
+            logging.debug(f"Order {order}: kept {len(wall)} of {len(keep)} candidate images")
+            tree.append({"images": new_images, "parent": parent, "wall": wall})
+            images, parent_wall = new_images, wall
+            if not len(images):
+                break
+        self.image_cache[key] = tree
+        return tree
+
+    def chains(self, tree, order):
+        """Ancestor images (M, order, 2) and walls (M, order) of every image of one order"""
+        level = tree[order - 1]
+        count = len(level["wall"])
+        images = np.empty((count, order, 2))
+        walls = np.empty((count, order), dtype=np.intp)
+        index = np.arange(count)
+        for j in range(order - 1, -1, -1):
+            images[:, j] = tree[j]["images"][index]
+            walls[:, j] = tree[j]["wall"][index]
+            index = tree[j]["parent"][index]
+        return images, walls
+
+    def crossing_loss(self, a, b, exclude):
+        """Penetration loss (dB) of the walls crossed by legs a->b, skipping the walls in exclude"""
+        t, u = self.segment_intersection(a[..., None, :], b[..., None, :], self.wall_start, self.wall_end)
+        crossed = (t > EPSILON) & (t < 1 - EPSILON) & (u >= 0) & (u <= 1)
+        for wall in exclude:
+            crossed &= np.arange(len(self.materials)) != wall[..., None]
+        return crossed @ self.penetration_loss
+
+    def trace_order(self, tree, order, tx_xy, rx_xy):
+        """Valid paths of one reflection order for a block of receivers
+
+        Returns (image, receiver, length_ft, loss_dB) for every valid path, where loss_dB covers the
+        reflection and penetration losses on top of free-space loss over the unfolded length.
+        """
+        if order == 0:
+            images = np.asarray(tx_xy, dtype=float)[None, None, :]
+            walls = np.empty((1, 0), dtype=np.intp)
+        else:
+            images, walls = self.chains(tree, order)
+        last = images[:, -1][:, None, :]
+        point = np.broadcast_to(rx_xy[None, :, :], (len(images), len(rx_xy), 2))
+        valid = np.ones(point.shape[:2], dtype=bool)
+        loss = np.zeros(point.shape[:2])
+        next_wall = np.full(point.shape[:2], -1)
+
+        # Walk back from the receiver: each leg runs from the previous reflection point to the current one
+        for j in range(order - 1, -1, -1):
+            source = images[:, j][:, None, :]
+            wall = walls[:, j][:, None]
+            t, u = self.segment_intersection(source, point, self.wall_start[wall], self.wall_end[wall])
+            valid &= (t > EPSILON) & (t < 1 - EPSILON) & (u >= 0) & (u <= 1)
+            with np.errstate(invalid='ignore'):
+                hit = source + t[..., None] * (point - source)  # NaN where the leg is parallel to the wall
+            loss += self.crossing_loss(hit, point, (np.broadcast_to(wall, valid.shape), next_wall))
+            loss += self.reflection_loss[wall]
+            point, next_wall = hit, np.broadcast_to(wall, valid.shape)
+
+        tx = np.broadcast_to(np.asarray(tx_xy, dtype=float), point.shape)
+        loss += self.crossing_loss(tx, point, (next_wall,))
+        image_index, rx_index = np.nonzero(valid)
+        length = np.hypot(*np.moveaxis(rx_xy[None, :, :] - last, -1, 0))
+        return image_index, rx_index, length[valid], loss[valid]
+
+    def calculate(self, tx_xy, rx_xy, tx_power=0.0, tx_gain=0.0, rx_gain=0.0):
+        """Per-path power and delay for arrays of receivers, plus per-receiver totals and delay spread"""
+        rx_xy = np.asarray(rx_xy, dtype=float)
+        shape = rx_xy.shape[:-1]
+        rx_xy = rx_xy.reshape(-1, 2)
+        tree = self.enumerate_images(tx_xy)
+        num_walls = max(len(self.materials), 1)
+
+        columns = {"rx_index": [], "order": [], "image_index": [], "length_ft": [], "loss_dB": []}
+        for order in range(len(tree) + 1):
+            num_images = 1 if order == 0 else len(tree[order - 1]["wall"])
+            if not num_images:
+                continue
+            rx_block = max(1, self.block_elements // (num_images * num_walls))
+            for start in range(0, len(rx_xy), rx_block):
+                image_index, rx_index, length, loss = self.trace_order(tree, order, tx_xy, rx_xy[start:start + rx_block])
+                columns["rx_index"].append(rx_index + start)
+                columns["order"].append(np.full(len(rx_index), order, dtype=np.int8))
+                columns["image_index"].append(image_index)
+                columns["length_ft"].append(length)
+                columns["loss_dB"].append(loss)
+        paths = {k: np.concatenate(v) for k, v in columns.items()}
+
+        length = np.maximum(paths.pop("length_ft"), EPSILON)
+        path_loss = calculate_path_loss(self.frequency, length) + paths.pop("loss_dB")
+        paths["power_dBm"] = tx_power + tx_gain + rx_gain - path_loss
+        paths["delay_s"] = length / SPEED_OF_LIGHT_FTPS
+        paths["length_ft"] = length
+        logging.debug(f"Traced {len(length)} valid paths to {len(rx_xy)} receivers")
+
+        totals = self.calculate_delay_spread(paths["power_dBm"], paths["delay_s"], paths["rx_index"], len(rx_xy))
+        return {"paths": paths, **{k: v.reshape(shape) for k, v in totals.items()}}
+
+    @staticmethod
+    def calculate_delay_spread(power_dbm, delay_s, rx_index, num_rx):
+        """Total received power, power-weighted mean delay and RMS delay spread per receiver"""
+        power_mw = 10 ** (power_dbm / 10)
+        total = np.bincount(rx_index, power_mw, minlength=num_rx)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_delay = np.bincount(rx_index, power_mw * delay_s, minlength=num_rx) / total
+            second = np.bincount(rx_index, power_mw * delay_s ** 2, minlength=num_rx) / total
+            received = 10 * np.log10(total)
+        return {
+            "received_power_dBm": received,
+            "mean_delay_s": mean_delay,
+            "rms_delay_spread_s": np.sqrt(np.maximum(second - mean_delay ** 2, 0)),
+            "num_paths": np.bincount(rx_index, minlength=num_rx),
+        }
+
+# ## Run the Multipath Reflection Calculation
+if __name__ == "__main__":
+    ImageMethodReflections.init_logger()
+    # A 40 ft x 30 ft meeting room with a glass wall and a concrete pillar
+    room = [
+        (0, 0, 40, 0, 'concrete'), (40, 0, 40, 30, 'glass'),
+        (40, 30, 0, 30, 'drywall'), (0, 30, 0, 0, 'drywall'),
+        (18, 12, 22, 12, 'concrete'), (22, 12, 22, 16, 'concrete'),
+        (22, 16, 18, 16, 'concrete'), (18, 16, 18, 12, 'concrete'),
+    ]
+    engine = ImageMethodReflections(room, frequency=5800, max_order=2)
+    x, y = np.meshgrid(np.linspace(0.2, 39.8, 100), np.linspace(0.2, 29.8, 100))
+    result = engine.calculate((5, 5), np.stack((x, y), axis=-1), tx_power=20, tx_gain=3)
+    print(f"{len(result['paths']['delay_s'])} paths over {x.size} receivers, "
+          f"median RMS delay spread {np.nanmedian(result['rms_delay_spread_s']) * 1e9:.2f} ns")
@@ -0,0 +1,170 @@
+# Outage Probability Calculation Script for VEDA
+# This script computes the outage probability P(received power < sensitivity) for large sets of links,
+# given a mean received power from a path-loss model, log-normal shadowing and optional Rayleigh/Rician fading.
+# Closed forms are used where they exist; composite shadowing + fading falls back to vectorized Monte Carlo.
+
+# ## Import necessary libraries
+import os
+import logging
+from pathlib import Path
+import numpy as np
+from scipy.special import ndtr, ndtri
+from scipy.stats import ncx2
+
+from generate_link_budget_data import calculate_path_loss, calculate_received_power
+from antenna_pattern import AntennaPattern
+
+MC_BLOCK_BYTES = 64 * 1024**2  # Memory budget for the Monte Carlo draws of one block of links
+MC_TEMPORARIES = 5  # float64 arrays of block x num_samples alive at once (Rician fading draws are the widest)
+
+# ## Define the OutageProbability class
+class OutageProbability:
+    FADING_MODELS = ('none', 'rayleigh', 'rician')
+
+    def __init__(self, sensitivity_dbm, shadowing_std_db, fading='none', k_factor_db=None,
+                 num_samples=10000, block_size=None, seed=None):
+        """Initialize the OutageProbability class"""
+        if fading not in self.FADING_MODELS:
+            raise ValueError(f"Unknown fading model '{fading}', expected one of {self.FADING_MODELS}")
+        if fading == 'rician' and k_factor_db is None:
+            raise ValueError("Rician fading requires k_factor_db")
+        self.sensitivity_dbm = sensitivity_dbm  # Receiver sensitivity (dBm)
+        self.shadowing_std_db = shadowing_std_db  # Log-normal shadowing standard deviation (dB)
+        self.fading = fading  # Small-scale fading model: 'none', 'rayleigh' or 'rician'
+        self.k_factor_db = k_factor_db  # Rician K-factor (dB)
+        self.num_samples = num_samples  # Monte Carlo samples per link
+        self.block_size = block_size  # Links per Monte Carlo block; None sizes blocks from MC_BLOCK_BYTES
+        self.seed = seed  # Seed for the Monte Carlo generator
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'outage_probability.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def calculate_outage_shadowing(mean_rx_dbm, sensitivity_dbm, shadowing_std_db):
+        """Outage probability under log-normal shadowing: Phi((sensitivity - mean) / sigma)"""
+        mean_rx_dbm, sensitivity_dbm, shadowing_std_db = np.broadcast_arrays(
+            np.asarray(mean_rx_dbm, dtype=float),
+            np.asarray(sensitivity_dbm, dtype=float),
+            np.asarray(shadowing_std_db, dtype=float),
+        )
+        margin = sensitivity_dbm - mean_rx_dbm
+        with np.errstate(divide='ignore', invalid='ignore'):
+            outage = ndtr(margin / shadowing_std_db)
+        # Without shadowing the outage is a step function of the margin
+        return np.where(shadowing_std_db > 0, outage, (margin > 0).astype(float))
+
+    @staticmethod
+    def calculate_outage_rayleigh(mean_rx_dbm, sensitivity_dbm):
+        """Outage probability under Rayleigh fading: 1 - exp(-P_sens / P_mean)"""
+        ratio = 10 ** ((np.asarray(sensitivity_dbm, dtype=float) - np.asarray(mean_rx_dbm, dtype=float)) / 10)
+        return -np.expm1(-ratio)
+
+    @staticmethod
+    def calculate_outage_rician(mean_rx_dbm, sensitivity_dbm, k_factor_db):
+        """Outage probability under Rician fading via the noncentral chi-squared CDF"""
+        ratio = 10 ** ((np.asarray(sensitivity_dbm, dtype=float) - np.asarray(mean_rx_dbm, dtype=float)) / 10)
+        k = 10 ** (np.asarray(k_factor_db, dtype=float) / 10)
+        # 2(K+1)|h|^2 follows a noncentral chi-squared law with 2 degrees of freedom and noncentrality 2K
+        return ncx2.cdf(2 * (k + 1) * ratio, 2, 2 * k)
+
+    @staticmethod
+    def draw_fading_db(rng, shape, fading, k_factor_db=None):
+        """Draw unit-mean small-scale fading power samples in dB"""
+        if fading == 'none':
+            return np.zeros(shape)
+        if fading == 'rayleigh':
+            return 10 * np.log10(rng.exponential(1.0, shape))
+        k = 10 ** (k_factor_db / 10)
+        los = np.sqrt(k / (k + 1))
+        scatter = np.sqrt(1 / (2 * (k + 1)))
+        in_phase = los + scatter * rng.standard_normal(shape)
+        quadrature = scatter * rng.standard_normal(shape)
+        return 10 * np.log10(in_phase ** 2 + quadrature ** 2)
+
+    @staticmethod
+    def monte_carlo_block_size(num_samples, target_bytes=MC_BLOCK_BYTES):
+        """Links per Monte Carlo block such that the draws of one block stay within target_bytes"""
+        return max(1, int(target_bytes // (num_samples * 8 * MC_TEMPORARIES)))
+
+    @staticmethod
+    def calculate_outage_monte_carlo(mean_rx_dbm, sensitivity_dbm, shadowing_std_db, fading='none',
+                                     k_factor_db=None, num_samples=10000, block_size=None, seed=None):
+        """Estimate outage probability by vectorized Monte Carlo, one block of links at a time
+
+        block_size defaults to as many links as fit the MC_BLOCK_BYTES budget for num_samples draws each.
+        """
+        if block_size is None:
+            block_size = OutageProbability.monte_carlo_block_size(num_samples)
+        mean_rx_dbm, sensitivity_dbm, shadowing_std_db = np.broadcast_arrays(
+            np.asarray(mean_rx_dbm, dtype=float),
+            np.asarray(sensitivity_dbm, dtype=float),
+            np.asarray(shadowing_std_db, dtype=float),
+        )
+        shape = mean_rx_dbm.shape
+        margin = (sensitivity_dbm - mean_rx_dbm).ravel()
+        sigma = shadowing_std_db.ravel()
+        rng = np.random.default_rng(seed)
+
+        outage = np.empty(margin.size)
+        for start in range(0, margin.size, block_size):
+            stop = min(start + block_size, margin.size)
+            draw_shape = (stop - start, num_samples)
+            excess_db = sigma[start:stop, None] * rng.standard_normal(draw_shape)
+            excess_db += OutageProbability.draw_fading_db(rng, draw_shape, fading, k_factor_db)
+            outage[start:stop] = np.mean(excess_db < margin[start:stop, None], axis=1)
+        return outage.reshape(shape)
+
+    @staticmethod
+    def calculate_fade_margin(target_outage, shadowing_std_db):
+        """Fade margin (dB) above sensitivity that meets a target outage under log-normal shadowing"""
+        return np.asarray(shadowing_std_db, dtype=float) * ndtri(1 - np.asarray(target_outage, dtype=float))
+
+    def calculate(self, mean_rx_dbm):
+        """Calculate outage probability for an array of mean received powers (dBm)"""
+        mean_rx_dbm = np.asarray(mean_rx_dbm, dtype=float)
+        shadowed = np.any(np.asarray(self.shadowing_std_db) > 0)
+
+        if self.fading == 'none':
+            return self.calculate_outage_shadowing(mean_rx_dbm, self.sensitivity_dbm, self.shadowing_std_db)
+        if not shadowed and self.fading == 'rayleigh':
+            return self.calculate_outage_rayleigh(mean_rx_dbm, self.sensitivity_dbm)
+        if not shadowed and self.fading == 'rician':
+            return self.calculate_outage_rician(mean_rx_dbm, self.sensitivity_dbm, self.k_factor_db)
+
+        logging.debug(f"No closed form for shadowing with {self.fading} fading, "
+                      f"using Monte Carlo with {self.num_samples} samples per link")
+        return self.calculate_outage_monte_carlo(
+            mean_rx_dbm, self.sensitivity_dbm, self.shadowing_std_db, self.fading,
+            self.k_factor_db, self.num_samples, self.block_size, self.seed
+        )
+
+    def calculate_link_outage(self, frequency, distance_ft, tx_power, tx_gain, rx_gain, losses_tx=2.0, losses_rx=2.0,
+                              tx_angles=None, rx_angles=None):
+        """Calculate outage probability for arrays of links using the link budget path loss
+
+        tx_gain / rx_gain may be AntennaPattern objects, evaluated at tx_angles / rx_angles = (az_deg, el_deg).
+        """
+        tx_gain = AntennaPattern.resolve_gain(tx_gain, tx_angles)
+        rx_gain = AntennaPattern.resolve_gain(rx_gain, rx_angles)
+        path_loss = calculate_path_loss(np.asarray(frequency, dtype=float), np.asarray(distance_ft, dtype=float))
+        mean_rx_dbm = calculate_received_power(tx_power, tx_gain, losses_tx, path_loss, rx_gain, losses_rx)
+        return self.calculate(mean_rx_dbm)
+
+# ## Run the Outage Probability Calculation
+if __name__ == "__main__":
+    OutageProbability.init_logger()
+    distances = np.arange(5, 501, 5)  # Distance range from 5 ft to 500 ft
+    outage = OutageProbability(sensitivity_dbm=-90, shadowing_std_db=8, fading='rayleigh', seed=0)
+    p_out = outage.calculate_link_outage(frequency=2400, distance_ft=distances, tx_power=0, tx_gain=2, rx_gain=2)
+    for d, p in zip(distances[::10], p_out[::10]):
+        print(f"{d} ft: P_out = {p:.4f}")
+    print(f"Fade margin for 1% outage at 8 dB shadowing: {OutageProbability.calculate_fade_margin(0.01, 8):.2f} dB")
@@ -0,0 +1,218 @@
+# Pairwise Propagation Delay Calculation Script for VEDA
+# This script computes distances and propagation delays between every pair of N nodes given lat/lon coordinates.
+# Rows of the N x N matrix are processed in tiles spread over a process pool; the memory cap covers every tile
+# in flight at once (one per worker plus finished results waiting to be consumed), so large networks never allocate the full matrix unless it is written to a memory-mapped file.
+# A k-nearest-neighbor mode keeps only the k closest nodes per row.
+
+# ## Import necessary libraries
+import os
+import logging
+from multiprocessing import Pool, cpu_count
+from pathlib import Path
+from tqdm import tqdm
+import numpy as np
+
+from prop_delay_calculation import PropagationDelay
+
+EARTH_RADIUS_MILES = 3958.7613  # Mean Earth radius
+WGS84_A_M = 6378137.0  # WGS84 semi-major axis in meters
+WGS84_E2 = 6.69437999014e-3  # WGS84 first eccentricity squared
+METERS_PER_MILE = 1609.344
+SPEED_OF_LIGHT_MPS = 186282.397  # Speed of light in miles per second
+
+_worker_state = {}
+
+# ## Define the PairwiseDelay class
+class PairwiseDelay:
+    METRICS = ('haversine', 'ecef')
+    TILE_TEMPORARIES = 6  # float64 arrays of tile size alive while a tile is computed
+
+    def __init__(self, lat_deg, lon_deg, alt_m=None, metric='haversine', memory_cap_mb=256, num_workers=None):
+        """Initialize the PairwiseDelay class"""
+        if metric not in self.METRICS:
+            raise ValueError(f"Unknown distance metric '{metric}', expected one of {self.METRICS}")
+        self.lat_deg = np.asarray(lat_deg, dtype=float)  # Node latitudes in degrees
+        self.lon_deg = np.asarray(lon_deg, dtype=float)  # Node longitudes in degrees
+        self.alt_m = np.zeros_like(self.lat_deg) if alt_m is None else np.asarray(alt_m, dtype=float)  # Node altitudes
+        self.metric = metric  # 'haversine' great-circle or 'ecef' straight-line distance
+        self.memory_cap_mb = memory_cap_mb  # Memory budget in MB shared by all tiles in flight
+        self.num_workers = num_workers if num_workers is not None else min(cpu_count(), 48)
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'pairwise_delay.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def to_ecef_miles(lat_deg, lon_deg, alt_m):
+        """Convert geodetic coordinates to WGS84 ECEF coordinates in miles"""
+        lat = np.radians(lat_deg)
+        lon = np.radians(lon_deg)
+        n = WGS84_A_M / np.sqrt(1 - WGS84_E2 * np.sin(lat) ** 2)
+        x = (n + alt_m) * np.cos(lat) * np.cos(lon)
+        y = (n + alt_m) * np.cos(lat) * np.sin(lon)
+        z = (n * (1 - WGS84_E2) + alt_m) * np.sin(lat)
+        return np.column_stack((x, y, z)) / METERS_PER_MILE
+
+    @staticmethod
+    def haversine_miles(lat1, lon1, lat2, lon2):
+        """Great-circle distance in miles between broadcastable arrays of radians"""
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    @staticmethod
+    def ecef_miles(xyz1, xyz2):
+        """Straight-line distance in miles between two sets of ECEF points
+
+        Built from coordinate differences, one axis at a time: expanding |a|^2 + |b|^2 - 2a.b at Earth-radius
+        magnitudes cancels away about 0.1 m for nearby nodes.
+        """
+        sq = np.zeros((len(xyz1), len(xyz2)))
+        for axis in range(3):
+            sq += (xyz1[:, axis, None] - xyz2[None, :, axis]) ** 2
+        return np.sqrt(sq)
+
+    @staticmethod
+    def _init_worker(metric, coords, k, with_distance=False):
+        """Share the node coordinates with each pool worker once"""
+        _worker_state.update(metric=metric, coords=coords, k=k, with_distance=with_distance)
+
+    @staticmethod
+    def _calculate_tile(bounds):
+        """Distance tile (miles) for rows start:stop against every node"""
+        start, stop = bounds
+        coords = _worker_state['coords']
+        if _worker_state['metric'] == 'haversine':
+            lat, lon = coords
+            distance = PairwiseDelay.haversine_miles(lat[start:stop, None], lon[start:stop, None],
+                                                     lat[None, :], lon[None, :])
+        else:
+            distance = PairwiseDelay.ecef_miles(coords[start:stop], coords)
+        return distance
+
+    @staticmethod
+    def _calculate_delay_tile(bounds):
+        """Delay tile for rows start:stop, with the distance tile only when it was asked for"""
+        distance = PairwiseDelay._calculate_tile(bounds)
+        delay = PropagationDelay.calculate_propagation_delay((distance, SPEED_OF_LIGHT_MPS))["delay_sec"]
+        return bounds, distance if _worker_state['with_distance'] else None, delay
+
+    @staticmethod
+    def _calculate_knn_tile(bounds):
+        """Indices, distances and delays of the k nearest nodes for rows start:stop"""
+        start, stop = bounds
+        k = _worker_state['k']
+        distance = PairwiseDelay._calculate_tile(bounds)
+        distance[np.arange(stop - start), np.arange(start, stop)] = np.inf  # Exclude self
+        nearest = np.argpartition(distance, k - 1, axis=1)[:, :k]
+        nearest_distance = np.take_along_axis(distance, nearest, axis=1)
+        order = np.argsort(nearest_distance, axis=1)
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        nearest_distance = np.take_along_axis(nearest_distance, order, axis=1)
+        delay = PropagationDelay.calculate_propagation_delay((nearest_distance, SPEED_OF_LIGHT_MPS))["delay_sec"]
+        return bounds, nearest, nearest_distance, delay
+
+    def row_bytes(self):
+        """Memory one row of a tile needs while it is computed"""
+        return self.lat_deg.size * 8 * self.TILE_TEMPORARIES
+
+    def max_in_flight(self):
+        """Tiles alive at once: one per worker computing plus as many finished results waiting to be consumed,
+        lowered until one-row tiles fit under the memory cap"""
+        window = 1 if self.num_workers <= 1 else 2 * self.num_workers
+        fits = int(self.memory_cap_mb * 1024**2 // self.row_bytes())
+        if fits == 0:
+            raise ValueError(f"One row of {self.lat_deg.size} nodes needs {self.row_bytes() / 1024**2:.1f} MB, "
+                             f"more than memory_cap_mb={self.memory_cap_mb}")
+        return min(window, fits)
+
+    def tile_bounds(self):
+        """Row ranges sized so that every tile in flight together fits under the memory cap"""
+        n = self.lat_deg.size
+        rows = int(self.memory_cap_mb * 1024**2 // (self.row_bytes() * self.max_in_flight()))
+        rows = min(rows, n)
+        return [(start, min(start + rows, n)) for start in range(0, n, rows)]
+
+    def _coords(self):
+        if self.metric == 'haversine':
+            return np.radians(self.lat_deg), np.radians(self.lon_deg)
+        return self.to_ecef_miles(self.lat_deg, self.lon_deg, self.alt_m)
+
+    def _map_tiles(self, func, k=None, with_distance=False):
+        """Yield tile results from the pool, or in-process when a single worker is configured
+
+        At most max_in_flight() tiles are submitted and not yet consumed, so results cannot pile up.
+        """
+        bounds = self.tile_bounds()
+        max_in_flight = self.max_in_flight()
+        # A window narrower than the pool leaves workers idle, so start no more than it can keep busy
+        num_workers = min(self.num_workers, max_in_flight)
+        logging.debug(f"Computing {len(bounds)} tiles with {num_workers} workers, {max_in_flight} in flight")
+        init_args = (self.metric, self._coords(), k, with_distance)
+        if num_workers <= 1 or len(bounds) == 1:
+            self._init_worker(*init_args)
+            yield from tqdm(map(func, bounds), total=len(bounds))
+            return
+        with Pool(processes=num_workers, initializer=PairwiseDelay._init_worker, initargs=init_args) as pool:
+            pending = []
+            for bounds_slice in tqdm(bounds):
+                if len(pending) >= max_in_flight:
+                    yield pending.pop(0).get()
+                pending.append(pool.apply_async(func, (bounds_slice,)))
+            for result in pending:
+                yield result.get()
+
+    def iter_tiles(self, with_distance=False):
+        """Yield (row_start, row_stop, distance_miles, delay_sec) tiles in row order
+
+        distance_miles is None unless with_distance is set.
+        """
+        for (start, stop), distance, delay in self._map_tiles(PairwiseDelay._calculate_delay_tile,
+                                                              with_distance=with_distance):
+            yield start, stop, distance, delay
+
+    def calculate(self, out_path=None):
+        """Calculate the full N x N delay matrix, memory-mapped to out_path (.npy) when given"""
+        n = self.lat_deg.size
+        if out_path is not None:
+            delays = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.float64, shape=(n, n))
+        else:
+            delays = np.empty((n, n))
+        for start, stop, _, delay in self.iter_tiles():
+            delays[start:stop] = delay
+        if out_path is not None:
+            delays.flush()
+            logging.debug(f"Delay matrix written to {out_path}")
+        return delays
+
+    def calculate_knn(self, k):
+        """Calculate the k nearest neighbors of every node with their distances and delays"""
+        n = self.lat_deg.size
+        if not 0 < k < n:
+            raise ValueError(f"k must be between 1 and {n - 1}")
+        indices = np.empty((n, k), dtype=np.int64)
+        distances = np.empty((n, k))
+        delays = np.empty((n, k))
+        for (start, stop), nearest, nearest_distance, delay in self._map_tiles(PairwiseDelay._calculate_knn_tile, k):
+            indices[start:stop] = nearest
+            distances[start:stop] = nearest_distance
+            delays[start:stop] = delay
+        return {"indices": indices, "distance_miles": distances, "delay_sec": delays}
+
+# ## Run the Pairwise Propagation Delay Calculation
+if __name__ == "__main__":
+    PairwiseDelay.init_logger()
+    rng = np.random.default_rng(0)
+    num_nodes = 20000
+    lat = rng.uniform(25, 49, num_nodes)  # Nodes scattered over the continental US
+    lon = rng.uniform(-124, -67, num_nodes)
+    pairwise = PairwiseDelay(lat, lon, metric='haversine', memory_cap_mb=256)
+    knn = pairwise.calculate_knn(k=8)
+    print(f"Mean delay to nearest neighbor: {knn['delay_sec'][:, 0].mean() * 1e6:.2f} us")
@@ -1,12 +1,14 @@
-import math
 import os
 import logging
 from multiprocessing import Pool, cpu_count
 from pathlib import Path
 from tqdm import tqdm
+import numpy as np
 import pandas as pd
 from zipfile import ZipFile, ZIP_DEFLATED
 
+from antenna_pattern import AntennaPattern
+
 class PathLoss:
     def __init__(self, frequency, distance_ft, tx_power, tx_gain, rx_gain, path_loss_exponent, ref_distance_ft=3.28084):
         self.frequency = frequency  # in MHz
@@ -32,19 +34,25 @@ class PathLoss:
             for r in results:
                 f.write(f"{r}\n")
 
-    def calculate_path_loss(self, d_ft):
-        """Calculate path loss using the log-distance path loss model"""
+    def calculate_path_loss(self, d_ft, tx_angles=None, rx_angles=None):
+        """Calculate path loss using the log-distance path loss model
+
+        d_ft may be an array. tx_gain / rx_gain may be AntennaPattern objects, evaluated at
+        tx_angles / rx_angles = (az_deg, el_deg).
+        """
+        tx_gain = AntennaPattern.resolve_gain(self.tx_gain, tx_angles)
+        rx_gain = AntennaPattern.resolve_gain(self.rx_gain, rx_angles)
         d_m = d_ft * 0.3048  # convert feet to meters
         d0_m = self.ref_distance_ft * 0.3048  # convert reference distance to meters
-        Lp_d0 = 20 * math.log10(d0_m) + 20 * math.log10(self.frequency) - 27.55  # path loss at reference distance in dB
-        Lp_d = Lp_d0 + 10 * self.path_loss_exponent * math.log10(d_m / d0_m)  # path loss at distance d in dB
-        Pr = self.tx_power + self.tx_gain + self.rx_gain - Lp_d  # Friis Transmission Equation result in dBm
+        Lp_d0 = 20 * np.log10(d0_m) + 20 * np.log10(self.frequency) - 27.55  # path loss at reference distance in dB
+        Lp_d = Lp_d0 + 10 * self.path_loss_exponent * np.log10(d_m / d0_m)  # path loss at distance d in dB
+        Pr = self.tx_power + tx_gain + rx_gain - Lp_d  # Friis Transmission Equation result in dBm
         return {
             "frequency_MHz": self.frequency,
             "distance_ft": d_ft,
             "tx_power_dBm": self.tx_power,
-            "tx_gain_dBi": self.tx_gain,
-            "rx_gain_dBi": self.rx_gain,
+            "tx_gain_dBi": tx_gain,
+            "rx_gain_dBi": rx_gain,
             "path_loss_exponent": self.path_loss_exponent,
             "path_loss_dB": Lp_d,
             "received_power_dBm": Pr
@@ -0,0 +1,147 @@
+# RF Expression Graph Script for VEDA
+# This script chains EIRP, path loss, received power, RSSI, SNR and channel capacity as a dependency graph.
+# Each quantity is a node with declared inputs and a vectorized kernel; evaluated arrays are memoized by the
+# hash of everything upstream, so changing one input recomputes only the nodes downstream of it.
+
+# ## Import necessary libraries
+import os
+import logging
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+
+from generate_link_budget_data import calculate_path_loss, calculate_received_power
+from eirp_calculation import EIRP
+from rssi_calculation import RSSI
+from snr_calculation import SNR
+from link_state_simulator import LinkStateSimulator
+
+# ## Define the RFExpressionGraph class
+class RFExpressionGraph:
+    def __init__(self, cache_size=8):
+        """Initialize the RFExpressionGraph class"""
+        self.cache_size = cache_size  # Memoized results kept per node
+        self.inputs = {}  # Input name -> array
+        self.input_hashes = {}  # Input name -> content hash
+        self.nodes = OrderedDict()  # Node name -> (inputs, kernel)
+        self.cache = {}  # Node name -> OrderedDict of hash -> array
+        self.evaluations = {}  # Node name -> number of kernel calls
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'rf_expression_graph.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def hash_array(values):
+        """Content hash of an array, including its dtype and shape"""
+        values = np.ascontiguousarray(values)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str((values.dtype.str, values.shape)).encode())
+        digest.update(values.tobytes())
+        return digest.hexdigest()
+
+    def add_node(self, name, inputs, kernel):
+        """Declare a quantity computed by kernel(*inputs)"""
+        if name in self.inputs or name in self.nodes:
+            raise ValueError(f"'{name}' is already defined")
+        missing = [i for i in inputs if i not in self.nodes and i not in self.inputs]
+        if missing:
+            logging.debug(f"Node '{name}' refers to inputs not set yet: {missing}")
+        self.nodes[name] = (tuple(inputs), kernel)
+        self.cache[name] = OrderedDict()
+        self.evaluations[name] = 0
+
+    def set_input(self, name, values):
+        """Set (or change) an input array"""
+        if name in self.nodes:
+            raise ValueError(f"'{name}' is a computed node, not an input")
+        values = np.asarray(values, dtype=float)
+        self.inputs[name] = values
+        self.input_hashes[name] = self.hash_array(values)
+
+    def node_hash(self, name):
+        """Hash of a node: its name and the hashes of everything it depends on"""
+        if name in self.input_hashes:
+            return self.input_hashes[name]
+        if name not in self.nodes:
+            raise KeyError(f"Unknown input or node '{name}'")
+        inputs, _ = self.nodes[name]
+        digest = hashlib.blake2b(name.encode(), digest_size=16)
+        for dependency in inputs:
+            digest.update(self.node_hash(dependency).encode())
+        return digest.hexdigest()
+
+    def evaluate(self, name):
+        """Evaluate a node, reusing memoized results for unchanged upstream inputs"""
+        if name in self.inputs:
+            return self.inputs[name]
+        key = self.node_hash(name)
+        cached = self.cache[name]
+        if key in cached:
+            cached.move_to_end(key)
+            return cached[key]
+
+        inputs, kernel = self.nodes[name]
+        result = np.asarray(kernel(*(self.evaluate(dependency) for dependency in inputs)))
+        result.setflags(write=False)  # Cached arrays are shared between callers
+        self.evaluations[name] += 1
+        cached[key] = result
+        if len(cached) > self.cache_size:
+            cached.popitem(last=False)
+        logging.debug(f"Computed '{name}' with shape {result.shape}")
+        return result
+
+    def evaluate_many(self, names):
+        """Evaluate several nodes, returned as a dict"""
+        return {name: self.evaluate(name) for name in names}
+
+    @staticmethod
+    def calculate_channel_capacity(bandwidth, snr):
+        """Shannon-Hartley channel capacity in bits per second"""
+        return bandwidth * np.log2(1 + 10 ** (snr / 10))
+
+    @classmethod
+    def build_link_budget_graph(cls, cache_size=8):
+        """Graph chaining EIRP, path loss, received power, RSSI, SNR and capacity"""
+        graph = cls(cache_size=cache_size)
+        graph.add_node('eirp', ('tx_power', 'tx_gain', 'losses_tx'),
+                       lambda p, g, l: EIRP.calculate_eirp(p, g, l)["EIRP (dBm)"])
+        graph.add_node('path_loss', ('frequency', 'distance_ft'), calculate_path_loss)
+        graph.add_node('rx_power', ('eirp', 'path_loss', 'rx_gain', 'losses_rx'),
+                       lambda eirp, l_p, g_r, l_r: calculate_received_power(eirp, 0, 0, l_p, g_r, l_r))
+        # RSSI takes the power at the receive antenna port before path loss
+        graph.add_node('rssi', ('eirp', 'rx_gain', 'losses_rx', 'path_loss', 'nf'),
+                       lambda eirp, g_r, l_r, l_p, nf: RSSI.calculate_rssi(eirp + g_r - l_r, l_p, nf)["RSSI"])
+        graph.add_node('noise_floor', ('nf', 'bandwidth_hz'), LinkStateSimulator.calculate_noise_floor)
+        graph.add_node('snr', ('rx_power', 'noise_floor'), lambda p_s, p_n: SNR.calculate_snr(p_s, p_n)["SNR"])
+        graph.add_node('capacity', ('bandwidth_hz', 'snr'), cls.calculate_channel_capacity)
+        return graph
+
+# ## Run the RF Expression Graph
+if __name__ == "__main__":
+    RFExpressionGraph.init_logger()
+    graph = RFExpressionGraph.build_link_budget_graph()
+    # Inputs broadcast against each other: a frequency x distance x tx_power grid
+    graph.set_input('frequency', np.arange(700, 3001, 50)[:, None, None])
+    graph.set_input('distance_ft', np.arange(5, 501, 5)[None, :, None])
+    graph.set_input('tx_power', np.arange(20, 44, 1)[None, None, :])
+    for name, value in (('tx_gain', 6), ('rx_gain', 6), ('losses_tx', 2), ('losses_rx', 2),
+                        ('nf', 5), ('bandwidth_hz', 20e6)):
+        graph.set_input(name, value)
+
+    capacity = graph.evaluate('capacity')
+    print(f"Evaluated capacity grid {capacity.shape}")
+
+    # What-if: a better receiver noise figure only recomputes noise floor, RSSI, SNR and capacity
+    graph.set_input('nf', 3)
+    graph.evaluate_many(['rssi', 'capacity'])
+    print({name: count for name, count in graph.evaluations.items()})
@@ -0,0 +1,198 @@
+# RF Kernel Backend Script for VEDA
+# This script provides per-element kernels for branchy path loss formulas (Friis with per-row environments and
+# Okumura-Hata with urban / suburban / open-area corrections). When numba is installed the kernels are compiled
+# into parallel loops over typed arrays; otherwise the NumPy implementations below are used.
+# check_parity() compares both backends, and the NumPy backend against Friis.calculate_friis.
+
+# ## Import necessary libraries
+import os
+import math
+import logging
+from pathlib import Path
+import numpy as np
+
+from friis_calculation import Friis
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+    prange = numba.prange
+except ImportError:
+    numba = None
+    NUMBA_AVAILABLE = False
+    prange = range
+
+SPEED_OF_LIGHT_MPS = 3 * 10**8
+ENVIRONMENTS = ('urban', 'suburban', 'rural')  # Codes 0, 1, 2; anything unknown is treated as rural
+
+# ## Per-element loops, compiled by numba when it is available
+def _friis_loop(distance, frequency, env_code, exponents, out):
+    for i in prange(distance.shape[0]):
+        lambda_ = SPEED_OF_LIGHT_MPS / (frequency[i] * 1e6)
+        out[i] = 20.0 * math.log10(distance[i] / lambda_) + 10.0 * exponents[env_code[i]] * math.log10(distance[i])
+
+
+def _okumura_hata_loop(frequency, distance_km, base_height, mobile_height, env_code, large_city, out):
+    for i in prange(frequency.shape[0]):
+        log_f = math.log10(frequency[i])
+        log_hb = math.log10(base_height[i])
+        if large_city[i]:
+            if frequency[i] >= 300.0:
+                a_hm = 3.2 * math.log10(11.75 * mobile_height[i]) ** 2 - 4.97
+            else:
+                a_hm = 8.29 * math.log10(1.54 * mobile_height[i]) ** 2 - 1.1
+        else:
+            a_hm = (1.1 * log_f - 0.7) * mobile_height[i] - (1.56 * log_f - 0.8)
+        loss = (69.55 + 26.16 * log_f - 13.82 * log_hb - a_hm
+                + (44.9 - 6.55 * log_hb) * math.log10(distance_km[i]))
+        if env_code[i] == 1:
+            loss -= 2.0 * math.log10(frequency[i] / 28.0) ** 2 + 5.4
+        elif env_code[i] == 2:
+            loss -= 4.78 * log_f ** 2 - 18.33 * log_f + 40.94
+        out[i] = loss
+
+
+if NUMBA_AVAILABLE:
+    _friis_loop = numba.njit(parallel=True, cache=True)(_friis_loop)
+    _okumura_hata_loop = numba.njit(parallel=True, cache=True)(_okumura_hata_loop)
+
+# ## Define the RFKernels class
+class RFKernels:
+    BACKENDS = ('auto', 'numba', 'numpy')
+
+    def __init__(self, backend='auto'):
+        """Initialize the RFKernels class"""
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown kernel backend '{backend}', expected one of {self.BACKENDS}")
+        if backend == 'numba' and not NUMBA_AVAILABLE:
+            raise ImportError("The numba backend was requested but numba is not installed")
+        self.backend = 'numba' if backend == 'auto' and NUMBA_AVAILABLE else ('numpy' if backend == 'auto' else backend)
+        logging.debug(f"Using the {self.backend} kernel backend")
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'rf_kernels.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def encode_environment(environment):
+        """Environment names (scalar or array) as int8 codes, unknown names mapping to rural"""
+        names = np.asarray(environment)
+        codes = np.full(names.shape, ENVIRONMENTS.index('rural'), dtype=np.int8)
+        for code, name in enumerate(ENVIRONMENTS):
+            codes[names == name] = code
+        return codes
+
+    @staticmethod
+    def _typed(shape, *arrays, dtype=np.float64):
+        """Broadcast inputs to flat contiguous arrays of one dtype"""
+        return [np.ascontiguousarray(np.broadcast_to(a, shape), dtype=dtype).ravel() for a in arrays]
+
+    @staticmethod
+    def friis_path_loss_numpy(distance, frequency, env_code):
+        """Environment-adjusted Friis loss (dB), distance in meters and frequency in MHz"""
+        exponents = np.array([Friis.PATH_LOSS_EXPONENTS[name] for name in ENVIRONMENTS])
+        lambda_ = SPEED_OF_LIGHT_MPS / (frequency * 1e6)
+        return 20 * np.log10(distance / lambda_) + 10 * exponents[env_code] * np.log10(distance)
+
+    @staticmethod
+    def okumura_hata_path_loss_numpy(frequency, distance_km, base_height, mobile_height, env_code, large_city):
+        """Okumura-Hata median loss (dB): frequency in MHz, distance in km, antenna heights in meters"""
+        log_f = np.log10(frequency)
+        log_hb = np.log10(base_height)
+        a_hm = np.where(
+            large_city,
+            np.where(frequency >= 300.0,
+                     3.2 * np.log10(11.75 * mobile_height) ** 2 - 4.97,
+                     8.29 * np.log10(1.54 * mobile_height) ** 2 - 1.1),
+            (1.1 * log_f - 0.7) * mobile_height - (1.56 * log_f - 0.8))
+        loss = 69.55 + 26.16 * log_f - 13.82 * log_hb - a_hm + (44.9 - 6.55 * log_hb) * np.log10(distance_km)
+        suburban = 2.0 * np.log10(frequency / 28.0) ** 2 + 5.4
+        open_area = 4.78 * log_f ** 2 - 18.33 * log_f + 40.94
+        return loss - np.select([env_code == 1, env_code == 2], [suburban, open_area], 0.0)
+
+    def friis_path_loss(self, distance, frequency, environment):
+        """Friis loss (dB) for broadcastable arrays, with one environment name per element"""
+        env_code = self.encode_environment(environment)
+        shape = np.broadcast_shapes(np.shape(distance), np.shape(frequency), env_code.shape)
+        distance, frequency = self._typed(shape, distance, frequency)
+        (env_code,) = self._typed(shape, env_code, dtype=np.int8)
+        if self.backend == 'numpy':
+            return self.friis_path_loss_numpy(distance, frequency, env_code).reshape(shape)
+        exponents = np.array([Friis.PATH_LOSS_EXPONENTS[name] for name in ENVIRONMENTS])
+        out = np.empty(distance.shape)
+        _friis_loop(distance, frequency, env_code, exponents, out)
+        return out.reshape(shape)
+
+    def calculate_friis(self, p_tx, g_tx, g_rx, l_tx, distance, frequency, environment):
+        """Friis.calculate_friis over arrays whose environment may differ per element"""
+        l_p = self.friis_path_loss(distance, frequency, environment)
+        p_r = p_tx + np.asarray(g_tx) + g_rx - l_tx - l_p
+        return {"p_r": p_r, "p_tx": p_tx, "g_tx": g_tx, "g_rx": g_rx, "l_tx": l_tx, "distance": distance,
+                "frequency": frequency, "environment": environment}
+
+    def okumura_hata_path_loss(self, frequency, distance_km, base_height=30.0, mobile_height=1.5,
+                               environment='urban', large_city=False):
+        """Okumura-Hata loss (dB) for broadcastable arrays, with one environment name per element"""
+        env_code = self.encode_environment(environment)
+        shape = np.broadcast_shapes(np.shape(frequency), np.shape(distance_km), np.shape(base_height),
+                                    np.shape(mobile_height), env_code.shape, np.shape(large_city))
+        frequency, distance_km, base_height, mobile_height = self._typed(
+            shape, frequency, distance_km, base_height, mobile_height)
+        (env_code,) = self._typed(shape, env_code, dtype=np.int8)
+        (large_city,) = self._typed(shape, large_city, dtype=np.bool_)
+        if self.backend == 'numpy':
+            return self.okumura_hata_path_loss_numpy(frequency, distance_km, base_height, mobile_height,
+                                                     env_code, large_city).reshape(shape)
+        out = np.empty(frequency.shape)
+        _okumura_hata_loop(frequency, distance_km, base_height, mobile_height, env_code, large_city, out)
+        return out.reshape(shape)
+
+    @staticmethod
+    def check_parity(num_rows=100000, seed=0, rtol=1e-12):
+        """Compare the NumPy kernels with Friis.calculate_friis and, when installed, the numba kernels"""
+        rng = np.random.default_rng(seed)
+        distance = rng.uniform(1, 1000, num_rows)  # in meters
+        frequency = rng.uniform(150, 6000, num_rows)  # in MHz
+        environment = rng.choice(ENVIRONMENTS + ('unknown',), num_rows)
+        distance_km = rng.uniform(1, 20, num_rows)
+        base_height = rng.uniform(30, 200, num_rows)
+        mobile_height = rng.uniform(1, 10, num_rows)
+        large_city = rng.random(num_rows) < 0.5
+
+        numpy_kernels = RFKernels('numpy')
+        friis = numpy_kernels.friis_path_loss(distance, frequency, environment)
+        reference = np.empty(num_rows)
+        for name in np.unique(environment):
+            rows = environment == name
+            reference[rows] = -Friis.calculate_friis(0, 0, 0, 0, distance[rows], frequency[rows], name)["p_r"]
+        report = {"friis_numpy_vs_reference": bool(np.allclose(friis, reference, rtol=rtol, atol=0))}
+
+        if NUMBA_AVAILABLE:
+            numba_kernels = RFKernels('numba')
+            report["friis_numba_vs_numpy"] = bool(np.allclose(
+                numba_kernels.friis_path_loss(distance, frequency, environment), friis, rtol=rtol, atol=0))
+            hata_args = (frequency, distance_km, base_height, mobile_height, environment, large_city)
+            report["okumura_hata_numba_vs_numpy"] = bool(np.allclose(
+                numba_kernels.okumura_hata_path_loss(*hata_args),
+                numpy_kernels.okumura_hata_path_loss(*hata_args), rtol=rtol, atol=0))
+        logging.debug(f"Kernel parity: {report}")
+        return report
+
+# ## Run the RF Kernel Parity Check
+if __name__ == "__main__":
+    RFKernels.init_logger()
+    print(f"numba available: {NUMBA_AVAILABLE}")
+    for check, passed in RFKernels.check_parity().items():
+        print(f"{check}: {'ok' if passed else 'MISMATCH'}")
+    kernels = RFKernels()
+    loss = kernels.okumura_hata_path_loss(900, np.linspace(1, 20, 5), environment=['urban', 'suburban', 'rural',
+                                                                                    'urban', 'suburban'])
+    print(f"Okumura-Hata at 900 MHz ({kernels.backend}): {np.round(loss, 2)}")
@@ -5,6 +5,10 @@ from pathlib import Path
 from zipfile import ZipFile, ZIP_DEFLATED
 from tqdm import tqdm
 import numpy as np
+import pandas as pd
+
+from async_writer import AsyncDatasetWriter
+from dataset_cache import DatasetCache
 
 class RSSI:
     def __init__(self, pr, path_loss, nf):
@@ -32,6 +36,15 @@ class RSSI:
             for r in results:
                 f.write(f"{r}\n")
 
+    @staticmethod
+    def write_batch(batch):
+        """Write one (db_filename, results) batch to results_rssi.txt and its CSV file"""
+        db_filename, results = batch
+        RSSI.log_results(results)
+        with open(db_filename, 'w') as csvfile:
+            csvfile.write("RSSI,pr,path_loss,nf\n")
+            csvfile.writelines(f"{r['RSSI']},{r['pr']},{r['path_loss']},{r['nf']}\n" for r in results)
+
     @staticmethod
     def calculate_rssi(pr, path_loss, nf):
         """Calculate RSSI"""
@@ -43,41 +56,67 @@ class RSSI:
         """Static method for multiprocessing"""
         return RSSI.calculate_rssi(*params)
 
-    def calculate(self):
-        """Calculate RSSI for a range of parameters"""
+    @staticmethod
+    def calculate_rssi_grid(pr, path_loss, nf):
+        """RSSI rows for the Cartesian grid of the given values, in the same order as the parameter list"""
+        axes = (axis.ravel() for axis in np.meshgrid(pr, path_loss, nf, indexing='ij'))
+        return pd.DataFrame(RSSI.calculate_rssi(*axes))
+
+    def calculate(self, cache=None):
+        """Calculate RSSI for a range of parameters
+
+        Parameters:
+        cache (DatasetCache): Compute the grid through this cache; when every partition is cached and db_rssi.zip
+            exists, nothing is recomputed or rewritten
+
+        Returns:
+        list: Paths of the db_rssi batch CSV files, in both modes
+        """
         # Define the range of variables
         pr_values = np.arange(-100, 0, 1)  # Received power from -100 dBm to -1 dBm
         path_loss_values = np.arange(0, 150, 1)  # Path loss from 0 dB to 149 dB
         nf_values = np.arange(0, 10, 0.5)  # Noise figure from 0 dB to 9.5 dB
 
+        db_folder = "db_rssi"
+        Path(db_folder).mkdir(parents=True, exist_ok=True)
+        batch_size = 100000  # Define batch size for saving
+        num_rows = len(pr_values) * len(path_loss_values) * len(nf_values)
+        db_filenames = [f"{db_folder}/rssi_batch_{i}.csv" for i in range((num_rows + batch_size - 1) // batch_size)]
+
+        if cache is not None:
+            misses = cache.misses
+            paths = cache.get_or_compute(RSSI.calculate_rssi_grid,
+                                         {'pr': pr_values, 'path_loss': path_loss_values, 'nf': nf_values},
+                                         partition_axis='pr', dependencies=(RSSI.calculate_rssi,))
+            if cache.misses == misses and os.path.exists(f"{db_folder}.zip"):
+                logging.info(f"RSSI grid served from {len(paths)} cached partitions")
+                return db_filenames
+            rows = DatasetCache.load(paths)
+            with AsyncDatasetWriter(RSSI.write_batch) as writer:
+                for i in range(0, len(rows), batch_size):
+                    results = rows.iloc[i:i + batch_size].to_dict('records')
+                    writer.submit((db_filenames[i // batch_size], results), rows=len(results))
+            self.compress_database(db_folder)
+            return db_filenames
+
         parameters = [(p, pl, n) for p in pr_values for pl in path_loss_values for n in nf_values]
         num_cpus = min(cpu_count(), 48)  # Use 48 cores
         logging.debug(f"Using {num_cpus} CPU cores for parallel processing")
 
-        db_folder = "db_rssi"
-        Path(db_folder).mkdir(parents=True, exist_ok=True)
-        batch_size = 100000  # Define batch size for saving
+        # Batch N is written in the background while batch N+1 is computed
+        with AsyncDatasetWriter(RSSI.write_batch) as writer:
+            for i in range(0, len(parameters), batch_size):
+                batch_params = parameters[i:i + batch_size]
+                results = []
+                with Pool(processes=num_cpus) as pool:
+                    for result in tqdm(pool.imap_unordered(RSSI.calculate_rssi_static, batch_params), total=len(batch_params)):
+                        if result is not None:
+                            results.append(result)
 
-        for i in range(0, len(parameters), batch_size):
-            batch_params = parameters[i:i + batch_size]
-            results = []
-            with Pool(processes=num_cpus) as pool:
-                for result in tqdm(pool.imap_unordered(RSSI.calculate_rssi_static, batch_params), total=len(batch_params)):
-                    if result is not None:
-                        results.append(result)
-
-            self.log_results(results)
-
-            db_filename = f"{db_folder}/rssi_batch_{i // batch_size}.csv"
-            with open(db_filename, 'w') as csvfile:
-                header = "RSSI,pr,path_loss,nf\n"
-                csvfile.write(header)
-                for r in results:
-                    if r is not None:
-                        line = f"{r['RSSI']},{r['pr']},{r['path_loss']},{r['nf']}\n"
-                        csvfile.write(line)
+                writer.submit((db_filenames[i // batch_size], results), rows=len(results))
 
         self.compress_database(db_folder)
+        return db_filenames
 
     @staticmethod
     def compress_database(db_folder):
@@ -94,4 +133,4 @@ class RSSI:
 if __name__ == "__main__":
     RSSI.init_logger()
     rssi = RSSI(pr=-50, path_loss=50, nf=5)  # Initial values, will be overwritten by the parameter ranges
-    rssi.calculate()
+    rssi.calculate(cache=DatasetCache())
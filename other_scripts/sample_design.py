@@ -0,0 +1,123 @@
+# Space-Filling Sample Design Script for VEDA
+# This script draws Latin hypercube, Sobol or stratified-random designs over the same axis ranges the
+# dataset generators sweep, so a target row count can replace the full Cartesian product.
+# Designs are seeded and can be split into disjoint partitions, so parallel workers draw reproducible,
+# non-overlapping samples.
+
+# ## Import necessary libraries
+import os
+import logging
+from pathlib import Path
+import numpy as np
+from scipy.stats import qmc
+
+# ## Define the SampleDesign class
+class SampleDesign:
+    METHODS = ('lhs', 'sobol', 'stratified')
+
+    def __init__(self, axes, method='lhs', seed=None):
+        """Initialize the SampleDesign class
+
+        Parameters:
+        axes (dict): Axis name -> grid values (array or list, sampled on the grid) or
+            a (low, high) tuple (sampled continuously)
+        method (str): 'lhs', 'sobol' or 'stratified'
+        seed (int): Seed shared by every partition of the design
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown sampling method '{method}', expected one of {self.METHODS}")
+        self.axes = axes
+        self.method = method
+        self.seed = seed
+
+    @staticmethod
+    def init_logger():
+        """Initialize logger"""
+        log_folder = "logs"
+        Path(log_folder).mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            filename=os.path.join(log_folder, 'sample_design.log'),
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s:%(message)s'
+        )
+        logging.debug("Logger initialized")
+
+    @staticmethod
+    def stratified_unit(num_rows, dims, rng):
+        """One random point per cell of an even grid over the unit cube, topped up with random points"""
+        # Integer dims-th root: floating point gives 1000 ** (1 / 3) = 9.999..., which would truncate to 9
+        per_axis = max(1, round(num_rows ** (1 / dims)))
+        while per_axis > 1 and per_axis ** dims > num_rows:
+            per_axis -= 1
+        while (per_axis + 1) ** dims <= num_rows:
+            per_axis += 1
+        cells = np.stack(np.meshgrid(*[np.arange(per_axis)] * dims, indexing='ij'), axis=-1).reshape(-1, dims)
+        points = (cells + rng.random(cells.shape)) / per_axis
+        extra = num_rows - len(points)
+        if extra > 0:
+            points = np.concatenate((points, rng.random((extra, dims))))
+        return points[rng.permutation(len(points))[:num_rows]]
+
+    def unit_samples(self, num_rows, partition=0, num_partitions=1):
+        """Points in the unit cube for one partition of a num_rows design"""
+        if not isinstance(num_rows, (int, np.integer)) or num_rows < 1:
+            raise ValueError(f"num_rows must be a positive integer, got {num_rows!r}")
+        if not isinstance(num_partitions, (int, np.integer)) or not 1 <= num_partitions <= num_rows:
+            raise ValueError(f"num_partitions must be an integer between 1 and num_rows ({num_rows}), "
+                             f"got {num_partitions!r}")
+        if not 0 <= partition < num_partitions:
+            raise ValueError(f"partition must be between 0 and {num_partitions - 1}, got {partition!r}")
+        dims = len(self.axes)
+        bounds = np.linspace(0, num_rows, num_partitions + 1).astype(int)
+        start, stop = int(bounds[partition]), int(bounds[partition + 1])
+
+        if self.method == 'sobol':
+            # One scrambled sequence for the whole design; partitions are consecutive, disjoint slices of it
+            sampler = qmc.Sobol(dims, scramble=True, seed=np.random.default_rng(self.seed))
+            if start:
+                sampler.fast_forward(start)
+            return sampler.random(stop - start)
+
+        # Independent child streams per partition keep parallel workers reproducible and uncorrelated
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed).spawn(num_partitions)[partition])
+        if self.method == 'lhs':
+            return qmc.LatinHypercube(dims, seed=rng).random(stop - start)
+        return self.stratified_unit(stop - start, dims, rng)
+
+    def sample(self, num_rows, partition=0, num_partitions=1):
+        """Map unit samples onto the axes, returning a dict of column arrays"""
+        unit = self.unit_samples(num_rows, partition, num_partitions)
+        columns = {}
+        for i, (name, axis) in enumerate(self.axes.items()):
+            if isinstance(axis, tuple):
+                low, high = axis
+                columns[name] = low + unit[:, i] * (high - low)
+            else:
+                values = np.asarray(axis)
+                index = np.minimum((unit[:, i] * len(values)).astype(int), len(values) - 1)
+                columns[name] = values[index]
+        logging.debug(f"Drew {len(unit)} {self.method} samples over {list(self.axes)} "
+                      f"(partition {partition + 1}/{num_partitions})")
+        return columns
+
+    def sample_tuples(self, num_rows, partition=0, num_partitions=1):
+        """Samples as a list of parameter tuples, in axis order"""
+        columns = self.sample(num_rows, partition, num_partitions)
+        return list(zip(*columns.values()))
+
+# ## Run the Sample Design
+if __name__ == "__main__":
+    SampleDesign.init_logger()
+    axes = {
+        'Frequency_MHz': np.arange(700, 3001, 50),
+        'Distance_ft': np.arange(5, 501, 5),
+        'Tx_Power_dBm': np.arange(20, 44, 1),
+        'Tx_Gain_dBi': np.arange(0, 16, 1),
+        'Rx_Gain_dBi': np.arange(0, 16, 1),
+    }
+    full_rows = int(np.prod([len(v) for v in axes.values()]))
+    for method in SampleDesign.METHODS:
+        design = SampleDesign(axes, method=method, seed=42)
+        columns = design.sample(4096)
+        coverage = [len(np.unique(v)) / len(axes[k]) for k, v in columns.items()]
+        print(f"{method}: 4096 of {full_rows} rows, axis coverage {np.round(coverage, 2)}")
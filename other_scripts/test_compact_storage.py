@@ -0,0 +1,64 @@
+# Tests for the compact column encodings
+# Columns are only quantized on a declared grid, so chunks appended later with other value sets (coarser or finer
+# values, wider ranges) are stored without error and decode to the values that went in.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from block_storage import BlockStore
+from compact_storage import CompactCodec
+
+
+def chunks_with_different_value_sets():
+    """First chunk sits on coarse grids (pr on 10 dB, tx_gain all 0, derived dB on 0.1); later ones do not"""
+    yield pd.DataFrame({'pr': [-100.0, -90.0, -80.0], 'tx_gain': [0.0, 0.0, 0.0], 'loss': [1.1, 2.2, 3.3]})
+    yield pd.DataFrame({'pr': [-99.0, -1.0, -55.0], 'tx_gain': [3.0, 15.0, 7.0], 'loss': [1.23456, 150.5, 0.0]})
+    yield pd.DataFrame({'pr': [-100.5, 20.0, 0.0], 'tx_gain': [0.5, 1.0, 2.0], 'loss': [-3.75, 1e4, 42.125]})
+
+
+def test_undeclared_columns_are_stored_as_float():
+    first = next(chunks_with_different_value_sets())
+    assert CompactCodec().infer(first) == {name: {"dtype": "float32"} for name in first.columns}
+
+
+def test_block_store_appends_chunks_with_different_value_sets(tmp_path):
+    chunks = list(chunks_with_different_value_sets())
+    with BlockStore(tmp_path / 'rows.blk', block_rows=4, codec=CompactCodec()) as store:
+        for chunk in chunks:
+            store.append(chunk)
+    expected = pd.concat(chunks, ignore_index=True)
+    rows = BlockStore(tmp_path / 'rows.blk').read_rows(0, len(expected))
+    np.testing.assert_allclose(rows.to_numpy(), expected.to_numpy(), rtol=1e-6)
+
+
+def test_declared_steps_quantize_and_fit_later_chunks(tmp_path):
+    codec = CompactCodec(steps={'pr': 0.5, 'tx_gain': 0.5})
+    chunks = list(chunks_with_different_value_sets())
+    with BlockStore(tmp_path / 'rows.blk', block_rows=4, codec=codec) as store:
+        for chunk in chunks:
+            store.append(chunk)
+    encodings = store.index["encodings"]
+    assert encodings['pr'] == {"dtype": "int16", "scale": 0.5, "offset": 0.0}
+    assert encodings['loss'] == {"dtype": "float32"}
+    expected = pd.concat(chunks, ignore_index=True)
+    rows = BlockStore(tmp_path / 'rows.blk').read_rows(0, len(expected))
+    np.testing.assert_array_equal(rows[['pr', 'tx_gain']].to_numpy(), expected[['pr', 'tx_gain']].to_numpy())
+
+
+def test_declared_step_violation_is_reported():
+    codec = CompactCodec(steps={'pr': 10.0})
+    chunks = chunks_with_different_value_sets()
+    encodings = codec.infer(next(chunks))
+    with pytest.raises(ValueError, match="no longer fits"):
+        codec.encode(next(chunks), encodings)
+
+
+def test_from_grid_uses_the_full_axis():
+    codec = CompactCodec.from_grid({'distance': np.arange(5, 7001, 5), 'tx_gain': [0.0]})
+    assert codec.encodings['distance'] == {"dtype": "uint16", "scale": 1.0, "offset": 0.0}
+    df = pd.DataFrame({'distance': [5.0, 7000.0], 'tx_gain': [0.0, 0.0], 'loss': [1.1, 2.2]})
+    encodings = codec.infer(df)
+    assert encodings['loss'] == {"dtype": "float32"}
+    decoded = CompactCodec.decode(codec.encode(df, encodings), encodings)
+    np.testing.assert_allclose(decoded.to_numpy(), df.to_numpy(), rtol=1e-6)
@@ -0,0 +1,110 @@
+# Parity tests for the RF kernel backends
+# The per-element loops (numba-compiled when available) must agree with the NumPy implementations, and the NumPy
+# implementations with Friis.calculate_friis and a hand-computed Okumura-Hata value. Cases that need numba are
+# skipped when it is not installed; the pure-Python loops are always checked against NumPy.
+
+import numpy as np
+import pytest
+
+import rf_kernels
+from rf_kernels import RFKernels, ENVIRONMENTS, NUMBA_AVAILABLE
+from friis_calculation import Friis
+
+RTOL = 1e-12
+requires_numba = pytest.mark.skipif(not NUMBA_AVAILABLE, reason="numba is not installed")
+
+
+def python_loop(kernel):
+    """The uncompiled Python function behind a (possibly numba-compiled) loop"""
+    return getattr(kernel, 'py_func', kernel)
+
+
+@pytest.fixture(scope='module')
+def inputs():
+    rng = np.random.default_rng(0)
+    num_rows = 2000
+    return {
+        "distance": rng.uniform(1, 1000, num_rows),  # in meters
+        "frequency": rng.uniform(150, 6000, num_rows),  # in MHz
+        "environment": rng.choice(ENVIRONMENTS + ('unknown',), num_rows),
+        "distance_km": rng.uniform(1, 20, num_rows),
+        "base_height": rng.uniform(30, 200, num_rows),
+        "mobile_height": rng.uniform(1, 10, num_rows),
+        "large_city": rng.random(num_rows) < 0.5,
+    }
+
+
+def hata_args(inputs):
+    return (inputs["frequency"], inputs["distance_km"], inputs["base_height"], inputs["mobile_height"],
+            inputs["environment"], inputs["large_city"])
+
+
+def test_friis_numpy_matches_calculate_friis(inputs):
+    loss = RFKernels('numpy').friis_path_loss(inputs["distance"], inputs["frequency"], inputs["environment"])
+    for name in np.unique(inputs["environment"]):
+        rows = inputs["environment"] == name
+        reference = -Friis.calculate_friis(0, 0, 0, 0, inputs["distance"][rows], inputs["frequency"][rows], name)["p_r"]
+        np.testing.assert_allclose(loss[rows], reference, rtol=RTOL, atol=0)
+
+
+def test_okumura_hata_numpy_matches_hand_computed_value():
+    # 900 MHz, 1 km, 30 m base, 1.5 m mobile, small/medium city: 69.55 + 26.16 log f - 13.82 log hb - a(hm)
+    log_f = np.log10(900)
+    a_hm = (1.1 * log_f - 0.7) * 1.5 - (1.56 * log_f - 0.8)
+    expected = 69.55 + 26.16 * log_f - 13.82 * np.log10(30) - a_hm
+    loss = RFKernels('numpy').okumura_hata_path_loss(900, 1.0, 30.0, 1.5, 'urban', False)
+    assert loss == pytest.approx(expected, rel=RTOL)
+    assert loss == pytest.approx(126.40, abs=0.01)
+
+
+def test_friis_loop_matches_numpy(inputs):
+    kernels = RFKernels('numpy')
+    env_code = kernels.encode_environment(inputs["environment"])
+    exponents = np.array([Friis.PATH_LOSS_EXPONENTS[name] for name in ENVIRONMENTS])
+    out = np.empty(inputs["distance"].shape)
+    python_loop(rf_kernels._friis_loop)(inputs["distance"], inputs["frequency"], env_code, exponents, out)
+    np.testing.assert_allclose(out, kernels.friis_path_loss(inputs["distance"], inputs["frequency"],
+                                                            inputs["environment"]), rtol=RTOL, atol=0)
+
+
+def test_okumura_hata_loop_matches_numpy(inputs):
+    kernels = RFKernels('numpy')
+    env_code = kernels.encode_environment(inputs["environment"])
+    out = np.empty(inputs["frequency"].shape)
+    python_loop(rf_kernels._okumura_hata_loop)(inputs["frequency"], inputs["distance_km"], inputs["base_height"],
+                                               inputs["mobile_height"], env_code, inputs["large_city"], out)
+    np.testing.assert_allclose(out, kernels.okumura_hata_path_loss(*hata_args(inputs)), rtol=RTOL, atol=0)
+
+
+@requires_numba
+def test_friis_numba_matches_numpy(inputs):
+    args = (inputs["distance"], inputs["frequency"], inputs["environment"])
+    np.testing.assert_allclose(RFKernels('numba').friis_path_loss(*args), RFKernels('numpy').friis_path_loss(*args),
+                               rtol=RTOL, atol=0)
+
+
+@requires_numba
+def test_okumura_hata_numba_matches_numpy(inputs):
+    np.testing.assert_allclose(RFKernels('numba').okumura_hata_path_loss(*hata_args(inputs)),
+                               RFKernels('numpy').okumura_hata_path_loss(*hata_args(inputs)), rtol=RTOL, atol=0)
+
+
+@pytest.mark.parametrize('backend', ['numpy', pytest.param('numba', marks=requires_numba)])
+def test_broadcast_shapes(backend):
+    kernels = RFKernels(backend)
+    loss = kernels.okumura_hata_path_loss(np.array([[900.0], [1800.0]]), np.linspace(1, 20, 5))
+    assert loss.shape == (2, 5)
+    assert kernels.friis_path_loss(100.0, 2400.0, 'urban').shape == ()
+
+
+def test_numba_backend_requires_numba():
+    if NUMBA_AVAILABLE:
+        assert RFKernels('numba').backend == 'numba'
+    else:
+        with pytest.raises(ImportError):
+            RFKernels('numba')
+
+
+def test_check_parity_reports_success():
+    report = RFKernels.check_parity(num_rows=1000)
+    assert report and all(report.values())